@@ -6,11 +6,11 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QPushButton, QV
                             QHBoxLayout, QLabel, QComboBox, QLineEdit, QTabWidget, 
                             QFormLayout, QSpinBox, QDoubleSpinBox, QColorDialog, QMessageBox,
                             QStatusBar, QFileDialog, QGroupBox, QSizePolicy, QFrame,
-                            QStyle, QScrollArea, QToolTip)
+                            QStyle, QScrollArea, QToolTip, QCheckBox)
 from PyQt5.QtGui import QColor, QPixmap, QIcon, QFont, QPalette, QFontDatabase
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QSize
 
-from .nfc_manager import SpoolReader, SpoolData, NFCReader
+from .nfc_manager import BinaryDump, CancelToken, DumpArchive, DumpParser, SpoolReader, SpoolData, NFCReader
 
 
 class NFCThread(QThread):
@@ -19,23 +19,31 @@ class NFCThread(QThread):
     write_complete = pyqtSignal(bool)
     dump_complete = pyqtSignal(tuple)
     
-    def __init__(self, spool_reader, mode='read', data=None):
+    def __init__(self, spool_reader, mode='read', data=None, differential=False, verify=False):
         super().__init__()
         self.spool_reader = spool_reader
         self.mode = mode
         self.data = data
+        self.differential = differential  # Only write the pages that differ from the tag
+        self.verify = verify  # Read the written pages back and rewrite the ones that don't match
+        self.cancel_token = CancelToken()
     
     def run(self):
         if self.mode == 'read':
-            data = self.spool_reader.read_spool()
+            data = self.spool_reader.read_spool(token=self.cancel_token)
             self.read_complete.emit(data)
         elif self.mode == 'write':
-            success = self.spool_reader.write_spool(self.data)
+            success = self.spool_reader.write_spool(self.data, self.differential, self.verify,
+                                                    token=self.cancel_token)
             self.write_complete.emit(success)
         elif self.mode == 'dump':
-            uid, dump_data = self.spool_reader.read_spool_raw()
+            uid, dump_data = self.spool_reader.read_spool_raw(token=self.cancel_token)
             self.dump_complete.emit((uid, dump_data))
 
+    def cancel(self):
+        """Cancel the operation of this thread"""
+        self.cancel_token.cancel()
+
 
 class ColorButton(QPushButton):
     """Custom button for color selection"""
@@ -284,12 +292,17 @@ class StyledScrollLabel(QScrollArea):
 
 
 class MainWindow(QMainWindow):
+    # Emitted from the reader monitor thread when a reader was plugged in or removed
+    nfc_state_changed = pyqtSignal(bool)
+
     def __init__(self):
         super().__init__()
         
         # NFC reader setup
         self.spool_reader = SpoolReader()
         self.current_nfc_thread = None
+        self.nfc_state_changed.connect(self.on_nfc_state_changed)
+        self.spool_reader.add_connection_listener(self.nfc_state_changed.emit)
         
         # Load filament presets
         self.load_filament_presets()
@@ -434,6 +447,8 @@ class MainWindow(QMainWindow):
                 "weight": 1000
             },
         }
+        # Encode the presets once, so writing them only needs to set the color
+        SpoolReader.image_cache.add_presets(self.filament_presets.values())
         
     def apply_global_styles(self):
         """Apply global stylesheet to the application"""
@@ -605,6 +620,14 @@ class MainWindow(QMainWindow):
             self.nfc_status_label.setText("Kein NFC Reader verbunden")
             self.nfc_status_label.setStyleSheet("color: #c0392b; font-weight: bold;")
         
+    def on_nfc_state_changed(self, connected):
+        """Handle a plugged in or removed NFC reader"""
+        self.update_nfc_status_display()
+        if connected:
+            self.status_bar.showMessage("NFC Reader verbunden", 5000)
+        else:
+            self.status_bar.showMessage("Kein NFC Reader gefunden", 0)
+        
     def setup_write_tab(self):
         layout = QVBoxLayout()
         layout.setSpacing(20)
@@ -770,6 +793,19 @@ class MainWindow(QMainWindow):
         temp_group.setLayout(temp_layout)
         layout.addWidget(temp_group)
         
+        # Write options
+        options_layout = QHBoxLayout()
+        self.verify_write = QCheckBox("Geschriebene Daten prüfen")
+        self.verify_write.setChecked(True)
+        self.verify_write.setToolTip("Liest die geschriebenen Daten zurück und schreibt fehlerhafte Seiten erneut")
+        self.differential_write = QCheckBox("Nur geänderte Daten schreiben")
+        self.differential_write.setToolTip("Liest den Tag zuerst und schreibt nur die Seiten, die sich unterscheiden")
+        options_layout.addStretch(1)
+        options_layout.addWidget(self.verify_write)
+        options_layout.addWidget(self.differential_write)
+        options_layout.addStretch(1)
+        layout.addLayout(options_layout)
+        
         # Bottom section - Write button
         button_layout = QHBoxLayout()
         self.write_button = StyledButton("NFC Tag schreiben", "SP_DialogApplyButton")
@@ -967,7 +1003,7 @@ class MainWindow(QMainWindow):
     def start_write_tag(self):
         """Start the NFC tag writing process"""
         if not self.spool_reader.get_connection_state():
-            QMessageBox.warning(self, "Fehler", "Kein NFC Reader gefunden. Bitte schließen Sie einen kompatiblen NFC Reader an und starten Sie die Anwendung neu.")
+            QMessageBox.warning(self, "Fehler", "Kein NFC Reader gefunden. Bitte schließen Sie einen kompatiblen NFC Reader an und versuchen Sie es erneut.")
             return
             
         self.status_bar.showMessage("Warte auf NFC Tag zum Beschreiben... Halten Sie ein Tag an den Reader.", 0)
@@ -975,14 +1011,16 @@ class MainWindow(QMainWindow):
         self.cancel_write_button.setEnabled(True)
         
         data = self.get_form_data()
-        self.current_nfc_thread = NFCThread(self.spool_reader, 'write', data)
+        self.current_nfc_thread = NFCThread(self.spool_reader, 'write', data,
+                                            differential=self.differential_write.isChecked(),
+                                            verify=self.verify_write.isChecked())
         self.current_nfc_thread.write_complete.connect(self.on_write_complete)
         self.current_nfc_thread.start()
     
     def start_read_tag(self):
         """Start the NFC tag reading process"""
         if not self.spool_reader.get_connection_state():
-            QMessageBox.warning(self, "Fehler", "Kein NFC Reader gefunden. Bitte schließen Sie einen kompatiblen NFC Reader an und starten Sie die Anwendung neu.")
+            QMessageBox.warning(self, "Fehler", "Kein NFC Reader gefunden. Bitte schließen Sie einen kompatiblen NFC Reader an und versuchen Sie es erneut.")
             return
             
         self.status_bar.showMessage("Warte auf NFC Tag zum Lesen... Halten Sie ein Tag an den Reader.", 0)
@@ -996,7 +1034,7 @@ class MainWindow(QMainWindow):
     def start_create_dump(self):
         """Start the NFC tag dump process"""
         if not self.spool_reader.get_connection_state():
-            QMessageBox.warning(self, "Fehler", "Kein NFC Reader gefunden. Bitte schließen Sie einen kompatiblen NFC Reader an und starten Sie die Anwendung neu.")
+            QMessageBox.warning(self, "Fehler", "Kein NFC Reader gefunden. Bitte schließen Sie einen kompatiblen NFC Reader an und versuchen Sie es erneut.")
             return
             
         self.status_bar.showMessage("Warte auf NFC Tag zum Erstellen eines Dumps... Halten Sie ein Tag an den Reader.", 0)
@@ -1011,7 +1049,7 @@ class MainWindow(QMainWindow):
     def cancel_nfc_operation(self):
         """Cancel any ongoing NFC operation"""
         if self.current_nfc_thread and self.current_nfc_thread.isRunning():
-            self.spool_reader.cancel_wait_for_tag()
+            self.current_nfc_thread.cancel()
             self.status_bar.showMessage("NFC Operation abgebrochen", 5000)
         
         self.write_button.setEnabled(True)
@@ -1130,17 +1168,28 @@ class MainWindow(QMainWindow):
         if not hasattr(self, 'current_dump_uid') or not self.dump_data.text() or self.dump_data.text() == "Keine Daten":
             return
             
-        filename, _ = QFileDialog.getSaveFileName(
+        filename, selected_filter = QFileDialog.getSaveFileName(
             self, 
             "Dump speichern",
             f"spool_dump_{self.current_dump_uid}.txt",
-            "Textdateien (*.txt)"
+            "Textdateien (*.txt);;Binäre Dumps (*.bin);;Proxmark3 Dumps (*.bin);;Dump-Archive (*.nfcarc)"
         )
         
         if filename:
             try:
-                with open(filename, 'w') as file:
-                    file.write(self.dump_data.text())
+                if not selected_filter or selected_filter.startswith("Textdateien"):
+                    with open(filename, 'w') as file:
+                        file.write(self.dump_data.text())
+                else:
+                    # Binary formats are created from the pages of the text dump
+                    card_data = next(DumpParser.parse_lines(self.dump_data.text().splitlines(), "dump")).card_data
+                    if selected_filter.startswith("Dump-Archive"):
+                        with DumpArchive(filename) as archive:
+                            archive.append(card_data, label=f"spool_dump_{self.current_dump_uid}")
+                    else:
+                        layout = BinaryDump.LAYOUT_PROXMARK if selected_filter.startswith("Proxmark3") \
+                            else BinaryDump.LAYOUT_RAW
+                        BinaryDump.save(card_data, filename, layout)
                 self.status_bar.showMessage(f"Dump wurde gespeichert als {filename}", 5000)
                 QMessageBox.information(self, "Speichern erfolgreich", f"Der Dump wurde erfolgreich gespeichert als:\n{filename}")
             except Exception as e:
@@ -1,2 +1,16 @@
-from .nfc_reader import NFCReader
-from .spool_reader import SpoolReader, SpoolData
+from .nfc_reader import NFCReader, CardSession, ReadResult, RetryPolicy, TagType, WriteResult
+from .spool_reader import SpoolReader, SpoolData, SpoolImageCache
+from .spec_schema import SpoolSpecsSchema
+from .spool_batch import SpoolBatch
+from .dump_parser import DumpParser, ParsedDump
+from .dump_archive import DumpArchive, ArchiveRecord, BinaryDump
+from .spool_scanner import SpoolScanner
+from .reader_pool import ReaderPool, PoolJob
+from .transport import Transport, PCSCTransport
+from .simulator import SimulatedTransport, SimulatedReader, VirtualNTAG213, VirtualNTAG215, VirtualNTAG216
+from .cancel_token import CancelToken
+from .tag_cache import TagCache, TagCacheEntry
+from .tag_layout import TagLayout, LayoutField
+from .sku_index import SkuIndex
+from .operation_queue import OperationQueue, QueuedOperation
+from .metrics import Metrics, Histogram, metrics
@@ -0,0 +1,76 @@
+import threading
+import time
+from typing import Callable, Optional
+
+
+class CancelToken:
+    """
+    Cancellation state and optional deadline of one operation (cancelling it doesn't affect other operations)
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        """
+        Create a token
+        :param timeout: Optional time in seconds after which the operation counts as cancelled
+        """
+        self.deadline: Optional[float] = time.monotonic() + timeout if timeout is not None else None
+        self.cancelled: threading.Event = threading.Event()
+        self.lock: threading.Lock = threading.Lock()
+        self.cancel_callbacks: list[Callable[[], None]] = []
+
+    def cancel(self) -> None:
+        """
+        Cancel the operation (wakes up its pending waits immediately)
+        """
+        with self.lock:
+            self.cancelled.set()
+            # Called while locked, so a removed callback is never called afterwards
+            for callback in self.cancel_callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"[Error] Cancel callback failed: {e}")
+
+    def is_cancelled(self) -> bool:
+        """
+        Check if the operation was cancelled or its deadline passed
+        :return: True if it should stop else False
+        """
+        return self.cancelled.is_set() or (self.deadline is not None and time.monotonic() >= self.deadline)
+
+    def get_deadline(self, timeout: Optional[float] = None) -> Optional[float]:
+        """
+        Get the deadline of a wait within the operation
+        :param timeout: Optional timeout of the wait in seconds
+        :return: The earlier one of the wait deadline and the operation deadline (monotonic time, None = no deadline)
+        """
+        if timeout is None:
+            return self.deadline
+        deadline: float = time.monotonic() + timeout
+        return min(deadline, self.deadline) if self.deadline is not None else deadline
+
+    def sleep(self, duration: float) -> bool:
+        """
+        Sleep unless the operation is cancelled
+        :param duration: Duration in seconds
+        :return: True if the full duration passed else False
+        """
+        deadline: Optional[float] = self.get_deadline(duration)
+        return not self.cancelled.wait(max(0.0, deadline - time.monotonic())) and not self.is_cancelled()
+
+    def add_cancel_callback(self, callback: Callable[[], None]) -> None:
+        """
+        Add a function that wakes up a pending wait of the operation
+        :param callback: Function that is called on cancel
+        """
+        with self.lock:
+            self.cancel_callbacks.append(callback)
+
+    def remove_cancel_callback(self, callback: Callable[[], None]) -> None:
+        """
+        Remove a cancel function (it isn't called anymore after this returns)
+        :param callback: The added function
+        """
+        with self.lock:
+            if callback in self.cancel_callbacks:
+                self.cancel_callbacks.remove(callback)
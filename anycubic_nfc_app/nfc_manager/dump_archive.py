@@ -0,0 +1,314 @@
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Any, BinaryIO, Iterable, Iterator, Optional, Union
+
+from .nfc_reader import CardData
+from .spool_reader import SpoolData
+
+
+def _create_card_data(data: bytes) -> CardData:
+    """
+    Create card data from a tag image
+    :param data: The tag image (4 bytes per page)
+    :return: SpoolData if the image has the page count of a spool tag else CardData
+    """
+    page_count: int = len(data) // CardData.page_size
+    card_data: CardData = SpoolData() if page_count == SpoolData.tag_page_count else CardData(page_count)
+    card_data.data[:] = data
+    return card_data
+
+
+class BinaryDump:
+    """
+    Import and export of binary NFC dumps (raw pages or Proxmark3 MIFARE Ultralight/NTAG dumps)
+    """
+
+    LAYOUT_RAW: str = "raw"  # Only the pages (e.g. nfc-mfultralight, NFC Tools)
+    LAYOUT_PROXMARK: str = "proxmark"  # 56 byte header (version, counters, signature) before the pages
+
+    proxmark_header: struct.Struct = struct.Struct("<8s2s1sB32s12s")
+    # GET_VERSION responses of the tag types by page count (part of the Proxmark3 header)
+    tag_versions: dict[int, bytes] = {
+        0x2d: bytes([0x00, 0x04, 0x04, 0x02, 0x01, 0x00, 0x0f, 0x03]),
+        0x87: bytes([0x00, 0x04, 0x04, 0x02, 0x01, 0x00, 0x11, 0x03]),
+        0xe7: bytes([0x00, 0x04, 0x04, 0x02, 0x01, 0x00, 0x13, 0x03])
+    }
+
+    @classmethod
+    def get_layout(cls, data: bytes) -> str:
+        """
+        Detect the layout of a binary dump
+        :param data: The dump
+        :return: The layout
+        """
+        header_size: int = cls.proxmark_header.size
+        if len(data) > header_size and (len(data) - header_size) // 4 == data[11] + 1 \
+                and (len(data) - header_size) % 4 == 0:
+            return cls.LAYOUT_PROXMARK
+        if len(data) % 4 == 0 and data:
+            return cls.LAYOUT_RAW
+        raise ValueError(f"Unknown binary dump layout ({len(data)} bytes)")
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> CardData:
+        """
+        Import a binary dump
+        :param data: The dump
+        :return: The card data (SpoolData if it has the page count of a spool tag)
+        """
+        if cls.get_layout(data) == cls.LAYOUT_PROXMARK:
+            data = data[cls.proxmark_header.size:]
+        return _create_card_data(data)
+
+    @classmethod
+    def to_bytes(cls, card_data: CardData, layout: str = LAYOUT_RAW) -> bytes:
+        """
+        Export card data as binary dump
+        :param card_data: The card data
+        :param layout: The layout of the dump
+        :return: The dump
+        """
+        if layout == cls.LAYOUT_RAW:
+            return bytes(card_data.data)
+        if layout == cls.LAYOUT_PROXMARK:
+            page_count: int = len(card_data.pages)
+            header: bytes = cls.proxmark_header.pack(cls.tag_versions.get(page_count, bytes(8)), bytes(2), bytes(1),
+                                                     page_count - 1, bytes(32), bytes(12))
+            return header + bytes(card_data.data)
+        raise ValueError(f"Unknown binary dump layout: {layout}")
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike]) -> CardData:
+        """
+        Import a binary dump file
+        :param path: Path of the file
+        :return: The card data
+        """
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
+
+    @classmethod
+    def save(cls, card_data: CardData, path: Union[str, os.PathLike], layout: str = LAYOUT_RAW) -> None:
+        """
+        Export card data to a binary dump file
+        :param card_data: The card data
+        :param path: Path of the file
+        :param layout: The layout of the dump
+        """
+        with open(path, "wb") as file:
+            file.write(cls.to_bytes(card_data, layout))
+
+
+class ArchiveRecord:
+    """
+    A record of a dump archive (its image is a view of the archive file)
+    """
+
+    def __init__(self, index: int, uid: str, timestamp: float, label: str, image: memoryview):
+        """
+        Create a record
+        :param index: Index of the record in the archive
+        :param uid: Uid of the tag (hex)
+        :param timestamp: Time when the dump was added (unix time)
+        :param label: Label of the dump (e.g. the source file)
+        :param image: The tag image (read-only view)
+        """
+        self.index: int = index
+        self.uid: str = uid
+        self.timestamp: float = timestamp
+        self.label: str = label
+        self.image: memoryview = image
+
+    def get_card_data(self) -> CardData:
+        """
+        Get a copy of the tag image as card data
+        :return: The card data (SpoolData if it has the page count of a spool tag)
+        """
+        return _create_card_data(self.image)
+
+
+class DumpArchive:
+    """
+    Append-only archive of tag images with fixed-size records (random access through mmap, indexed by uid)
+    """
+
+    magic: bytes = b"ACNFCARC"
+    format_version: int = 1
+    # Magic, format version, pages per image, record size
+    header_struct: struct.Struct = struct.Struct("<8sHHH18x")
+    # Uid, timestamp, label (followed by the image)
+    record_struct: struct.Struct = struct.Struct("<7sxd48s")
+
+    def __init__(self, path: Union[str, os.PathLike], page_count: int = SpoolData.tag_page_count):
+        """
+        Open an archive (it is created if it doesn't exist)
+        :param path: Path of the archive file
+        :param page_count: Pages per image of a new archive (existing archives keep theirs)
+        """
+        self.path: str = os.fspath(path)
+        self.lock: threading.Lock = threading.Lock()
+        self.mmap: Optional[mmap.mmap] = None
+        self.uid_index: dict[str, list[int]] = {}
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            with open(self.path, "wb") as file:
+                file.write(self.header_struct.pack(self.magic, self.format_version, page_count,
+                                                   self.record_struct.size + page_count * CardData.page_size))
+        self.file: BinaryIO = open(self.path, "r+b")
+        magic, version, self.page_count, self.record_size = self.header_struct.unpack(
+            self.file.read(self.header_struct.size))
+        if magic != self.magic or version != self.format_version:
+            self.file.close()
+            raise ValueError(f"{self.path} is not a dump archive (or has an unsupported version)")
+        self.image_size: int = self.page_count * CardData.page_size
+        # Drop an incomplete record (e.g. from an interrupted write)
+        size: int = os.path.getsize(self.path)
+        self.record_count: int = (size - self.header_struct.size) // self.record_size
+        if self.header_struct.size + self.record_count * self.record_size != size:
+            self.file.truncate(self.header_struct.size + self.record_count * self.record_size)
+        self._build_index()
+
+    def __enter__(self) -> "DumpArchive":
+        """
+        Use the archive as context manager
+        :return: The archive
+        """
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """
+        Close the archive at the end of the context
+        :param args: Exception info
+        """
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the archive file
+        """
+        with self.lock:
+            if self.mmap is not None:
+                try:
+                    self.mmap.close()
+                except BufferError:
+                    pass  # Records are still in use (the map is closed with them)
+                self.mmap = None
+            self.file.close()
+
+    def __len__(self) -> int:
+        """
+        Get the number of records
+        :return: Number of records
+        """
+        return self.record_count
+
+    def _get_mmap(self) -> Optional[mmap.mmap]:
+        """
+        Get the memory map of the archive (mapped again after appends)
+        :return: The memory map or None if the archive has no records
+        """
+        size: int = self.header_struct.size + self.record_count * self.record_size
+        if self.mmap is None or len(self.mmap) < size:
+            # A previous map is not closed, so views of its records stay valid
+            self.mmap = mmap.mmap(self.file.fileno(), size, access=mmap.ACCESS_READ) if self.record_count else None
+        return self.mmap
+
+    def _build_index(self) -> None:
+        """
+        Index the records by uid
+        """
+        records: Optional[mmap.mmap] = self._get_mmap()
+        self.uid_index = {}
+        for index in range(self.record_count):
+            offset: int = self.header_struct.size + index * self.record_size
+            self.uid_index.setdefault(records[offset:offset + 7].hex(), []).append(index)
+
+    def append(self, card_data: CardData, label: str = "", timestamp: Optional[float] = None) -> int:
+        """
+        Add a tag image
+        :param card_data: The card data (must not have more pages than the images of the archive)
+        :param label: Optional label (e.g. the source file, max 48 bytes)
+        :param timestamp: Optional time of the dump (unix time, default: now)
+        :return: Index of the record
+        """
+        if len(card_data.data) > self.image_size:
+            raise ValueError(f"The archive only stores images with up to {self.page_count} pages")
+        uid: bytes = bytes(card_data.data[0:3] + card_data.data[4:8])
+        record: bytes = self.record_struct.pack(uid, time.time() if timestamp is None else timestamp,
+                                                label.encode("utf-8")[:48])
+        image: bytes = bytes(card_data.data).ljust(self.image_size, b"\x00")
+        with self.lock:
+            self.file.seek(0, os.SEEK_END)
+            self.file.write(record + image)
+            self.file.flush()
+            index: int = self.record_count
+            self.record_count += 1
+            self.uid_index.setdefault(uid.hex(), []).append(index)
+        return index
+
+    def extend(self, card_data: Iterable[CardData], label: str = "") -> int:
+        """
+        Add many tag images (e.g. the results of the dump parser)
+        :param card_data: The card data
+        :param label: Optional label of all images
+        :return: Number of added images
+        """
+        count: int = 0
+        for data in card_data:
+            self.append(data, label)
+            count += 1
+        return count
+
+    def get_image(self, index: int) -> memoryview:
+        """
+        Get a tag image without copying it
+        :param index: Index of the record
+        :return: Read-only view of the image
+        """
+        return self.get_record(index).image
+
+    def get_record(self, index: int) -> ArchiveRecord:
+        """
+        Get a record
+        :param index: Index of the record
+        :return: The record (its image is a view of the archive)
+        """
+        if not 0 <= index < self.record_count:
+            raise IndexError(f"Record {index} is out of range")
+        with self.lock:
+            records: mmap.mmap = self._get_mmap()
+        offset: int = self.header_struct.size + index * self.record_size
+        uid, timestamp, label = self.record_struct.unpack_from(records, offset)
+        image_offset: int = offset + self.record_struct.size
+        return ArchiveRecord(index, uid.hex(), timestamp, label.rstrip(b"\x00").decode("utf-8", errors="replace"),
+                             memoryview(records)[image_offset:image_offset + self.image_size])
+
+    def find(self, uid: str) -> list[ArchiveRecord]:
+        """
+        Get the records of a tag
+        :param uid: Uid of the tag (hex)
+        :return: The records (oldest first)
+        """
+        return [self.get_record(index) for index in self.uid_index.get(uid.lower(), [])]
+
+    def __iter__(self) -> Iterator[ArchiveRecord]:
+        """
+        Iterate over the records
+        :return: Iterator of the records
+        """
+        return (self.get_record(index) for index in range(self.record_count))
+
+    def get_images(self) -> Any:
+        """
+        Get all images as NumPy array without copying them (e.g. for SpoolBatch.decode(), requires NumPy)
+        :return: Read-only N x image size uint8 array
+        """
+        import numpy as np
+        records: Optional[mmap.mmap] = self._get_mmap()
+        if records is None:
+            return np.zeros((0, self.image_size), dtype=np.uint8)
+        return np.ndarray((self.record_count, self.image_size), dtype=np.uint8, buffer=records,
+                          offset=self.header_struct.size + self.record_struct.size,
+                          strides=(self.record_size, 1))
@@ -0,0 +1,133 @@
+import json
+import os
+import re
+from typing import Any, Iterable, Iterator, Optional, TextIO, Union
+
+from .nfc_reader import CardData
+from .spool_reader import SpoolData
+
+
+class ParsedDump:
+    """
+    A dump that was parsed back into card data
+    """
+
+    def __init__(self, source: str, index: int, card_data: CardData, interpretation: Optional[dict[str, Any]]):
+        """
+        Create a parsed dump
+        :param source: Name of the file (or stream) that contained the dump
+        :param index: Index of the dump within its source (files can contain several dumps)
+        :param card_data: The pages (a SpoolData object if the dump has the page count of a spool tag)
+        :param interpretation: The JSON interpretation after the pages (None if there is none)
+        """
+        self.source: str = source
+        self.index: int = index
+        self.card_data: CardData = card_data
+        self.interpretation: Optional[dict[str, Any]] = interpretation
+
+
+class DumpParser:
+    """
+    Streaming parser for text dumps ("[Page xx] aa:bb:cc:dd" lines, optionally followed by a JSON interpretation)
+    """
+
+    # Page line of a dump (annotations after the data, like the ones in format.md, are ignored)
+    page_pattern: re.Pattern = re.compile(r"^\s*\[Page ([0-9a-fA-F]+)]\s+((?:[0-9a-fA-F]{2}:){3}[0-9a-fA-F]{2})")
+    # File extensions of dumps in directories
+    dump_extensions: tuple[str, ...] = (".txt",)
+
+    @classmethod
+    def _create_dump(cls, source: str, index: int, pages: dict[int, bytes], text: list[str]) -> ParsedDump:
+        """
+        Create a parsed dump from the collected lines
+        :param source: Name of the source
+        :param index: Index of the dump within the source
+        :param pages: Page data by page number (missing pages are zero)
+        :param text: The lines after the pages
+        :return: The parsed dump
+        """
+        page_count: int = max(pages) + 1
+        card_data: CardData = SpoolData() if page_count == SpoolData.tag_page_count else CardData(page_count)
+        for page, page_data in pages.items():
+            card_data.pages[page] = page_data
+        interpretation: Optional[dict[str, Any]] = None
+        json_text: str = "".join(text).strip()
+        if json_text.startswith("{"):
+            try:
+                interpretation = json.loads(json_text)
+            except ValueError:
+                print(f"[Error] Invalid interpretation of dump {index} in {source}.")
+        return ParsedDump(source, index, card_data, interpretation)
+
+    @classmethod
+    def parse_lines(cls, lines: Iterable[str], source: str = "<lines>") -> Iterator[ParsedDump]:
+        """
+        Parse dumps from lines of text (a dump ends where the next one starts with a lower page number)
+        :param lines: The lines (e.g. an opened file)
+        :param source: Name of the source (for the results and errors)
+        :return: The parsed dumps (yielded one by one)
+        """
+        pages: dict[int, bytes] = {}
+        text: list[str] = []
+        has_text: bool = False
+        last_page: int = -1
+        index: int = 0
+        for line in lines:
+            match: Optional[re.Match] = cls.page_pattern.match(line)
+            if match is None:
+                if pages:
+                    text.append(line)
+                    has_text = has_text or bool(line.strip())
+                continue
+            page: int = int(match.group(1), 16)
+            if pages and (page <= last_page or has_text):
+                yield cls._create_dump(source, index, pages, text)
+                index += 1
+                pages, text, has_text = {}, [], False
+            pages[page] = bytes.fromhex(match.group(2).replace(":", ""))
+            last_page = page
+        if pages:
+            yield cls._create_dump(source, index, pages, text)
+
+    @classmethod
+    def parse_file(cls, file: Union[str, os.PathLike, TextIO]) -> Iterator[ParsedDump]:
+        """
+        Parse the dumps of a file
+        :param file: Path or opened text stream
+        :return: The parsed dumps (yielded one by one)
+        """
+        if not isinstance(file, (str, os.PathLike)):
+            yield from cls.parse_lines(file, getattr(file, "name", "<stream>"))
+            return
+        try:
+            with open(file, "r", encoding="utf-8", errors="replace") as stream:
+                yield from cls.parse_lines(stream, os.fspath(file))
+        except OSError as e:
+            print(f"[Error] Failed to read dump file {os.fspath(file)}: {e}")
+
+    @classmethod
+    def _walk(cls, directory: Union[str, os.PathLike]) -> Iterator[str]:
+        """
+        Get the dump files in a directory and its subdirectories (sorted)
+        :param directory: Path of the directory
+        :return: The paths of the files (yielded one by one)
+        """
+        for root, directories, files in os.walk(directory):
+            directories.sort()
+            for file in sorted(files):
+                if file.lower().endswith(cls.dump_extensions):
+                    yield os.path.join(root, file)
+
+    @classmethod
+    def parse(cls, sources: Iterable[Union[str, os.PathLike, TextIO]]) -> Iterator[ParsedDump]:
+        """
+        Parse the dumps of files and directories lazily (only one file is opened at a time)
+        :param sources: Paths of files or directories or opened text streams (e.g. a generator)
+        :return: The parsed dumps (yielded one by one)
+        """
+        for source in sources:
+            if isinstance(source, (str, os.PathLike)) and os.path.isdir(source):
+                for path in cls._walk(source):
+                    yield from cls.parse_file(path)
+            else:
+                yield from cls.parse_file(source)
@@ -0,0 +1,171 @@
+import copy
+import math
+import threading
+from collections import deque
+from typing import Any, Optional
+
+
+class Histogram:
+    """
+    Duration samples with percentiles (only the latest samples are kept)
+    """
+
+    def __init__(self, max_samples: int = 2048):
+        """
+        Create an empty histogram
+        :param max_samples: Number of samples to keep for the percentiles
+        """
+        self.samples: deque[float] = deque(maxlen=max_samples)
+        self.count: int = 0
+        self.total: float = 0.0
+        self.maximum: float = 0.0
+
+    def add(self, value: float) -> None:
+        """
+        Add a sample
+        :param value: Duration in seconds
+        """
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+
+    def copy(self) -> "Histogram":
+        """
+        Get a snapshot of the histogram (e.g. to compute the percentiles outside of a lock)
+        :return: The copy
+        """
+        histogram: Histogram = copy.copy(self)
+        histogram.samples = self.samples.copy()
+        return histogram
+
+    def percentile(self, percent: float) -> float:
+        """
+        Get a percentile of the kept samples (nearest rank)
+        :param percent: Percentile (0-100)
+        :return: The duration in seconds (0 without samples)
+        """
+        if not self.samples:
+            return 0.0
+        samples: list[float] = sorted(self.samples)
+        index: int = min(len(samples) - 1, max(0, math.ceil(percent / 100 * len(samples)) - 1))
+        return samples[index]
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Convert the histogram to JSON data
+        :return: JSON data (durations in milliseconds)
+        """
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1000,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "max_ms": self.maximum * 1000,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "p99_ms": self.percentile(99) * 1000
+        }
+
+
+class Metrics:
+    """
+    In-process metrics of the APDUs and operations of all readers
+    """
+
+    def __init__(self):
+        """
+        Create empty metrics
+        """
+        self.lock: threading.Lock = threading.Lock()
+        self.apdus: dict[tuple[str, str, str], Histogram] = {}
+        self.operations: dict[tuple[str, str, bool], Histogram] = {}
+
+    @classmethod
+    def get_command_type(cls, command: list[int]) -> str:
+        """
+        Get the type of an APDU
+        :param command: The APDU
+        :return: Name of the command
+        """
+        if command[:4] == [0xff, 0x00, 0x00, 0x00] and command[5:7] == [0xd4, 0x42] and len(command) > 7:
+            return {0x30: "ntag_read", 0x3a: "ntag_fast_read", 0x60: "ntag_get_version",
+                    0xa2: "ntag_write"}.get(command[7], "direct_transmit")
+        if command[:2] == [0xff, 0xb0]:
+            return "read_binary"
+        if command[:2] == [0xff, 0xd6]:
+            return "update_binary"
+        if command[:2] == [0xff, 0xca]:
+            return "get_data"
+        return "other"
+
+    def record_apdu(self, reader_name: str, command: list[int], status: Optional[tuple[int, int]],
+                    duration: float) -> None:
+        """
+        Record a transmitted APDU
+        :param reader_name: Name of the reader
+        :param command: The APDU
+        :param status: Status words (None if the transmission failed)
+        :param duration: Duration in seconds
+        """
+        status_name: str = f"{status[0]:02x}{status[1]:02x}" if status else "error"
+        key: tuple[str, str, str] = (reader_name, self.get_command_type(command), status_name)
+        with self.lock:
+            if key not in self.apdus:
+                self.apdus[key] = Histogram()
+            self.apdus[key].add(duration)
+
+    def record_operation(self, reader_name: str, operation: str, success: bool, duration: float) -> None:
+        """
+        Record an operation (e.g. read_card)
+        :param reader_name: Name of the reader
+        :param operation: Name of the operation
+        :param success: Success state
+        :param duration: Duration in seconds
+        """
+        key: tuple[str, str, bool] = (reader_name, operation, success)
+        with self.lock:
+            if key not in self.operations:
+                self.operations[key] = Histogram()
+            self.operations[key].add(duration)
+
+    def get_apdu_stats(self, reader_name: Optional[str] = None) -> list[dict[str, Any]]:
+        """
+        Get the APDU statistics
+        :param reader_name: Optional reader to filter for
+        :return: Statistics per reader, command type and status words
+        """
+        with self.lock:
+            return [{"reader": key[0], "command": key[1], "status": key[2], **histogram.to_dict()}
+                    for key, histogram in self.apdus.items() if reader_name in (None, key[0])]
+
+    def get_operation_stats(self, reader_name: Optional[str] = None) -> list[dict[str, Any]]:
+        """
+        Get the operation statistics
+        :param reader_name: Optional reader to filter for
+        :return: Statistics per reader, operation and success state
+        """
+        with self.lock:
+            return [{"reader": key[0], "operation": key[1], "success": key[2], **histogram.to_dict()}
+                    for key, histogram in self.operations.items() if reader_name in (None, key[0])]
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Convert all metrics to JSON data
+        :return: JSON data
+        """
+        return {
+            "apdus": self.get_apdu_stats(),
+            "operations": self.get_operation_stats()
+        }
+
+    def reset(self) -> None:
+        """
+        Remove all recorded data
+        """
+        with self.lock:
+            self.apdus.clear()
+            self.operations.clear()
+
+
+# Metrics of all readers in this process
+metrics: Metrics = Metrics()
@@ -1,23 +1,158 @@
 import threading
 import time
-from typing import List, Optional
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Union
 
 from smartcard.CardConnection import CardConnection
-from smartcard.System import readers
+from smartcard.Exceptions import CardConnectionException, NoCardException
 from smartcard.reader.Reader import Reader
+from smartcard.scard import (SCARD_E_TIMEOUT, SCARD_S_SUCCESS, SCARD_STATE_CHANGED, SCARD_STATE_PRESENT,
+                             SCARD_STATE_UNAVAILABLE, SCARD_STATE_UNAWARE, SCARD_STATE_UNKNOWN)
+
+from .cancel_token import CancelToken
+from .metrics import Metrics, metrics as default_metrics
+from .reader_monitor import ReaderMonitor
+from .tag_cache import TagCache, TagCacheEntry
+from .transport import PCSCTransport, Transport
+
+
+class CommandNotSupportedError(Exception):
+    """
+    The reader rejected a command (as opposed to a failed tag communication, it fails every time)
+    """
+
+
+class CardRemovedError(Exception):
+    """
+    The connection to the card was lost during an operation (e.g. the tag was lifted, retries can't help)
+    """
+
+
+class CardPages:
+    """
+    List-like view of the pages of card data (every page is a memoryview of the data, so changes apply in place)
+    """
+
+    __slots__ = ("card_data",)
+
+    def __init__(self, card_data: "CardData"):
+        """
+        Create a view
+        :param card_data: The viewed card data
+        """
+        self.card_data: CardData = card_data
+
+    def __len__(self) -> int:
+        """
+        Get the number of pages
+        :return: Number of pages
+        """
+        return len(self.card_data.data) // CardData.page_size
+
+    def __getitem__(self, page: Union[int, slice]) -> Union[memoryview, list[memoryview]]:
+        """
+        Get a page (or a list of pages for a slice)
+        :param page: Page number or slice
+        :return: The page data (writable view of the card data)
+        """
+        if isinstance(page, slice):
+            return [self.card_data.get_page(i) for i in range(*page.indices(len(self)))]
+        return self.card_data.get_page(page if page >= 0 else page + len(self))
+
+    def __setitem__(self, page: Union[int, slice], data: Any) -> None:
+        """
+        Overwrite a page (or a contiguous page range for a slice)
+        :param page: Page number or slice
+        :param data: Page data (4 bytes) or a list of page data for a slice
+        """
+        if isinstance(page, slice):
+            start, stop, step = page.indices(len(self))
+            if step != 1 or len(data) != max(0, stop - start):
+                raise ValueError("Page slices can only be replaced by the same number of pages")
+            for i, page_data in enumerate(data):
+                self.card_data.set_page(start + i, page_data)
+            return
+        self.card_data.set_page(page if page >= 0 else page + len(self), data)
+
+    def __iter__(self) -> Iterator[memoryview]:
+        """
+        Iterate over the pages
+        :return: Iterator of the page data
+        """
+        return (self.card_data.get_page(i) for i in range(len(self)))
+
+    def __eq__(self, other: Any) -> bool:
+        """
+        Compare the pages with other pages
+        :param other: Page list or view
+        :return: True if all pages are equal else False
+        """
+        try:
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        except TypeError:
+            return NotImplemented
 
 
 class CardData:
     """
-    Card data
+    Card data (all pages in one contiguous buffer)
     """
 
+    __slots__ = ("data",)
+
+    page_size: int = 4
+
     def __init__(self, page_count: int = 0x2d):
         """
         Create card data object
         :param page_count: Number of pages
         """
-        self.pages: list[bytes] = page_count * [b"\x00\x00\x00\x00"]
+        self.data: bytearray = bytearray(page_count * self.page_size)
+
+    @property
+    def pages(self) -> CardPages:
+        """
+        Get the pages
+        :return: List-like view of the pages (changes apply to the data)
+        """
+        return CardPages(self)
+
+    @pages.setter
+    def pages(self, pages: Iterable[bytes]) -> None:
+        """
+        Replace all pages (copies the data, the number of pages may change)
+        :param pages: Page data (4 bytes each)
+        """
+        if isinstance(pages, CardPages):
+            self.data = bytearray(pages.card_data.data)
+            return
+        data: bytearray = bytearray(b"".join(pages))
+        if len(data) % self.page_size:
+            raise ValueError(f"Every page has to contain {self.page_size} bytes")
+        self.data = data
+
+    def get_page(self, page: int) -> memoryview:
+        """
+        Get a page without copying it
+        :param page: Page number
+        :return: Writable view of the page data
+        """
+        if not 0 <= page < len(self.data) // self.page_size:
+            raise IndexError(f"Page {page:02x} is out of range")
+        return memoryview(self.data)[page * self.page_size:(page + 1) * self.page_size]
+
+    def set_page(self, page: int, page_data: bytes) -> None:
+        """
+        Overwrite a page in place
+        :param page: Page number
+        :param page_data: Page data (4 bytes)
+        """
+        if not 0 <= page < len(self.data) // self.page_size:
+            raise IndexError(f"Page {page:02x} is out of range")
+        if len(page_data) != self.page_size:
+            raise ValueError(f"Every page has to contain {self.page_size} bytes")
+        self.data[page * self.page_size:(page + 1) * self.page_size] = page_data
 
     def dump(self) -> str:
         """
@@ -31,6 +166,231 @@ class CardData:
         return "\n".join(pages)
 
 
+class WriteResult:
+    """
+    Result of a card write with the state of every page
+    """
+
+    PAGE_UNCHANGED: str = "unchanged"  # Skipped, because the card already contained the data
+    PAGE_WRITTEN: str = "written"  # Written, but not verified
+    PAGE_VERIFIED: str = "verified"  # Written and verified on the first try
+    PAGE_REWRITTEN: str = "rewritten"  # Verified after at least one retry
+    PAGE_FAILED: str = "failed"  # Could not be written (or verified)
+
+    def __init__(self):
+        """
+        Create an empty result
+        """
+        self.success: bool = False
+        self.pages: dict[int, str] = {}
+
+    def get_pages(self, state: str) -> list[int]:
+        """
+        Get all pages with a state
+        :param state: Page state
+        :return: Page numbers
+        """
+        return [page for page, page_state in self.pages.items() if page_state == state]
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Convert the result to JSON data
+        :return: JSON data
+        """
+        return {
+            "success": self.success,
+            "pages": {f"{page:02x}": state for page, state in self.pages.items()}
+        }
+
+
+class TagType:
+    """
+    Memory layout of a tag type
+    """
+
+    def __init__(self, name: str, page_count: int, user_start: int, user_end: int):
+        """
+        Create a tag type
+        :param name: Name of the chip
+        :param page_count: Number of pages
+        :param user_start: First page of the user memory
+        :param user_end: First page after the user memory (the lock and configuration pages follow)
+        """
+        self.name: str = name
+        self.page_count: int = page_count
+        self.user_start: int = user_start
+        self.user_end: int = user_end
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Convert the tag type to JSON data
+        :return: JSON data
+        """
+        return {
+            "name": self.name,
+            "page_count": self.page_count,
+            "user_start": self.user_start,
+            "user_end": self.user_end
+        }
+
+
+class ReadResult:
+    """
+    Result of a card read (with the reason of a failure)
+    """
+
+    ERROR_NO_CARD: str = "no_card"  # No card was found (timeout, cancelled or no reader)
+    ERROR_READ_FAILED: str = "read_failed"  # Some pages could not be read (e.g. the card is slightly out of range)
+    ERROR_CARD_REMOVED: str = "card_removed"  # The card was removed during the read
+
+    def __init__(self, data: Optional[CardData] = None, error: Optional[str] = None,
+                 failed_pages: Optional[list[int]] = None, attempts: int = 0, tag_type: Optional[TagType] = None,
+                 cached: bool = False):
+        """
+        Create a result
+        :param data: The read data (None on failure)
+        :param error: Reason of the failure (None on success)
+        :param failed_pages: Pages that could not be read
+        :param attempts: Number of read attempts (1 = no retry was needed, 0 = served from the tag cache)
+        :param tag_type: Detected tag type
+        :param cached: True if the data was served from the tag cache (only the uid was read)
+        """
+        self.data: Optional[CardData] = data
+        self.error: Optional[str] = error
+        self.failed_pages: list[int] = failed_pages or []
+        self.attempts: int = attempts
+        self.tag_type: Optional[TagType] = tag_type
+        self.cached: bool = cached
+
+    @property
+    def success(self) -> bool:
+        """
+        Success state
+        :return: True if the data was read else False
+        """
+        return self.data is not None
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Convert the result to JSON data (without the read data)
+        :return: JSON data
+        """
+        return {
+            "success": self.success,
+            "error": self.error,
+            "failed_pages": [f"{page:02x}" for page in self.failed_pages],
+            "attempts": self.attempts,
+            "tag_type": self.tag_type.name if self.tag_type else None,
+            "cached": self.cached
+        }
+
+
+class RetryPolicy:
+    """
+    Retries of failed pages with exponential backoff
+    """
+
+    def __init__(self, retries: int = 4, initial_delay: float = 0.01, multiplier: float = 2.0,
+                 max_delay: float = 0.2):
+        """
+        Create a policy
+        :param retries: Number of retries after the first attempt
+        :param initial_delay: Delay before the first retry in seconds
+        :param multiplier: Factor of the delay for every further retry
+        :param max_delay: Maximum delay in seconds
+        """
+        self.retries: int = retries
+        self.initial_delay: float = initial_delay
+        self.multiplier: float = multiplier
+        self.max_delay: float = max_delay
+
+    def get_delay(self, retry: int) -> float:
+        """
+        Get the delay before a retry
+        :param retry: Number of the retry (0 = first retry)
+        :return: Delay in seconds
+        """
+        return min(self.max_delay, self.initial_delay * self.multiplier ** retry)
+
+
+class CardSession:
+    """
+    A connection to a card that is reused for several operations (valid until the card leaves the field)
+    """
+
+    def __init__(self, reader: "NFCReader", connection: CardConnection, token: Optional[CancelToken] = None):
+        """
+        Create a session
+        :param reader: The reader of the card
+        :param connection: Connection to the card
+        :param token: Optional cancel token of the operation (stops retries)
+        """
+        self.reader: NFCReader = reader
+        self.connection: CardConnection = connection
+        self.token: CancelToken = token or CancelToken()
+
+    def read_pages(self, start: int, count: int) -> Optional[list[bytes]]:
+        """
+        Read a page range (failed pages are retried)
+        :param start: First page
+        :param count: Number of pages
+        :return: The read pages on success else None
+        """
+        pages, attempts, removed = self.reader._read_pages_retrying(self.connection, start, count, self.token)
+        if any(page_data is None for page_data in pages):
+            return None
+        return pages
+
+    def get_tag_type(self) -> TagType:
+        """
+        Get the type of the card (detected on the first call for every uid)
+        :return: The tag type
+        """
+        return self.reader._get_tag_type(self.connection)
+
+    def read_card_detailed(self, page_count: Optional[int] = None, cached: Optional[bool] = None) -> ReadResult:
+        """
+        Read data from card (failed pages are retried)
+        :param page_count: Number of pages on the card (None = detect the tag type)
+        :param cached: Serve a recently read or written card from the tag cache (None = use_tag_cache, False = force)
+        :return: The read result
+        """
+        return self.reader._read_card(self.connection, page_count, self.token, cached)
+
+    def read_card(self, page_count: Optional[int] = None, cached: Optional[bool] = None) -> Optional[CardData]:
+        """
+        Read data from card (failed pages are retried)
+        :param page_count: Number of pages on the card (None = detect the tag type)
+        :param cached: Serve a recently read or written card from the tag cache (None = use_tag_cache, False = force)
+        :return: The data of the card on success else None
+        """
+        return self.read_card_detailed(page_count, cached).data
+
+    def write_card_detailed(self, card_data: CardData, page_count: Optional[int] = None, differential: bool = False,
+                            verify: bool = False) -> WriteResult:
+        """
+        Write data to card and report the state of every page
+        :param card_data: Data to write
+        :param page_count: Number of pages on the card (None = detect the tag type)
+        :param differential: Read the card first and only write the pages that differ
+        :param verify: Read the written pages back and rewrite the ones that don't match
+        :return: The write result
+        """
+        return self.reader._write_card(self.connection, card_data, page_count, differential, verify)
+
+    def write_card(self, card_data: CardData, page_count: Optional[int] = None, differential: bool = False,
+                   verify: bool = False) -> bool:
+        """
+        Write data to card
+        :param card_data: Data to write
+        :param page_count: Number of pages on the card (None = detect the tag type)
+        :param differential: Read the card first and only write the pages that differ
+        :param verify: Read the written pages back and rewrite the ones that don't match
+        :return: Success state
+        """
+        return self.write_card_detailed(card_data, page_count, differential, verify).success
+
+
 class NFCReader:
     """
     A wrapper for NFC reader devices
@@ -43,55 +403,183 @@ class NFCReader:
     ]
     preferred_reader: Optional[str] = None
 
-    def __init__(self):
+    # Raw NTAG commands are wrapped in the PN53x InCommunicateThru command and sent as direct transmit pseudo-APDU
+    direct_transmit_header: list[int] = [0xFF, 0x00, 0x00, 0x00]
+    in_communicate_thru: list[int] = [0xD4, 0x42]
+    in_communicate_thru_response: list[int] = [0xD5, 0x43, 0x00]
+    ntag_read: int = 0x30  # Returns 4 pages (16 bytes)
+    ntag_fast_read: int = 0x3a  # Returns a page range
+    ntag_get_version: int = 0x60  # Returns the chip type
+    fast_read_max_pages: int = 0x10  # Keep responses well below the frame size of the reader
+
+    # Read modes (ordered from fastest to slowest)
+    READ_MODE_FAST_READ: str = "fast_read"
+    READ_MODE_READ: str = "read"
+    READ_MODE_PAGE: str = "page"
+
+    # Tag types by the storage size byte of the GET_VERSION response
+    tag_types: dict[int, TagType] = {
+        0x0f: TagType("NTAG213", 0x2d, 0x04, 0x28),
+        0x11: TagType("NTAG215", 0x87, 0x04, 0x82),
+        0x13: TagType("NTAG216", 0xe7, 0x04, 0xe2)
+    }
+    default_tag_type: TagType = tag_types[0x0f]  # Used if the type can't be detected
+    tag_type_cache_size: int = 256  # Number of uids whose tag type is remembered
+    # Serve reads of recently read or written cards from the tag cache (only the uid is read from the card)
+    use_tag_cache: bool = False
+
+    # Number of rewrites of pages that failed verification
+    verify_retries: int = 2
+    # Retries of pages that could not be read
+    retry_policy: RetryPolicy = RetryPolicy()
+    retry_chunk_pages: int = 4  # Retried page ranges are split into chunks of this size (one NTAG READ)
+
+    # Default time to wait for a tag in seconds (None = wait until cancelled)
+    card_timeout: Optional[float] = None
+    # Maximum duration of one blocking status change request in seconds (limits the effect of missed cancel calls)
+    status_change_slice: float = 1.0
+    # Metrics of the transmitted APDUs and the operations
+    metrics: Metrics = default_metrics
+    # Optional hook to run blocking PC/SC calls (e.g. eventlet.tpool.execute to keep green threads responsive)
+    blocking_call: Optional[Callable[..., Any]] = None
+
+    def __init__(self, reader_monitor: Optional[ReaderMonitor] = None, reader_name: Optional[str] = None,
+                 transport: Optional[Transport] = None):
         """
         Create an instance
+        :param reader_monitor: Optional monitor to share with other instances (else a new one is started)
+        :param reader_name: Optional exact name of the reader to use (else the reader is selected automatically)
+        :param transport: Optional access to the readers (default: the one of the monitor or the PC/SC service)
         """
-        self.waiting_for_tag: bool = False
-        self.reader: Optional[Reader] = self._get_reader()
-        checker_thread = threading.Thread(target=self.update_connection_state)
-        checker_thread.daemon = True
-        checker_thread.start()
+        if transport is None:
+            transport = reader_monitor.transport if reader_monitor else PCSCTransport()
+        self.transport: Transport = transport
+        self.reader_name: Optional[str] = reader_name
+        self.lock: threading.Lock = threading.Lock()
+        self.active_tokens: set[CancelToken] = set()  # Cancel tokens of the pending operations
+        self.idle_contexts: list[int] = []  # PC/SC contexts for status change requests (one per pending wait)
+        self.tag_type_cache: OrderedDict[str, TagType] = OrderedDict()  # Detected tag types by uid
+        self.tag_cache: TagCache = TagCache()  # Memory images of recently read or written cards by uid
+        self.read_mode: Optional[str] = None  # Mode of the last successful read (None = nothing read yet)
+        self.unsupported_read_modes: set[str] = set()  # Read modes with commands that the reader rejected
+        self.connection: Optional[CardConnection] = None  # Reused for every operation (keeps its PC/SC context)
+        self.connection_listeners: list[Callable[[bool], None]] = []
+        self.reader_monitor: ReaderMonitor = reader_monitor or ReaderMonitor(self.transport, self._blocking)
+        self.reader_monitor.subscribe(self.update_connection_state)
+        self.reader: Optional[Reader] = self._find_reader(self.reader_monitor.start())
+        # Prepare the contexts, so the first operation doesn't have to
+        context: Optional[int] = self._acquire_context()
+        if context is not None:
+            self._release_context(context)
+        self._get_connection()
 
-    def update_connection_state(self) -> None:
+    def add_connection_listener(self, callback: Callable[[bool], None]) -> None:
         """
-        Update the connection state
+        Add a listener for connection state changes
+        :param callback: Function that is called with the new connection state (also when the reader was replaced)
         """
-        while True:
-            new_reader: Optional[Reader] = self._get_reader()
-            if str(self.reader) != str(new_reader):
-                self.reader = new_reader
-            time.sleep(1)
+        self.connection_listeners.append(callback)
 
-    @classmethod
-    def _get_reader(cls) -> Optional[Reader]:
+    def remove_connection_listener(self, callback: Callable[[bool], None]) -> None:
+        """
+        Remove a listener for connection state changes
+        :param callback: The added function
+        """
+        if callback in self.connection_listeners:
+            self.connection_listeners.remove(callback)
+
+    def update_connection_state(self, reader_names: list[str]) -> None:
+        """
+        Update the connection state (called by the reader monitor)
+        :param reader_names: Names of the connected readers
         """
-        Get a connection to the reader device
+        new_reader: Optional[Reader] = self._find_reader(reader_names)
+        if str(self.reader) == str(new_reader):
+            return
+        self.reader = new_reader
+        self.read_mode = None
+        self.unsupported_read_modes = set()
+        self.connection = None
+        self._get_connection()
+        for callback in list(self.connection_listeners):
+            try:
+                callback(new_reader is not None)
+            except Exception as e:
+                print(f"[Error] Connection listener failed: {e}")
+
+    def select_reader(self) -> None:
+        """
+        Select the reader again (e.g. after the preferred reader was changed, the selection otherwise only changes
+        when a reader is plugged in or removed)
+        """
+        self.update_connection_state(self.reader_monitor.get_reader_names())
+
+    def _find_reader(self, reader_names: list[str]) -> Optional[Reader]:
+        """
+        Find the reader of this instance
+        :param reader_names: Names of the connected readers
         :return: Reader connection
         """
-        available_readers: list[Reader] = readers()
-        found_reader: Optional[Reader] = None
+        reader_name: Optional[str] = self.reader_name
+        if reader_name is None:
+            reader_name = self._get_reader_name(reader_names)
+        if reader_name is None or reader_name not in reader_names:
+            return None
+        return self.transport.get_reader(reader_name)
+
+    @classmethod
+    def is_supported_reader(cls, reader_name: str) -> bool:
+        """
+        Check if a reader is supported
+        :param reader_name: Name of the reader
+        :return: True if it is supported else False
+        """
+        # There are multiple supported readers
+        for parts in cls.supported_readers:
+            # Each supported reader has multiple parts that the name needs to contain
+            if all(part.lower() in reader_name.lower() for part in parts):
+                return True
+        return False
+
+    @classmethod
+    def _get_reader_name(cls, reader_names: list[str]) -> Optional[str]:
+        """
+        Select the reader device
+        :param reader_names: Names of the connected readers
+        :return: Name of the selected reader
+        """
+        found_reader: Optional[str] = None
 
         # Check preferred reader
         if cls.preferred_reader:
-            for reader in available_readers:
-                if cls.preferred_reader.lower() in reader.name.lower():
-                    found_reader = reader
+            for reader_name in reader_names:
+                if cls.preferred_reader.lower() in reader_name.lower():
+                    found_reader = reader_name
 
         # Check supported readers
         if not found_reader:
-            for reader in available_readers:
-                # There are multiple supported readers
-                for parts in cls.supported_readers:
-                    is_supported = True
-                    # Each supported reader has multiple parts that the name needs to contain
-                    for part in parts:
-                        if part.lower() not in reader.name.lower():
-                            is_supported = False
-                    if is_supported:
-                        found_reader = reader
+            for reader_name in reader_names:
+                if cls.is_supported_reader(reader_name):
+                    found_reader = reader_name
         return found_reader
 
+    @classmethod
+    def _transmit(cls, connection: CardConnection, command: list[int]) -> tuple[list[int], int, int]:
+        """
+        Transmit an APDU and record its duration
+        :param connection: Connection to the card
+        :param command: The APDU
+        :return: Response data and status words
+        """
+        start_time: float = time.perf_counter()
+        status: Optional[tuple[int, int]] = None
+        try:
+            response, sw1, sw2 = connection.transmit(command)
+            status = (sw1, sw2)
+            return response, sw1, sw2
+        finally:
+            cls.metrics.record_apdu(str(connection.getReader()), command, status, time.perf_counter() - start_time)
+
     @classmethod
     def _read_page(cls, connection: CardConnection, page: int) -> Optional[bytes]:
         """
@@ -99,14 +587,245 @@ class NFCReader:
         :param connection: Connection to the card
         :param page: Page number
         :return: The read data (4 bytes)
+        :raises CardRemovedError: If the connection to the card was lost
         """
         read_page_command: list[int] = [0xFF, 0xB0, 0x00, page, 0x04]
-        response, sw1, sw2 = connection.transmit(read_page_command)
+        try:
+            response, sw1, sw2 = cls._transmit(connection, read_page_command)
+        except (CardConnectionException, NoCardException) as e:
+            raise CardRemovedError(f"Lost the connection to the card while reading page {page}") from e
         if sw1 == 0x90 and sw2 == 0x00:
             return response
         else:
             return None
 
+    @classmethod
+    def _transmit_direct(cls, connection: CardConnection, command: list[int]) -> Optional[list[int]]:
+        """
+        Send a raw tag command through the direct transmit pseudo-APDU of the reader
+        :param connection: Connection to the card
+        :param command: Raw tag command (e.g. NTAG READ)
+        :return: The response data of the tag on success else None (e.g. the tag was removed or out of range)
+        :raises CommandNotSupportedError: If the reader rejects the pseudo-APDU
+        :raises CardRemovedError: If the connection to the card was lost
+        """
+        payload: list[int] = cls.in_communicate_thru + command
+        try:
+            response, sw1, sw2 = cls._transmit(connection, cls.direct_transmit_header + [len(payload)] + payload)
+        except (CardConnectionException, NoCardException) as e:
+            raise CardRemovedError("Lost the connection to the card during a direct transmit") from e
+        except Exception:
+            return None
+        prefix_length: int = len(cls.in_communicate_thru_response)
+        # Only the status words of the pseudo-APDU and the response code tell if the reader supports the command
+        if sw1 != 0x90 or sw2 != 0x00 or list(response[:prefix_length - 1]) != cls.in_communicate_thru_response[:-1]:
+            raise CommandNotSupportedError(f"The reader rejected the direct transmit ({sw1:02x}{sw2:02x})")
+        # A status other than 0 is an error of the tag communication
+        if len(response) < prefix_length or response[prefix_length - 1] != cls.in_communicate_thru_response[-1]:
+            return None
+        return list(response[prefix_length:])
+
+    @classmethod
+    def _fast_read_pages(cls, connection: CardConnection, start: int, count: int) -> Optional[list[bytes]]:
+        """
+        Read a page range with NTAG FAST_READ commands
+        :param connection: Connection to the card
+        :param start: First page
+        :param count: Number of pages
+        :return: The read pages on success else None
+        """
+        pages: list[bytes] = []
+        for chunk_start in range(start, start + count, cls.fast_read_max_pages):
+            chunk_end: int = min(chunk_start + cls.fast_read_max_pages, start + count) - 1
+            response = cls._transmit_direct(connection, [cls.ntag_fast_read, chunk_start, chunk_end])
+            if response is None or len(response) != (chunk_end - chunk_start + 1) * 4:
+                return None
+            pages.extend(bytes(response[i:i + 4]) for i in range(0, len(response), 4))
+        return pages
+
+    @classmethod
+    def _ntag_read_pages(cls, connection: CardConnection, start: int, count: int) -> Optional[list[bytes]]:
+        """
+        Read a page range with NTAG READ commands (4 pages per command)
+        :param connection: Connection to the card
+        :param start: First page
+        :param count: Number of pages
+        :return: The read pages on success else None
+        """
+        pages: list[bytes] = []
+        for chunk_start in range(start, start + count, 4):
+            response = cls._transmit_direct(connection, [cls.ntag_read, chunk_start])
+            if response is None or len(response) != 16:
+                return None
+            # The last command might roll over to page 0, so only take what was requested
+            chunk_count: int = min(4, start + count - chunk_start)
+            pages.extend(bytes(response[i * 4:i * 4 + 4]) for i in range(chunk_count))
+        return pages
+
+    @classmethod
+    def _single_read_pages(cls, connection: CardConnection, start: int, count: int) -> Optional[list[bytes]]:
+        """
+        Read a page range page by page (works with every reader)
+        :param connection: Connection to the card
+        :param start: First page
+        :param count: Number of pages
+        :return: The read pages on success else None
+        """
+        pages: list[bytes] = []
+        for page in range(start, start + count):
+            d: Optional[bytes] = cls._read_page(connection, page)
+            if d is None:
+                print(f"[Error] Failed to read page {page}.")
+                return None
+            pages.append(bytes(d))
+        return pages
+
+    def _read_pages(self, connection: CardConnection, start: int, count: int) -> Optional[list[bytes]]:
+        """
+        Read a page range with the fastest read mode that the reader supports
+        :param connection: Connection to the card
+        :param start: First page
+        :param count: Number of pages
+        :return: The read pages on success else None
+        :raises CardRemovedError: If the connection to the card was lost (no other mode is tried then)
+        """
+        read_modes: list[tuple[str, Callable[[CardConnection, int, int], Optional[list[bytes]]]]] = [
+            (self.READ_MODE_FAST_READ, self._fast_read_pages),
+            (self.READ_MODE_READ, self._ntag_read_pages),
+            (self.READ_MODE_PAGE, self._single_read_pages)
+        ]
+        for read_mode, read_function in read_modes:
+            # Skip the modes that the reader rejected (a failed tag communication falls back to the next mode)
+            if read_mode in self.unsupported_read_modes:
+                continue
+            try:
+                pages: Optional[list[bytes]] = read_function(connection, start, count)
+            except CommandNotSupportedError:
+                self.unsupported_read_modes.add(read_mode)
+                continue
+            if pages is not None:
+                self.read_mode = read_mode
+                return pages
+        return None
+
+    @classmethod
+    def _get_uid(cls, connection: CardConnection) -> Optional[str]:
+        """
+        Get the uid of the card with the GET DATA pseudo-APDU (answered by the reader without tag communication)
+        :param connection: Connection to the card
+        :return: The uid as hex string on success else None
+        """
+        try:
+            response, sw1, sw2 = cls._transmit(connection, [0xFF, 0xCA, 0x00, 0x00, 0x00])
+        except Exception:
+            return None
+        if sw1 != 0x90 or sw2 != 0x00 or not response:
+            return None
+        return bytes(response).hex()
+
+    @classmethod
+    def _detect_tag_type(cls, connection: CardConnection) -> Optional[TagType]:
+        """
+        Detect the tag type with the NTAG GET_VERSION command
+        :param connection: Connection to the card
+        :return: The tag type or None if it is unknown
+        """
+        try:
+            response: Optional[list[int]] = cls._transmit_direct(connection, [cls.ntag_get_version])
+        except (CommandNotSupportedError, CardRemovedError):
+            return None
+        if response is None or len(response) != 8:
+            return None
+        return cls.tag_types.get(response[6])
+
+    @classmethod
+    def get_tag_type_by_page_count(cls, page_count: int) -> TagType:
+        """
+        Get the tag type with a page count (e.g. the one of a card data image)
+        :param page_count: Number of pages
+        :return: The known tag type or a generic one with the usual NTAG layout
+        """
+        for tag_type in cls.tag_types.values():
+            if tag_type.page_count == page_count:
+                return tag_type
+        return TagType("unknown", page_count, 0x04, page_count - 5)
+
+    def _get_tag_type(self, connection: CardConnection, uid: Optional[str] = None) -> TagType:
+        """
+        Get the type of a connected card (the detection result is cached per uid, so repeated reads skip it)
+        :param connection: Connection to the card
+        :param uid: Optional uid of the card (else it is requested from the reader)
+        :return: The tag type (default_tag_type if it can't be detected)
+        """
+        if uid is None:
+            uid = self._get_uid(connection)
+        if uid is not None:
+            with self.lock:
+                tag_type: Optional[TagType] = self.tag_type_cache.get(uid)
+                if tag_type is not None:
+                    self.tag_type_cache.move_to_end(uid)
+                    return tag_type
+        tag_type = self._detect_tag_type(connection)
+        if tag_type is None:
+            # E.g. the reader doesn't support direct transmit (not cached, the next read tries again)
+            return self.default_tag_type
+        if uid is not None:
+            with self.lock:
+                self.tag_type_cache[uid] = tag_type
+                while len(self.tag_type_cache) > self.tag_type_cache_size:
+                    self.tag_type_cache.popitem(last=False)
+        return tag_type
+
+    @classmethod
+    def _get_chunks(cls, pages: list[int], chunk_pages: int) -> list[tuple[int, int]]:
+        """
+        Group pages to contiguous page ranges
+        :param pages: Page numbers (ascending)
+        :param chunk_pages: Maximum number of pages per range
+        :return: Page ranges as (first page, number of pages) tuples
+        """
+        chunks: list[tuple[int, int]] = []
+        for page in pages:
+            if chunks and chunks[-1][0] + chunks[-1][1] == page and chunks[-1][1] < chunk_pages:
+                chunks[-1] = (chunks[-1][0], chunks[-1][1] + 1)
+            else:
+                chunks.append((page, 1))
+        return chunks
+
+    def _read_pages_retrying(self, connection: CardConnection, start: int, count: int,
+                             token: CancelToken) -> tuple[list[Optional[bytes]], int]:
+        """
+        Read a page range in chunks and retry only the chunks that failed (keeps the pages that were read)
+        :param connection: Connection to the card
+        :param start: First page
+        :param count: Number of pages
+        :param token: Cancel token of the operation (stops the retries)
+        :return: The pages (None for pages that could not be read), the number of attempts and True if the card was
+            removed (no retries then)
+        """
+        pages: list[Optional[bytes]] = count * [None]
+        chunk_pages: int = self.fast_read_max_pages
+        attempt: int = 0
+        while attempt <= self.retry_policy.retries:
+            if attempt > 0:
+                # Short backoff (the usual cause is a tag that is slightly out of range)
+                if not token.sleep(self.retry_policy.get_delay(attempt - 1)):
+                    break
+                chunk_pages = self.retry_chunk_pages
+            attempt += 1
+            missing_pages: list[int] = [start + i for i, page_data in enumerate(pages) if page_data is None]
+            try:
+                for chunk_start, chunk_count in self._get_chunks(missing_pages, chunk_pages):
+                    chunk: Optional[list[bytes]] = self._read_pages(connection, chunk_start, chunk_count)
+                    if chunk is not None:
+                        pages[chunk_start - start:chunk_start - start + chunk_count] = chunk
+            except CardRemovedError as e:
+                print(f"[Error] {e}.")
+                return pages, attempt, True
+            if all(page_data is not None for page_data in pages):
+                break
+        return pages, attempt, False
+
     @classmethod
     def _write_page(cls, connection: CardConnection, page: int, data: bytes) -> bool:
         """
@@ -117,62 +836,417 @@ class NFCReader:
         :return: Success state
         """
         write_page_command: List[int] = [0xFF, 0xD6, 0x00, page, 0x04] + list(data)
-        response, sw1, sw2 = connection.transmit(write_page_command)
+        try:
+            response, sw1, sw2 = cls._transmit(connection, write_page_command)
+        except (CardConnectionException, NoCardException):  # The card was removed (the page counts as failed)
+            return False
         if sw1 == 0x90 and sw2 == 0x00:
             return True
         else:
             return False
 
-    def _wait_for_card(self) -> Optional[CardConnection]:
+    @classmethod
+    def _blocking(cls, function: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a blocking PC/SC call
+        :param function: Function to call
+        :param args: Arguments of the function
+        :return: Result of the function
+        """
+        if cls.blocking_call is None:
+            return function(*args)
+        return cls.blocking_call(function, *args)
+
+    def _acquire_context(self) -> Optional[int]:
+        """
+        Get a PC/SC context for a status change request (each pending wait has its own, so it can be cancelled alone)
+        :return: The context on success else None
+        """
+        with self.lock:
+            if self.idle_contexts:
+                return self.idle_contexts.pop()
+        hresult, context = self.transport.establish_context()
+        return context if hresult == SCARD_S_SUCCESS else None
+
+    def _release_context(self, context: int) -> None:
+        """
+        Return a context that is not used anymore
+        :param context: The context
+        """
+        with self.lock:
+            self.idle_contexts.append(context)
+
+    @contextmanager
+    def _operation(self, token: Optional[CancelToken]) -> Iterator[CancelToken]:
+        """
+        Track a pending operation, so cancel_wait_for_card() can cancel it
+        :param token: Cancel token of the operation (None = create one that is only cancelled by cancel_wait_for_card)
+        :return: The cancel token
+        """
+        token = token or CancelToken()
+        with self.lock:
+            registered: bool = token not in self.active_tokens  # Nested calls are tracked by the outermost one
+            self.active_tokens.add(token)
+        try:
+            yield token
+        finally:
+            if registered:
+                with self.lock:
+                    self.active_tokens.discard(token)
+
+    def _get_connection(self) -> Optional[CardConnection]:
+        """
+        Get the (not connected) connection object of the reader
+        :return: The connection object or None if there is no reader
+        """
+        reader: Optional[Reader] = self.reader
+        if not reader:
+            return None
+        if self.connection is None:
+            self.connection = reader.createConnection()
+        return self.connection
+
+    def _wait_for_card_state(self, present: bool, timeout: Optional[float], token: CancelToken) -> bool:
+        """
+        Wait until a card is present on (or removed from) the reader using PC/SC status change notifications
+        :param present: True to wait for a card, False to wait for the removal of the card
+        :param timeout: Timeout in seconds (None = wait until cancelled)
+        :param token: Cancel token of the operation (wakes up the wait immediately when cancelled)
+        :return: True if the requested state was reached else False (timeout, cancelled or reader lost)
+        """
+        reader: Optional[Reader] = self.reader
+        if not reader:
+            return False
+        context: Optional[int] = self._acquire_context()
+        if context is None:
+            return False
+
+        def cancel_wait() -> None:
+            """
+            Wake up the pending status change request of this wait
+            """
+            self.transport.cancel(context)
+
+        token.add_cancel_callback(cancel_wait)
+        try:
+            deadline: Optional[float] = token.get_deadline(timeout)
+            reader_state: tuple = (reader.name, SCARD_STATE_UNAWARE)
+            while not token.is_cancelled():
+                # Block until the state changes (in slices, so a missed cancel call can't block forever)
+                wait_time: float = self.status_change_slice
+                if deadline is not None:
+                    wait_time = min(wait_time, deadline - time.monotonic())
+                    if wait_time <= 0:
+                        return False
+                hresult, new_states = self._blocking(self.transport.get_status_change, context,
+                                                     max(1, int(wait_time * 1000)), [reader_state])
+                if hresult == SCARD_E_TIMEOUT:
+                    continue
+                if hresult != SCARD_S_SUCCESS or not new_states:
+                    return False
+                reader_name, event_state, atr = new_states[0]
+                if event_state & (SCARD_STATE_UNKNOWN | SCARD_STATE_UNAVAILABLE):
+                    return False
+                if bool(event_state & SCARD_STATE_PRESENT) == present:
+                    return True
+                reader_state = (reader_name, event_state & ~SCARD_STATE_CHANGED)
+        finally:
+            # Removed before the context is reused, so a late cancel can't hit another wait
+            token.remove_cancel_callback(cancel_wait)
+            self._release_context(context)
+        return False
+
+    def cancel_wait_for_card(self) -> None:
+        """
+        Cancel every pending operation of this reader (use the cancel token of an operation to only cancel that one)
+        """
+        with self.lock:
+            tokens: list[CancelToken] = list(self.active_tokens)
+        for token in tokens:
+            token.cancel()
+
+    def _wait_for_card(self, timeout: Optional[float], token: CancelToken) -> Optional[CardConnection]:
         """
         Wait for a card to be found
+        :param timeout: Timeout in seconds (None = use card_timeout)
+        :param token: Cancel token of the operation
+        :return: The connection to the card (if possible)
+        """
+        start_time: float = time.perf_counter()
+        connection: Optional[CardConnection] = self._connect_card(timeout, token)
+        self.metrics.record_operation(str(self.reader), "wait_for_card", connection is not None,
+                                      time.perf_counter() - start_time)
+        return connection
+
+    def _connect_card(self, timeout: Optional[float], token: CancelToken) -> Optional[CardConnection]:
+        """
+        Wait for a card and connect to it
+        :param timeout: Timeout in seconds (None = use card_timeout)
+        :param token: Cancel token of the operation
         :return: The connection to the card (if possible)
         """
         if not self.reader:
             return None
-        connection: CardConnection = self.reader.createConnection()
-        self.waiting_for_tag = True
-        while self.waiting_for_tag:
+        if timeout is None:
+            timeout = self.card_timeout
+        deadline: Optional[float] = token.get_deadline(timeout)
+        connection: Optional[CardConnection] = self._get_connection()
+        if not connection:
+            return None
+        while not token.is_cancelled():
+            remaining: Optional[float] = deadline - time.monotonic() if deadline is not None else None
+            if not self._wait_for_card_state(True, remaining, token):
+                break
             try:
                 connection.connect()
-                self.waiting_for_tag = False
                 return connection
             except Exception:
-                time.sleep(0.5)
+                # The card left the field before the connection was established, wait for the next one
+                self._wait_for_card_state(False, remaining, token)
+        return None
+
+    def wait_for_card_presence(self, timeout: Optional[float] = None, token: Optional[CancelToken] = None) -> bool:
+        """
+        Wait until a card is present on the reader (without connecting to it)
+        :param timeout: Timeout in seconds (None = wait until cancelled)
+        :param token: Optional cancel token (and deadline) of the operation
+        :return: True if a card is present else False
+        """
+        with self._operation(token) as token:
+            return self._wait_for_card_state(True, timeout, token)
+
+    def wait_for_card_removal(self, timeout: Optional[float] = None, token: Optional[CancelToken] = None) -> bool:
+        """
+        Wait until the card is removed from the reader
+        :param timeout: Timeout in seconds (None = wait until cancelled)
+        :param token: Optional cancel token (and deadline) of the operation
+        :return: True if the card was removed else False
+        """
+        with self._operation(token) as token:
+            return self._wait_for_card_state(False, timeout, token)
+
+    @contextmanager
+    def session(self, timeout: Optional[float] = None,
+                token: Optional[CancelToken] = None) -> Iterator[Optional[CardSession]]:
+        """
+        Wait for a card and keep the connection for several operations
+        :param timeout: Time to wait for the card in seconds (None = use card_timeout)
+        :param token: Optional cancel token (and deadline) of the operation (only the wait for the card is cancelled)
+        :return: The session or None if no card was found
+        """
+        with self._operation(token) as token:
+            connection: Optional[CardConnection] = self._wait_for_card(timeout, token)
+            if not connection:
+                yield None
+                return
+            try:
+                yield CardSession(self, connection, token)
+            finally:
+                try:
+                    connection.disconnect()
+                except Exception:
+                    pass  # The card already left the field
 
-    def read_card(self, page_count: int = 0x2d) -> Optional[CardData]:
+    def _read_card(self, connection: CardConnection, page_count: Optional[int], token: CancelToken,
+                   cached: Optional[bool] = None) -> ReadResult:
+        """
+        Read data from a connected card
+        :param connection: Connection to the card
+        :param page_count: Number of pages on the card (None = detect the tag type)
+        :param token: Cancel token of the operation (stops the retries)
+        :param cached: Serve a recently read or written card from the tag cache (None = use_tag_cache, False = force)
+        :return: The read result
+        """
+        start_time: float = time.perf_counter()
+        uid: Optional[str] = self._get_uid(connection)
+        if uid is not None and (self.use_tag_cache if cached is None else cached):
+            entry: Optional[TagCacheEntry] = self.tag_cache.get(uid)
+            if entry is not None and (page_count is None or len(entry.pages) == page_count):
+                data: CardData = CardData(len(entry.pages))
+                data.pages = list(entry.pages)
+                self.metrics.record_operation(str(self.reader), "read_card_cached", True,
+                                              time.perf_counter() - start_time)
+                return ReadResult(data, tag_type=self.get_tag_type_by_page_count(len(entry.pages)), cached=True)
+        tag_type: TagType = self._get_tag_type(connection, uid) if page_count is None else \
+            self.get_tag_type_by_page_count(page_count)
+        page_count = tag_type.page_count
+        pages, attempts, removed = self._read_pages_retrying(connection, 0, page_count, token)
+        failed_pages: list[int] = [page for page, page_data in enumerate(pages) if page_data is None]
+        self.metrics.record_operation(str(self.reader), "read_card", not failed_pages,
+                                      time.perf_counter() - start_time)
+        if removed:
+            return ReadResult(error=ReadResult.ERROR_CARD_REMOVED, failed_pages=failed_pages, attempts=attempts,
+                              tag_type=tag_type)
+        if failed_pages:
+            print(f"[Error] Failed to read {len(failed_pages)} page(s) of the card after {attempts} attempt(s).")
+            return ReadResult(error=ReadResult.ERROR_READ_FAILED, failed_pages=failed_pages, attempts=attempts,
+                              tag_type=tag_type)
+        data = CardData(page_count)
+        data.pages = pages
+        if uid is not None:
+            self.tag_cache.put(uid, pages)
+        return ReadResult(data, attempts=attempts, tag_type=tag_type)
+
+    def read_card_detailed(self, page_count: Optional[int] = None, timeout: Optional[float] = None,
+                           token: Optional[CancelToken] = None, cached: Optional[bool] = None) -> ReadResult:
+        """
+        Read data from card and report the reason of a failure
+        :param page_count: Number of pages on the card (None = detect the tag type)
+        :param timeout: Time to wait for the card in seconds (None = use card_timeout)
+        :param token: Optional cancel token (and deadline) of the operation
+        :param cached: Serve a recently read or written card from the tag cache (None = use_tag_cache, False = force)
+        :return: The read result
+        """
+        with self.session(timeout, token) as session:
+            if not session:
+                return ReadResult(error=ReadResult.ERROR_NO_CARD)
+            return session.read_card_detailed(page_count, cached)
+
+    def read_card(self, page_count: Optional[int] = None, timeout: Optional[float] = None,
+                  token: Optional[CancelToken] = None, cached: Optional[bool] = None) -> Optional[CardData]:
         """
         Read data from card
-        :param page_count: Number of pages on the card
+        :param page_count: Number of pages on the card (None = detect the tag type)
+        :param timeout: Time to wait for the card in seconds (None = use card_timeout)
+        :param token: Optional cancel token (and deadline) of the operation
+        :param cached: Serve a recently read or written card from the tag cache (None = use_tag_cache, False = force)
         :return: The data of the card on success else None
         """
-        connection: CardConnection = self._wait_for_card()
-        if not connection:
+        return self.read_card_detailed(page_count, timeout, token, cached).data
+
+    def _get_changed_pages(self, connection: CardConnection, card_data: CardData,
+                           pages: list[int]) -> Optional[list[int]]:
+        """
+        Compare the data on the card with the data to write (reads the page range in bulk)
+        :param connection: Connection to the card
+        :param card_data: Data to write
+        :param pages: Pages to compare (ascending)
+        :return: The pages that differ or None if the card can't be read
+        """
+        if not pages:
+            return pages
+        try:
+            current_pages: Optional[list[bytes]] = self._read_pages(connection, pages[0], pages[-1] - pages[0] + 1)
+        except CardRemovedError:
             return None
-        data: CardData = CardData(page_count)
-        for page in range(0, page_count):
-            d: bytes = self._read_page(connection, page)
-            if d is None:
-                print(f"[Error] Failed to read page {page}. Reading cancelled.")
-                time.sleep(3)
-                return None
+        if current_pages is None:
+            return None
+        return [page for page in pages if bytes(current_pages[page - pages[0]]) != bytes(card_data.pages[page])]
+
+    def _verify_pages(self, connection: CardConnection, card_data: CardData, pages: list[int],
+                      result: WriteResult) -> None:
+        """
+        Verify written pages and rewrite the ones that don't match
+        :param connection: Connection to the card
+        :param card_data: Written data
+        :param pages: Written pages (ascending)
+        :param result: Result to update
+        """
+        for attempt in range(self.verify_retries + 1):
+            mismatched_pages: Optional[list[int]] = self._get_changed_pages(connection, card_data, pages)
+            if mismatched_pages is None:
+                print("[Error] Failed to read the card for verification.")
+                break
+            for page in pages:
+                if page not in mismatched_pages:
+                    result.pages[page] = WriteResult.PAGE_VERIFIED if attempt == 0 else WriteResult.PAGE_REWRITTEN
+            pages = mismatched_pages
+            if not pages or attempt == self.verify_retries:
+                break
+            for page in pages:
+                self._write_page(connection, page, card_data.pages[page])
+        for page in pages:
+            result.pages[page] = WriteResult.PAGE_FAILED
+
+    def _write_card_pages(self, connection: CardConnection, card_data: CardData, tag_type: TagType,
+                          differential: bool, verify: bool) -> WriteResult:
+        """
+        Write the pages to a connected card
+        :param connection: Connection to the card
+        :param card_data: Data to write
+        :param tag_type: Type of the card
+        :param differential: Read the card first and only write the pages that differ
+        :param verify: Read the written pages back and rewrite the ones that don't match
+        :return: The write result
+        """
+        result: WriteResult = WriteResult()
+        # Only write the user memory that both the card and the data image have (no management data pages)
+        data_type: TagType = self.get_tag_type_by_page_count(len(card_data.pages))
+        pages: list[int] = list(range(tag_type.user_start, min(tag_type.user_end, data_type.user_end)))
+        if differential:
+            changed_pages: Optional[list[int]] = self._get_changed_pages(connection, card_data, pages)
+            if changed_pages is not None:
+                for page in pages:
+                    if page not in changed_pages:
+                        result.pages[page] = WriteResult.PAGE_UNCHANGED
+                pages = changed_pages
+        for page in pages:
+            if self._write_page(connection, page, card_data.pages[page]):
+                result.pages[page] = WriteResult.PAGE_WRITTEN
             else:
-                data.pages[page] = d
-        return data
+                result.pages[page] = WriteResult.PAGE_FAILED
+                # Without verification there is no retry
+                if not verify:
+                    return result
+        if verify:
+            self._verify_pages(connection, card_data, pages, result)
+        result.success = not result.get_pages(WriteResult.PAGE_FAILED)
+        return result
 
-    def write_card(self, card_data: CardData, page_count: int = 0x2d) -> bool:
+    def _write_card(self, connection: CardConnection, card_data: CardData, page_count: Optional[int],
+                    differential: bool, verify: bool) -> WriteResult:
+        """
+        Write data to a connected card and report the state of every page
+        :param connection: Connection to the card
+        :param card_data: Data to write
+        :param page_count: Number of pages on the card (None = detect the tag type)
+        :param differential: Read the card first and only write the pages that differ
+        :param verify: Read the written pages back and rewrite the ones that don't match
+        :return: The write result
+        """
+        start_time: float = time.perf_counter()
+        uid: Optional[str] = self._get_uid(connection)
+        tag_type: TagType = self._get_tag_type(connection, uid) if page_count is None else \
+            self.get_tag_type_by_page_count(page_count)
+        result: WriteResult = self._write_card_pages(connection, card_data, tag_type, differential, verify)
+        if uid is not None:
+            # Keep a cached image in sync with the card (a partly written card has to be read again)
+            if result.success:
+                self.tag_cache.update_pages(uid, {page: card_data.pages[page] for page in result.pages})
+            else:
+                self.tag_cache.invalidate(uid)
+        self.metrics.record_operation(str(self.reader), "write_card", result.success,
+                                      time.perf_counter() - start_time)
+        return result
+
+    def write_card_detailed(self, card_data: CardData, page_count: Optional[int] = None,
+                            timeout: Optional[float] = None, differential: bool = False, verify: bool = False,
+                            token: Optional[CancelToken] = None) -> WriteResult:
+        """
+        Write data to card and report the state of every page
+        :param card_data: Data to write
+        :param page_count: Number of pages on the card (None = detect the tag type)
+        :param timeout: Time to wait for the card in seconds (None = use card_timeout)
+        :param differential: Read the card first and only write the pages that differ
+        :param verify: Read the written pages back and rewrite the ones that don't match
+        :param token: Optional cancel token (and deadline) of the operation (a started write is always completed)
+        :return: The write result
+        """
+        with self.session(timeout, token) as session:
+            if not session:
+                return WriteResult()
+            return session.write_card_detailed(card_data, page_count, differential, verify)
+
+    def write_card(self, card_data: CardData, page_count: Optional[int] = None, timeout: Optional[float] = None,
+                   differential: bool = False, verify: bool = False, token: Optional[CancelToken] = None) -> bool:
         """
         Write data to card
         :param card_data: Data to write
-        :param page_count: Number of pages on the card
+        :param page_count: Number of pages on the card (None = detect the tag type)
+        :param timeout: Time to wait for the card in seconds (None = use card_timeout)
+        :param differential: Read the card first and only write the pages that differ
+        :param verify: Read the written pages back and rewrite the ones that don't match
+        :param token: Optional cancel token (and deadline) of the operation (a started write is always completed)
         :return: Success state
         """
-        connection: CardConnection = self._wait_for_card()
-        if not connection:
-            return False
-        for page, page_data in enumerate(card_data.pages):
-            # Don't write to management data pages
-            if 0x03 < page < page_count - 5:
-                if not self._write_page(connection, page, page_data):
-                    return False
-        return True
+        return self.write_card_detailed(card_data, page_count, timeout, differential, verify, token).success
@@ -0,0 +1,158 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from .cancel_token import CancelToken
+from .metrics import Histogram
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class QueuedOperation:
+    """
+    An operation in the queue of a reader
+    """
+
+    def __init__(self, function: Callable[[CancelToken], Any], priority: int, token: CancelToken):
+        """
+        Create an operation
+        :param function: Function to execute (called with the cancel token of the operation)
+        :param priority: Priority (lower values are executed first)
+        :param token: Cancel token (and deadline) of the operation
+        """
+        self.function: Callable[[CancelToken], Any] = function
+        self.priority: int = priority
+        self.token: CancelToken = token
+        self.future: Future = Future()
+        self.queued_at: float = time.monotonic()
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        """
+        Wait for the result of the operation
+        :param timeout: Timeout in seconds (None = wait until done)
+        :return: The result of the operation function
+        """
+        return self.future.result(timeout)
+
+    def cancel(self) -> None:
+        """
+        Cancel the operation (removes it from the queue or cancels its pending wait for a tag)
+        """
+        if not self.future.cancel():
+            self.token.cancel()
+
+
+class OperationQueue:
+    """
+    Bounded queue that executes the operations of one reader one after another (FIFO within the same priority)
+    """
+
+    # Priorities (lower values are executed first)
+    PRIORITY_HIGH: int = 0
+    PRIORITY_NORMAL: int = 10
+    PRIORITY_LOW: int = 20
+
+    def __init__(self, max_length: int = 16, name: str = "reader"):
+        """
+        Create a queue (the worker is started with the first operation)
+        :param max_length: Maximum number of waiting operations (further ones are rejected)
+        :param name: Name for the statistics (e.g. the reader name)
+        """
+        self.max_length: int = max_length
+        self.name: str = name
+        self.lock: threading.Lock = threading.Lock()
+        self.operations_available: threading.Condition = threading.Condition(self.lock)
+        self.operations: list[tuple[int, int, QueuedOperation]] = []  # Heap of (priority, sequence, operation)
+        self.sequence = itertools.count()
+        self.worker_thread: Optional[threading.Thread] = None
+        self.wait_times: Histogram = Histogram()
+        self.queue_lengths: Histogram = Histogram()  # Queue length at every submit
+        self.completed: int = 0
+        self.rejected: int = 0
+
+    def submit(self, function: Callable[[CancelToken], Any], priority: int = PRIORITY_NORMAL,
+               token: Optional[CancelToken] = None) -> Optional[QueuedOperation]:
+        """
+        Queue an operation
+        :param function: Function to execute (called with the cancel token of the operation)
+        :param priority: Priority (lower values are executed first)
+        :param token: Optional cancel token (and deadline) of the operation
+        :return: The queued operation or None if the queue is full
+        """
+        operation: QueuedOperation = QueuedOperation(function, priority, token or CancelToken())
+        with self.operations_available:
+            if len(self.operations) >= self.max_length:
+                self.rejected += 1
+                print(f"[Error] Operation queue of {self.name} is full.")
+                return None
+            self.queue_lengths.add(len(self.operations))
+            heapq.heappush(self.operations, (priority, next(self.sequence), operation))
+            if self.worker_thread is None:
+                self.worker_thread = threading.Thread(target=self._run_worker)
+                self.worker_thread.daemon = True
+                self.worker_thread.start()
+            self.operations_available.notify()
+        return operation
+
+    def get_length(self) -> int:
+        """
+        Get the number of waiting operations
+        :return: Number of waiting operations
+        """
+        with self.operations_available:
+            return len(self.operations)
+
+    def _run_worker(self) -> None:
+        """
+        Execute the queued operations one after another
+        """
+        while True:
+            with self.operations_available:
+                while not self.operations:
+                    self.operations_available.wait()
+                operation: QueuedOperation = heapq.heappop(self.operations)[2]
+                self.wait_times.add(time.monotonic() - operation.queued_at)
+
+            # Skip operations that were cancelled (or expired) while waiting
+            if operation.token.is_cancelled():
+                operation.future.cancel()
+            if not operation.future.set_running_or_notify_cancel():
+                continue
+            try:
+                operation.future.set_result(operation.function(operation.token))
+            except Exception as e:
+                # The callers usually only report a failed operation
+                logger.exception("Operation of %s failed", self.name)
+                operation.future.set_exception(e)
+            with self.lock:
+                self.completed += 1
+
+    def get_statistics(self) -> dict[str, Any]:
+        """
+        Get the queue statistics
+        :return: JSON data (durations in milliseconds)
+        """
+        # Snapshot under the lock, the percentiles are computed outside of it
+        with self.lock:
+            length: int = len(self.operations)
+            completed: int = self.completed
+            rejected: int = self.rejected
+            wait_times: Histogram = self.wait_times.copy()
+            queue_lengths: Histogram = self.queue_lengths.copy()
+        return {
+            "name": self.name,
+            "length": length,
+            "max_length": self.max_length,
+            "completed": completed,
+            "rejected": rejected,
+            "wait_time": wait_times.to_dict(),
+            "length_at_submit": {
+                "mean": queue_lengths.total / queue_lengths.count if queue_lengths.count else 0.0,
+                "max": queue_lengths.maximum,
+                "p95": queue_lengths.percentile(95)
+            }
+        }
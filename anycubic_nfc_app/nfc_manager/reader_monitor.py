@@ -0,0 +1,156 @@
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from smartcard.scard import (INFINITE, SCARD_E_TIMEOUT, SCARD_S_SUCCESS, SCARD_STATE_CHANGED, SCARD_STATE_UNAWARE,
+                             SCARD_STATE_UNKNOWN)
+
+from .transport import PCSCTransport, Transport
+
+
+class ReaderMonitor:
+    """
+    Event driven monitor for plugged and unplugged readers (uses one long-lived PC/SC context)
+    """
+
+    # Special reader name that signals added and removed readers
+    pnp_notification: str = "\\\\?PnP?\\Notification"
+    # Time between checks for new readers if the PC/SC service has no plug and play notifications (in seconds)
+    fallback_interval: float = 1.0
+
+    def __init__(self, transport: Optional[Transport] = None, blocking_call: Optional[Callable[..., Any]] = None):
+        """
+        Create a monitor
+        :param transport: Optional access to the readers (default: the PC/SC service)
+        :param blocking_call: Optional function to run blocking PC/SC calls with (function, *args)
+        """
+        self.transport: Transport = transport or PCSCTransport()
+        self.blocking_call: Optional[Callable[..., Any]] = blocking_call
+        self.context: Optional[int] = None
+        self.reader_names: list[str] = []
+        self.subscribers: list[Callable[[list[str]], None]] = []
+        self.running: bool = False
+        self.lock: threading.Lock = threading.Lock()
+
+    def _blocking(self, function: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a blocking PC/SC call
+        :param function: Function to call
+        :param args: Arguments of the function
+        :return: Result of the function
+        """
+        if self.blocking_call is None:
+            return function(*args)
+        return self.blocking_call(function, *args)
+
+    def subscribe(self, callback: Callable[[list[str]], None]) -> None:
+        """
+        Subscribe to reader changes
+        :param callback: Function that is called with the names of the connected readers after every change
+        """
+        with self.lock:
+            self.subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[list[str]], None]) -> None:
+        """
+        Unsubscribe from reader changes
+        :param callback: The subscribed function
+        """
+        with self.lock:
+            if callback in self.subscribers:
+                self.subscribers.remove(callback)
+
+    def start(self) -> list[str]:
+        """
+        Start monitoring (does nothing if the monitor is already running)
+        :return: Names of the connected readers
+        """
+        with self.lock:
+            if self.running:
+                return list(self.reader_names)
+            if self.context is None:
+                hresult, context = self.transport.establish_context()
+                if hresult != SCARD_S_SUCCESS:
+                    print("[Error] Failed to establish a PC/SC context. Readers are not monitored.")
+                    return []
+                self.context = context
+            self.running = True
+        self.reader_names = self._list_readers()
+        monitor_thread = threading.Thread(target=self._run)
+        monitor_thread.daemon = True
+        monitor_thread.start()
+        return list(self.reader_names)
+
+    def get_reader_names(self) -> list[str]:
+        """
+        Get the connected readers (as known by the monitor)
+        :return: Names of the connected readers
+        """
+        with self.lock:
+            return list(self.reader_names)
+
+    def stop(self) -> None:
+        """
+        Stop monitoring
+        """
+        self.running = False
+        if self.context is not None:
+            self.transport.cancel(self.context)
+
+    def _list_readers(self) -> list[str]:
+        """
+        List the connected readers
+        :return: Names of the connected readers
+        """
+        hresult, reader_names = self.transport.list_readers(self.context)
+        if hresult != SCARD_S_SUCCESS:
+            return []  # Also covers SCARD_E_NO_READERS_AVAILABLE
+        return list(reader_names)
+
+    def _has_pnp_notification(self) -> bool:
+        """
+        Check if the PC/SC service sends plug and play notifications
+        :return: True if it does else False
+        """
+        hresult, states = self.transport.get_status_change(self.context, 0,
+                                                           [(self.pnp_notification, SCARD_STATE_UNAWARE)])
+        return hresult in (SCARD_S_SUCCESS, SCARD_E_TIMEOUT) and not (states and states[0][1] & SCARD_STATE_UNKNOWN)
+
+    def _run(self) -> None:
+        """
+        Wait for reader changes and notify the subscribers
+        """
+        has_pnp_notification: bool = self._has_pnp_notification()
+        timeout: int = INFINITE if has_pnp_notification else int(self.fallback_interval * 1000)
+        states: dict[str, tuple] = {}
+        while self.running:
+            # Watch the plug and play notification and every known reader (to notice removed readers without it)
+            watched: list[str] = self.reader_names + ([self.pnp_notification] if has_pnp_notification else [])
+            reader_states: list[tuple] = [states.get(name, (name, SCARD_STATE_UNAWARE)) for name in watched]
+            if reader_states:
+                hresult, new_states = self._blocking(self.transport.get_status_change, self.context, timeout,
+                                                     reader_states)
+            else:
+                # Without notifications and readers there is nothing to wait for
+                time.sleep(self.fallback_interval)
+                hresult, new_states = SCARD_E_TIMEOUT, []
+            if not self.running:
+                break
+            if hresult == SCARD_S_SUCCESS:
+                states = {name: (name, event_state & ~SCARD_STATE_CHANGED) for name, event_state, atr in new_states}
+            elif hresult != SCARD_E_TIMEOUT:
+                # E.g. a reader was removed right before the call or the PC/SC service restarts
+                states = {}
+                time.sleep(self.fallback_interval)
+
+            # Only notify if the reader list actually changed
+            reader_names: list[str] = self._list_readers()
+            if reader_names != self.reader_names:
+                self.reader_names = reader_names
+                with self.lock:
+                    subscribers: list[Callable[[list[str]], None]] = list(self.subscribers)
+                for callback in subscribers:
+                    try:
+                        callback(list(reader_names))
+                    except Exception as e:
+                        print(f"[Error] Reader change subscriber failed: {e}")
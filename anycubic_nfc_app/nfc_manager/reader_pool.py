@@ -0,0 +1,271 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from .nfc_reader import NFCReader
+from .reader_monitor import ReaderMonitor
+from .spool_reader import SpoolReader
+from .transport import Transport
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class PoolJob:
+    """
+    A job for the reader pool
+    """
+
+    def __init__(self, function: Callable[[SpoolReader], Any]):
+        """
+        Create a job
+        :param function: Function to execute with the spool reader that got a tag first
+        """
+        self.function: Callable[[SpoolReader], Any] = function
+        self.future: Future = Future()
+        self.reader_name: Optional[str] = None  # Name of the reader that executed the job
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        """
+        Wait for the result of the job
+        :param timeout: Timeout in seconds (None = wait until done)
+        :return: The result of the job function
+        """
+        return self.future.result(timeout)
+
+    def cancel(self) -> bool:
+        """
+        Cancel the job (only possible while it waits for a tag)
+        :return: True if the job was cancelled else False
+        """
+        return self.future.cancel()
+
+
+class ReaderPool:
+    """
+    Pool of all connected supported readers (each queued job is executed by the first reader that gets a tag)
+    """
+
+    def __init__(self, transport: Optional[Transport] = None):
+        """
+        Create a pool (call start() to open the readers)
+        :param transport: Optional access to the readers (default: the PC/SC service)
+        """
+        self.reader_monitor: ReaderMonitor = ReaderMonitor(transport, NFCReader._blocking)
+        self.lock: threading.Lock = threading.Lock()
+        self.jobs_available: threading.Condition = threading.Condition(self.lock)
+        self.jobs: deque[PoolJob] = deque()
+        # Both are changed by the reader monitor and the workers (only under the lock)
+        self.spool_readers: dict[str, SpoolReader] = {}
+        self.statistics: dict[str, dict[str, Any]] = {}
+        self.running: bool = False
+
+    def start(self) -> None:
+        """
+        Open every connected supported reader and start executing jobs
+        """
+        self.running = True
+        self.reader_monitor.subscribe(self.update_readers)
+        self.update_readers(self.reader_monitor.start())
+
+    def stop(self) -> None:
+        """
+        Stop executing jobs (pending jobs are cancelled)
+        """
+        with self.jobs_available:
+            self.running = False
+            while self.jobs:
+                self.jobs.popleft().cancel()
+            self.jobs_available.notify_all()
+            spool_readers: list[SpoolReader] = list(self.spool_readers.values())
+        for spool_reader in spool_readers:
+            spool_reader.cancel_wait_for_tag()
+        self.reader_monitor.stop()
+
+    @classmethod
+    def _is_pool_reader(cls, reader_name: str) -> bool:
+        """
+        Check if a reader should be used by the pool
+        :param reader_name: Name of the reader
+        :return: True if it should be used else False
+        """
+        if NFCReader.preferred_reader and NFCReader.preferred_reader.lower() in reader_name.lower():
+            return True
+        return NFCReader.is_supported_reader(reader_name)
+
+    def update_readers(self, reader_names: list[str]) -> None:
+        """
+        Start a worker for every new reader (called by the reader monitor)
+        :param reader_names: Names of the connected readers
+        """
+        for reader_name in reader_names:
+            with self.lock:
+                if not self.running or reader_name in self.spool_readers or not self._is_pool_reader(reader_name):
+                    continue
+            nfc_reader: NFCReader = NFCReader(reader_monitor=self.reader_monitor, reader_name=reader_name)
+            spool_reader: SpoolReader = SpoolReader(nfc_reader)
+            with self.lock:
+                # Another call (e.g. start() and the monitor) may have added the reader in the meantime
+                if not self.running or reader_name in self.spool_readers:
+                    self.reader_monitor.unsubscribe(nfc_reader.update_connection_state)
+                    continue
+                self.spool_readers[reader_name] = spool_reader
+                self.statistics[reader_name] = {
+                    "connected_since": time.monotonic(),
+                    "jobs": 0,
+                    "failed_jobs": 0,
+                    "busy_time": 0.0
+                }
+            nfc_reader.add_connection_listener(self._on_connection_changed)
+            worker_thread = threading.Thread(target=self._run_worker, args=(reader_name, spool_reader))
+            worker_thread.daemon = True
+            worker_thread.start()
+
+    def _on_connection_changed(self, connected: bool) -> None:
+        """
+        Wake up the workers, so the worker of a removed reader can stop
+        :param connected: New connection state of the reader
+        """
+        with self.jobs_available:
+            self.jobs_available.notify_all()
+
+    def submit(self, function: Callable[[SpoolReader], Any]) -> PoolJob:
+        """
+        Queue a job
+        :param function: Function to execute with the spool reader that got a tag first
+        :return: The queued job
+        """
+        job: PoolJob = PoolJob(function)
+        with self.jobs_available:
+            if not self.running:
+                job.cancel()
+                return job
+            self.jobs.append(job)
+            self.jobs_available.notify_all()
+        return job
+
+    def read_spool(self) -> PoolJob:
+        """
+        Queue a spool read
+        :return: The queued job (result: JSON data of the spool on success else None)
+        """
+        return self.submit(lambda spool_reader: spool_reader.read_spool())
+
+    def read_spool_raw(self) -> PoolJob:
+        """
+        Queue a raw spool read (dump)
+        :return: The queued job (result: uid and raw data of the nfc tag)
+        """
+        return self.submit(lambda spool_reader: spool_reader.read_spool_raw())
+
+    def write_spool(self, spool_specs: dict[str, Any], differential: bool = False, verify: bool = False) -> PoolJob:
+        """
+        Queue a spool write
+        :param spool_specs: JSON spool data
+        :param differential: Only write the pages that differ from the data on the spool
+        :param verify: Read the written pages back and rewrite the ones that don't match
+        :return: The queued job (result: success state)
+        """
+        return self.submit(lambda spool_reader: spool_reader.write_spool(spool_specs, differential, verify))
+
+    def _claim_job(self, reader_name: str) -> Optional[PoolJob]:
+        """
+        Take the oldest pending job
+        :param reader_name: Name of the reader that executes the job
+        :return: The job or None if there is none
+        """
+        with self.jobs_available:
+            while self.jobs:
+                job: PoolJob = self.jobs.popleft()
+                # Skip cancelled jobs
+                if job.future.set_running_or_notify_cancel():
+                    job.reader_name = reader_name
+                    return job
+        return None
+
+    def _run_worker(self, reader_name: str, spool_reader: SpoolReader) -> None:
+        """
+        Execute jobs with one reader until it is removed
+        :param reader_name: Name of the reader
+        :param spool_reader: The spool reader of the worker
+        """
+        nfc_reader: NFCReader = spool_reader.reader
+        while self.running and nfc_reader.reader is not None:
+            # Wait for a job
+            with self.jobs_available:
+                while self.running and nfc_reader.reader is not None and not self.jobs:
+                    self.jobs_available.wait()
+            if not self.running or nfc_reader.reader is None:
+                break
+
+            # Wait for a tag (in slices, so the worker notices when another reader took the job)
+            if not nfc_reader.wait_for_card_presence(nfc_reader.status_change_slice):
+                continue
+            job: Optional[PoolJob] = self._claim_job(reader_name)
+            if job is None:
+                continue
+
+            # Execute the job
+            start_time: float = time.monotonic()
+            failed: bool = False
+            try:
+                result: Any = job.function(spool_reader)
+                failed = result is None or result is False
+                job.future.set_result(result)
+            except Exception as e:
+                failed = True
+                logger.exception("Job on %s failed", reader_name)
+                job.future.set_exception(e)
+            with self.lock:
+                statistics: dict[str, Any] = self.statistics[reader_name]
+                statistics["jobs"] += 1
+                statistics["failed_jobs"] += int(failed)
+                statistics["busy_time"] += time.monotonic() - start_time
+
+            # Every tag is only used for one job
+            while self.running and nfc_reader.reader is not None:
+                if nfc_reader.wait_for_card_removal(nfc_reader.status_change_slice):
+                    break
+
+        # The reader was removed (or the pool stopped)
+        self.reader_monitor.unsubscribe(nfc_reader.update_connection_state)
+        with self.lock:
+            # A replugged reader may already have a new spool reader (that one stays)
+            if self.spool_readers.get(reader_name) is spool_reader:
+                del self.spool_readers[reader_name]
+            running: bool = self.running
+        # The reader may have been plugged in again before it was removed from the pool (no update for it then)
+        if running:
+            self.update_readers(self.reader_monitor.get_reader_names())
+
+    def get_statistics(self) -> dict[str, dict[str, Any]]:
+        """
+        Get the utilisation of every reader of the pool
+        :return: Statistics per reader name
+        """
+        with self.lock:
+            snapshot: dict[str, dict[str, Any]] = {reader_name: dict(statistics)
+                                                   for reader_name, statistics in self.statistics.items()}
+            connected: set[str] = set(self.spool_readers)
+        now: float = time.monotonic()
+        result: dict[str, dict[str, Any]] = {}
+        for reader_name, statistics in snapshot.items():
+            connected_time: float = now - statistics["connected_since"]
+            result[reader_name] = {
+                "connected": reader_name in connected,
+                "jobs": statistics["jobs"],
+                "failed_jobs": statistics["failed_jobs"],
+                "busy_time": statistics["busy_time"],
+                "utilisation": statistics["busy_time"] / connected_time if connected_time > 0 else 0.0
+            }
+        return result
+
+    def get_queue_length(self) -> int:
+        """
+        Get the number of jobs that wait for a tag
+        :return: Number of pending jobs
+        """
+        with self.jobs_available:
+            return len(self.jobs)
@@ -0,0 +1,387 @@
+import itertools
+import threading
+import time
+from typing import Optional
+
+from smartcard.CardConnection import CardConnection
+from smartcard.Exceptions import CardConnectionException, NoCardException
+from smartcard.reader.Reader import Reader
+from smartcard.scard import (INFINITE, SCARD_E_CANCELLED, SCARD_E_NO_READERS_AVAILABLE, SCARD_E_TIMEOUT,
+                             SCARD_S_SUCCESS, SCARD_STATE_CHANGED, SCARD_STATE_EMPTY, SCARD_STATE_PRESENT,
+                             SCARD_STATE_UNKNOWN)
+
+from .transport import Transport
+
+
+class VirtualNTAG213:
+    """
+    Memory of a virtual NTAG213 tag
+    """
+
+    page_count: int = 0x2d
+    version: list[int] = [0x00, 0x04, 0x04, 0x02, 0x01, 0x00, 0x0f, 0x03]  # GET_VERSION response
+    capability_container: bytes = b"\xe1\x10\x12\x00"
+
+    def __init__(self, uid: Optional[bytes] = None, pages: Optional[list[bytes]] = None):
+        """
+        Create a tag
+        :param uid: 7 byte uid (ignored if pages are given)
+        :param pages: Optional memory image (e.g. the pages of a CardData object)
+        """
+        if pages is not None:
+            self.pages: list[bytes] = [bytes(page) for page in pages]
+            self.pages += (self.page_count - len(self.pages)) * [b"\x00\x00\x00\x00"]
+            return
+        uid = uid or bytes([0x04, 0x11, 0x22, 0x33, 0x44, 0x55, 0x66])
+        self.pages = self.page_count * [b"\x00\x00\x00\x00"]
+        self.pages[0x00] = bytes([uid[0], uid[1], uid[2], 0x88 ^ uid[0] ^ uid[1] ^ uid[2]])
+        self.pages[0x01] = bytes(uid[3:7])
+        self.pages[0x02] = bytes([uid[3] ^ uid[4] ^ uid[5] ^ uid[6], 0x48, 0x00, 0x00])
+        self.pages[0x03] = self.capability_container
+        self.pages[self.page_count - 5] = b"\x00\x00\x00\xbd"  # Dynamic lock bytes
+        self.pages[self.page_count - 4] = b"\x04\x00\x00\xff"  # Configuration (no password protection)
+        self.pages[self.page_count - 3] = b"\x00\x05\x00\x00"
+
+    def get_uid(self) -> bytes:
+        """
+        Get the uid
+        :return: 7 byte uid
+        """
+        return self.pages[0x00][0:3] + self.pages[0x01]
+
+    def read(self, page: int, length: int = 4) -> Optional[bytes]:
+        """
+        Read from the memory (rolls over to page 0 at the end like the READ command)
+        :param page: First page
+        :param length: Number of bytes
+        :return: The data or None if the page doesn't exist
+        """
+        if not 0 <= page < self.page_count:
+            return None
+        data: bytes = b"".join(self.pages[(page + i) % self.page_count] for i in range((length + 3) // 4))
+        return data[:length]
+
+    def write(self, page: int, data: bytes) -> bool:
+        """
+        Write a page
+        :param page: Page number
+        :param data: 4 bytes
+        :return: Success state
+        """
+        # The uid pages are read only and the capability container is one time programmable
+        if not 0x02 < page < self.page_count or len(data) != 4:
+            return False
+        if page == 0x03:
+            data = bytes(a | b for a, b in zip(self.pages[page], data))
+        self.pages[page] = bytes(data)
+        return True
+
+
+class VirtualNTAG215(VirtualNTAG213):
+    """
+    Memory of a virtual NTAG215 tag
+    """
+
+    page_count: int = 0x87
+    version: list[int] = [0x00, 0x04, 0x04, 0x02, 0x01, 0x00, 0x11, 0x03]
+    capability_container: bytes = b"\xe1\x10\x3e\x00"
+
+
+class VirtualNTAG216(VirtualNTAG213):
+    """
+    Memory of a virtual NTAG216 tag
+    """
+
+    page_count: int = 0xe7
+    version: list[int] = [0x00, 0x04, 0x04, 0x02, 0x01, 0x00, 0x13, 0x03]
+    capability_container: bytes = b"\xe1\x10\x6d\x00"
+
+
+class SimulatedConnection(CardConnection):
+    """
+    Connection to the virtual tag of a simulated reader
+    """
+
+    def __init__(self, reader: "SimulatedReader"):
+        """
+        Create a connection
+        :param reader: The simulated reader
+        """
+        super().__init__(reader)
+        self.simulated_reader: SimulatedReader = reader
+        self.tag: Optional[VirtualNTAG213] = None
+
+    def connect(self, protocol=None, mode=None, disposition=None) -> None:
+        """
+        Connect to the tag on the reader
+        """
+        self.simulated_reader.delay()
+        if self.simulated_reader.tag is None:
+            raise NoCardException("Unable to connect", hresult=0)
+        self.tag = self.simulated_reader.tag
+        super().connect(protocol, mode, disposition)
+
+    def disconnect(self) -> None:
+        """
+        Disconnect from the tag
+        """
+        self.tag = None
+        super().disconnect()
+
+    def getATR(self) -> list[int]:
+        """
+        Get the ATR of a MIFARE Ultralight/NTAG tag on an ACR122
+        :return: The ATR
+        """
+        return [0x3b, 0x8f, 0x80, 0x01, 0x80, 0x4f, 0x0c, 0xa0, 0x00, 0x00, 0x03, 0x06, 0x03, 0x00, 0x03, 0x00, 0x00,
+                0x00, 0x00, 0x68]
+
+    def doTransmit(self, command: list[int], protocol=None) -> tuple[list[int], int, int]:
+        """
+        Answer an APDU like an ACR122 with an NTAG21x tag
+        :param command: The APDU
+        :param protocol: Ignored
+        :return: Response data and status words
+        """
+        self.simulated_reader.delay()
+        self.simulated_reader.apdu_count += 1
+        tag: Optional[VirtualNTAG213] = self.tag
+        if tag is None or tag is not self.simulated_reader.tag:
+            raise CardConnectionException("Card not connected")
+        command = list(command)
+
+        # Direct transmit (PN53x InCommunicateThru)
+        if command[:4] == [0xff, 0x00, 0x00, 0x00] and command[5:7] == [0xd4, 0x42]:
+            if not self.simulated_reader.direct_transmit:
+                return [], 0x6a, 0x81
+            if self.simulated_reader.tag_errors > 0:
+                self.simulated_reader.tag_errors -= 1
+                return [0xd5, 0x43, 0x01], 0x90, 0x00
+            response: Optional[list[int]] = self._handle_tag_command(tag, command[7:])
+            if response is None:
+                return [0xd5, 0x43, 0x01], 0x90, 0x00
+            return [0xd5, 0x43, 0x00] + response, 0x90, 0x00
+
+        # Get uid
+        if command == [0xff, 0xca, 0x00, 0x00, 0x00]:
+            return list(tag.get_uid()), 0x90, 0x00
+
+        # Read binary
+        if command[:3] == [0xff, 0xb0, 0x00] and len(command) == 5:
+            data: Optional[bytes] = tag.read(command[3], command[4])
+            if data is None:
+                return [], 0x63, 0x00
+            return list(data), 0x90, 0x00
+
+        # Update binary
+        if command[:3] == [0xff, 0xd6, 0x00] and len(command) == 9 and command[4] == 0x04:
+            if tag.write(command[3], bytes(command[5:9])):
+                return [], 0x90, 0x00
+            return [], 0x63, 0x00
+        return [], 0x6a, 0x81
+
+    @classmethod
+    def _handle_tag_command(cls, tag: VirtualNTAG213, command: list[int]) -> Optional[list[int]]:
+        """
+        Answer a raw NTAG command
+        :param tag: The tag
+        :param command: Raw command
+        :return: The response or None on errors
+        """
+        if command[:1] == [0x30] and len(command) == 2:  # READ
+            data: Optional[bytes] = tag.read(command[1], 16)
+            return list(data) if data is not None else None
+        if command[:1] == [0x3a] and len(command) == 3:  # FAST_READ
+            start, end = command[1], command[2]
+            if start > end or end >= tag.page_count:
+                return None
+            return list(tag.read(start, (end - start + 1) * 4))
+        if command == [0x60]:  # GET_VERSION
+            return list(tag.version)
+        if command[:1] == [0xa2] and len(command) == 6:  # WRITE
+            return [0x0a] if tag.write(command[1], bytes(command[2:6])) else None
+        return None
+
+
+class SimulatedReader(Reader):
+    """
+    A simulated reader with configurable latency
+    """
+
+    def __init__(self, transport: "SimulatedTransport", name: str, latency: float = 0.0):
+        """
+        Create a reader (use SimulatedTransport.add_reader)
+        :param transport: The transport of the reader
+        :param name: Name of the reader
+        :param latency: Time per APDU in seconds
+        """
+        super().__init__(name)
+        self.transport: SimulatedTransport = transport
+        self.latency: float = latency
+        self.tag: Optional[VirtualNTAG213] = None
+        self.apdu_count: int = 0
+        self.direct_transmit: bool = True  # False = reject raw tag commands like readers without direct transmit
+        self.tag_errors: int = 0  # Number of following raw tag commands that fail (e.g. a tag out of range)
+
+    def createConnection(self) -> SimulatedConnection:
+        """
+        Create a connection to the tag on the reader
+        :return: The connection
+        """
+        return SimulatedConnection(self)
+
+    def delay(self) -> None:
+        """
+        Wait for the configured latency
+        """
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def insert_tag(self, tag: Optional[VirtualNTAG213] = None) -> VirtualNTAG213:
+        """
+        Place a tag on the reader
+        :param tag: The tag (a new empty one if not given)
+        :return: The placed tag
+        """
+        self.tag = tag or VirtualNTAG213()
+        self.transport.notify()
+        return self.tag
+
+    def remove_tag(self) -> Optional[VirtualNTAG213]:
+        """
+        Remove the tag from the reader
+        :return: The removed tag
+        """
+        tag: Optional[VirtualNTAG213] = self.tag
+        self.tag = None
+        self.transport.notify()
+        return tag
+
+
+class SimulatedTransport(Transport):
+    """
+    In-process simulation of the PC/SC service with simulated readers and tags
+    """
+
+    pnp_notification: str = "\\\\?PnP?\\Notification"
+
+    def __init__(self):
+        """
+        Create a transport without readers
+        """
+        self.readers: dict[str, SimulatedReader] = {}
+        self.condition: threading.Condition = threading.Condition()
+        self.contexts = itertools.count(1)
+        self.waiting_contexts: set[int] = set()
+        self.cancelled_contexts: set[int] = set()
+
+    def add_reader(self, name: str = "ACS ACR122U PICC Interface (simulated)", latency: float = 0.0) -> SimulatedReader:
+        """
+        Plug in a simulated reader
+        :param name: Name of the reader (needs to be supported or preferred to be used)
+        :param latency: Time per APDU in seconds
+        :return: The reader
+        """
+        reader: SimulatedReader = SimulatedReader(self, name, latency)
+        self.readers[name] = reader
+        self.notify()
+        return reader
+
+    def remove_reader(self, name: str) -> None:
+        """
+        Unplug a simulated reader
+        :param name: Name of the reader
+        """
+        self.readers.pop(name, None)
+        self.notify()
+
+    def notify(self) -> None:
+        """
+        Wake up pending status change requests
+        """
+        with self.condition:
+            self.condition.notify_all()
+
+    def _get_state(self, reader_name: str) -> int:
+        """
+        Get the current state of a reader
+        :param reader_name: Name of the reader
+        :return: The event state
+        """
+        if reader_name == self.pnp_notification:
+            return len(self.readers) << 16  # Like pcsc-lite, the upper bits contain the number of readers
+        reader: Optional[SimulatedReader] = self.readers.get(reader_name)
+        if reader is None:
+            return SCARD_STATE_UNKNOWN
+        return SCARD_STATE_PRESENT if reader.tag is not None else SCARD_STATE_EMPTY
+
+    def establish_context(self) -> tuple[int, int]:
+        """
+        Establish a context for status change requests
+        :return: Result code and context
+        """
+        return SCARD_S_SUCCESS, next(self.contexts)
+
+    def list_readers(self, context: int) -> tuple[int, list[str]]:
+        """
+        List the connected readers
+        :param context: Context
+        :return: Result code and names of the connected readers
+        """
+        if not self.readers:
+            return SCARD_E_NO_READERS_AVAILABLE, []
+        return SCARD_S_SUCCESS, list(self.readers)
+
+    def get_status_change(self, context: int, timeout: int, reader_states: list[tuple]) -> tuple[int, list[tuple]]:
+        """
+        Wait until the state of a reader differs from the given state
+        :param context: Context
+        :param timeout: Timeout in milliseconds (INFINITE = no timeout)
+        :param reader_states: Known states as (reader name, state) tuples
+        :return: Result code and new states as (reader name, event state, atr) tuples
+        """
+        deadline: Optional[float] = time.monotonic() + timeout / 1000 if timeout != INFINITE else None
+        with self.condition:
+            self.waiting_contexts.add(context)
+            try:
+                while True:
+                    if context in self.cancelled_contexts:
+                        self.cancelled_contexts.discard(context)
+                        return SCARD_E_CANCELLED, []
+                    new_states: list[tuple] = []
+                    changed: bool = False
+                    for reader_state in reader_states:
+                        event_state: int = self._get_state(reader_state[0])
+                        if event_state != reader_state[1] & ~SCARD_STATE_CHANGED:
+                            event_state |= SCARD_STATE_CHANGED
+                            changed = True
+                        new_states.append((reader_state[0], event_state, []))
+                    if changed:
+                        return SCARD_S_SUCCESS, new_states
+                    remaining: Optional[float] = deadline - time.monotonic() if deadline is not None else None
+                    if remaining is not None and remaining <= 0:
+                        return SCARD_E_TIMEOUT, []
+                    self.condition.wait(remaining)
+            finally:
+                self.waiting_contexts.discard(context)
+
+    def cancel(self, context: int) -> int:
+        """
+        Cancel a pending status change request
+        :param context: Context of the request
+        :return: Result code
+        """
+        with self.condition:
+            # Like SCardCancel, this only affects a request that is currently pending
+            if context in self.waiting_contexts:
+                self.cancelled_contexts.add(context)
+                self.condition.notify_all()
+        return SCARD_S_SUCCESS
+
+    def get_reader(self, reader_name: str) -> Reader:
+        """
+        Get a reader that can create card connections
+        :param reader_name: Name of the reader
+        :return: The reader
+        """
+        return self.readers[reader_name]
@@ -0,0 +1,35 @@
+from typing import Optional
+
+
+class SkuIndex:
+    """
+    Lookup of the filament type of a SKU (by full SKU, else by the longest matching SKU prefix)
+    """
+
+    def __init__(self, prefixes: dict[str, str], skus: Optional[dict[str, str]] = None):
+        """
+        Build the index
+        :param prefixes: Filament types by SKU prefix
+        :param skus: Optional filament types by full SKU (take precedence over the prefixes)
+        """
+        self.skus: dict[str, str] = dict(skus or {})
+        # Prefixes bucketed by length, so a lookup checks one slice per distinct length (longest first)
+        self.prefixes: dict[int, dict[str, str]] = {}
+        for prefix, filament_type in prefixes.items():
+            self.prefixes.setdefault(len(prefix), {})[prefix] = filament_type
+        self.prefix_lengths: list[int] = sorted(self.prefixes, reverse=True)
+
+    def get_type(self, sku: str) -> Optional[str]:
+        """
+        Get the filament type of a SKU
+        :param sku: The SKU
+        :return: The filament type or None if the SKU is unknown
+        """
+        filament_type: Optional[str] = self.skus.get(sku)
+        if filament_type is not None:
+            return filament_type
+        for length in self.prefix_lengths:
+            filament_type = self.prefixes[length].get(sku[:length])
+            if filament_type is not None:
+                return filament_type
+        return None
@@ -0,0 +1,169 @@
+import re
+from typing import Any, Callable, Optional
+
+from .spool_reader import SpoolData
+
+# A check returns an error message or None if the value is valid
+Check = Callable[[Any], Optional[str]]
+
+_MISSING: object = object()
+
+
+class SpoolSpecsSchema:
+    """
+    Validation of spool specs before they are written (compiled from SpoolData.LAYOUT on the first use)
+    """
+
+    color_pattern: re.Pattern = re.compile(r"#?[0-9a-fA-F]{6}(?:[0-9a-fA-F]{2})?")
+    # Fields of the spool specs that have to be given (nested fields as "<key>.<sub key>")
+    required_fields: set[str] = {"type", "color", "range_a.nozzle_min", "range_a.nozzle_max", "bed_min", "bed_max",
+                                 "diameter", "length", "weight"}
+    # Compiled rules (key, sub key or None, required, check)
+    rules: Optional[list[tuple[str, Optional[str], bool, Check]]] = None
+
+    @classmethod
+    def _get_int_check(cls, maximum: int) -> Check:
+        """
+        Create the check of an integer field
+        :param maximum: Maximum value of the field
+        :return: The check
+        """
+        message: str = f"has to be an integer between 0 and {maximum}"
+
+        def check(value: Any) -> Optional[str]:
+            """
+            Check an integer
+            :param value: The value
+            :return: Error message or None
+            """
+            if type(value) is not int or not 0 <= value <= maximum:
+                return message
+            return None
+
+        return check
+
+    @classmethod
+    def _get_string_check(cls, size: int) -> Check:
+        """
+        Create the check of a string field
+        :param size: Size of the field in bytes
+        :return: The check
+        """
+        message: str = f"has to be a text with up to {size} latin-1 characters"
+
+        def check(value: Any) -> Optional[str]:
+            """
+            Check a string
+            :param value: The value
+            :return: Error message or None
+            """
+            if not isinstance(value, str) or len(value) > size:
+                return message
+            try:
+                value.encode("latin-1")
+            except UnicodeEncodeError:
+                return message
+            return None
+
+        return check
+
+    @classmethod
+    def _get_diameter_check(cls, maximum: int) -> Check:
+        """
+        Create the check of the diameter (stored in 1/100 mm)
+        :param maximum: Maximum value of the field
+        :return: The check
+        """
+        message: str = f"has to be a number between 0.01 and {maximum / 100}"
+
+        def check(value: Any) -> Optional[str]:
+            """
+            Check a diameter
+            :param value: The value
+            :return: Error message or None
+            """
+            if type(value) not in (int, float):
+                return message
+            try:
+                if not 1 <= round(value * 100) <= maximum:
+                    return message
+            except (OverflowError, ValueError):  # Infinite or NaN
+                return message
+            return None
+
+        return check
+
+    @classmethod
+    def _check_color(cls, value: Any) -> Optional[str]:
+        """
+        Check a color
+        :param value: The value
+        :return: Error message or None
+        """
+        if not isinstance(value, str) or (value and cls.color_pattern.fullmatch(value) is None):
+            return "has to be a hex color (#rrggbb) or empty"
+        return None
+
+    @classmethod
+    def get_rules(cls) -> list[tuple[str, Optional[str], bool, Check]]:
+        """
+        Get the compiled rules (the limits are taken from the tag layout)
+        :return: The rules (key, sub key or None, required, check)
+        """
+        if cls.rules is None:
+            fields = SpoolData.LAYOUT.fields
+
+            def get_int_check(name: str) -> Check:
+                """
+                Create the check of an integer layout field
+                :param name: Name of the layout field
+                :return: The check
+                """
+                return cls._get_int_check(2 ** (8 * fields[name].size) - 1)
+
+            rules: list[tuple[str, Optional[str], bool, Check]] = [
+                ("type", None, True, cls._get_string_check(fields["type"].size)),
+                ("manufacturer", None, False, cls._get_string_check(fields["manufacturer"].size)),
+                ("color", None, True, cls._check_color)
+            ]
+            for range_name in ["range_a", "range_b", "range_c"]:
+                for key in SpoolData.RANGE_KEYS:
+                    rules.append((range_name, key, f"{range_name}.{key}" in cls.required_fields,
+                                  get_int_check(f"{range_name}_{key}")))
+            for name in ["bed_min", "bed_max", "length", "weight"]:
+                rules.append((name, None, True, get_int_check(name)))
+            rules.append(("diameter", None, True, cls._get_diameter_check(2 ** (8 * fields["diameter"].size) - 1)))
+            cls.rules = rules
+        return cls.rules
+
+    @classmethod
+    def validate(cls, spool_specs: Any) -> dict[str, str]:
+        """
+        Validate spool specs (e.g. the payload of a write request)
+        :param spool_specs: The spool specs
+        :return: Error messages by field (nested fields as "<key>.<sub key>", empty if the specs are valid)
+        """
+        if not isinstance(spool_specs, dict):
+            return {"": "has to be an object"}
+        errors: dict[str, str] = {}
+        for key, sub_key, required, check in cls.get_rules():
+            value: Any = spool_specs.get(key, _MISSING)
+            name: str = key
+            if sub_key is not None:
+                if value is _MISSING:
+                    if required:
+                        errors.setdefault(key, "is required")
+                    continue
+                if not isinstance(value, dict):
+                    errors.setdefault(key, "has to be an object")
+                    continue
+                name = f"{key}.{sub_key}"
+                value = value.get(sub_key, _MISSING)
+            if value is _MISSING:
+                if required:
+                    errors[name] = "is required"
+                continue
+            error: Optional[str] = check(value)
+            if error is not None:
+                errors[name] = error
+        return errors
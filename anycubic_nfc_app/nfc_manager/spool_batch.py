@@ -0,0 +1,249 @@
+from typing import Any, Iterable, Optional, Union
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional (only needed for batch conversions)
+    np = None
+
+from .spool_reader import SpoolData
+
+
+class SpoolBatch:
+    """
+    Batch codec for many spool records (columns of spool specs <-> N x 180 byte tag images, requires NumPy)
+    """
+
+    record_size: int = SpoolData.tag_page_count * SpoolData.page_size
+    # Columns that can be left out when encoding (with their default value)
+    optional_columns: dict[str, Any] = {
+        "manufacturer": "AC",
+        "range_a_speed_min": 0,
+        "range_a_speed_max": 0,
+        **{f"{range_name}_{key}": 0 for range_name in ["range_b", "range_c"] for key in SpoolData.RANGE_KEYS}
+    }
+    # Struct formats of the layout fields as NumPy types
+    numpy_formats: dict[str, str] = {
+        "B": "u1",
+        "H": "<u2"
+    }
+    dtype: Optional[Any] = None  # Compiled on the first use
+
+    @classmethod
+    def _require_numpy(cls) -> None:
+        """
+        Make sure that NumPy is installed
+        """
+        if np is None:
+            raise ImportError("The batch codec requires NumPy (pip install numpy)")
+
+    @classmethod
+    def get_dtype(cls) -> Any:
+        """
+        Get the structured dtype of one tag image (mirrors SpoolData.LAYOUT)
+        :return: The NumPy dtype
+        """
+        cls._require_numpy()
+        if cls.dtype is None:
+            fields = SpoolData.LAYOUT.fields.values()
+            cls.dtype = np.dtype({
+                "names": [field.name for field in fields],
+                "formats": [cls.numpy_formats.get(field.struct_format, f"S{field.size}") for field in fields],
+                "offsets": [field.offset for field in fields],
+                "itemsize": cls.record_size
+            })
+        return cls.dtype
+
+    @classmethod
+    def _get_int_column(cls, columns: dict[str, Any], name: str, maximum: int) -> Any:
+        """
+        Get an integer column and check its range
+        :param columns: The columns
+        :param name: Name of the column
+        :param maximum: Maximum value of the field
+        :return: The column as NumPy array
+        """
+        column = np.asarray(columns[name] if name in columns else cls.optional_columns[name], dtype=np.int64)
+        if column.size and (column.min() < 0 or column.max() > maximum):
+            raise ValueError(f"Values of {name} have to be between 0 and {maximum}")
+        return column
+
+    @classmethod
+    def _encode_strings(cls, strings: Any) -> Any:
+        """
+        Encode strings (latin-1, the tag fields cut them to 20 bytes)
+        :param strings: The strings
+        :return: The encoded strings as NumPy array
+        """
+        return np.char.encode(np.asarray(strings, dtype=str), "latin-1")
+
+    @classmethod
+    def encode(cls, columns: dict[str, Any]) -> Any:
+        """
+        Encode columns of spool specs to tag images (like SpoolData(spool_specs) for every row)
+        :param columns: The columns (lists or arrays of the same length, nested keys are joined by "_")
+        :return: The tag images as N x 180 uint8 array
+        """
+        dtype = cls.get_dtype()
+        types = np.asarray(columns["type"], dtype=str)
+        records = np.zeros(len(types), dtype=dtype)
+
+        # Static
+        records["magic"] = 0x7b
+        records["version"] = SpoolData.FORMAT_VERSIONS[SpoolData.format_version]
+        records["custom_marker"] = SpoolData.CUSTOM_MARKER
+
+        # SKU (only looked up once per type), manufacturer and type
+        unique_types, type_indexes = np.unique(types, return_inverse=True)
+        skus: list[str] = [SpoolData.SKUS.get(filament_type, "AHPLBK-101") for filament_type in unique_types]
+        records["sku"] = cls._encode_strings(skus)[type_indexes] if skus else []
+        manufacturers = columns.get("manufacturer", cls.optional_columns["manufacturer"])
+        records["manufacturer"] = cls._encode_strings(np.broadcast_to(manufacturers, types.shape))
+        records["type"] = cls._encode_strings(types)
+
+        # Ranges, temperatures, diameter, length and weight
+        for name, field in SpoolData.LAYOUT.fields.items():
+            if field.struct_format == "H" and name != "diameter":
+                records[name] = cls._get_int_column(columns, name, 0xffff)
+        diameters = np.round(np.asarray(columns["diameter"], dtype=np.float64) * 100)
+        records["diameter"] = cls._get_int_column({"diameter": diameters}, "diameter", 0xffff)
+
+        # Colors (abgr, empty colors are not written)
+        images = records.view(np.uint8).reshape(len(records), cls.record_size)
+        colors = np.char.lstrip(np.asarray(columns["color"], dtype=str), "#").astype("U6")
+        has_color = np.char.str_len(colors) > 0
+        if np.any(np.char.str_len(colors[has_color]) != 6):
+            raise ValueError("Colors have to be hex colors (#rrggbb)")
+        rgb = np.frombuffer(bytes.fromhex("".join(colors[has_color].tolist())), dtype=np.uint8).reshape(-1, 3)
+        color_offset: int = SpoolData.LAYOUT.fields["color"].offset
+        images[has_color, color_offset] = 0xff
+        images[has_color, color_offset + 1:color_offset + 4] = rgb[:, ::-1]
+        return images
+
+    @classmethod
+    def _as_images(cls, images: Union[bytes, Any]) -> Any:
+        """
+        Get tag images as contiguous N x 180 uint8 array
+        :param images: Array or concatenated bytes of the images
+        :return: The images
+        """
+        if isinstance(images, (bytes, bytearray, memoryview)):
+            if len(images) % cls.record_size:
+                raise ValueError(f"The data has to consist of {cls.record_size} byte records")
+            images = np.frombuffer(images, dtype=np.uint8)
+        return np.ascontiguousarray(images, dtype=np.uint8).reshape(-1, cls.record_size)
+
+    @classmethod
+    def _decode_strings(cls, images: Any, name: str) -> Any:
+        """
+        Decode a null terminated string field of every image
+        :param images: The images
+        :param name: Name of the layout field
+        :return: The decoded strings as NumPy array
+        """
+        field = SpoolData.LAYOUT.fields[name]
+        data = images[:, field.offset:field.offset + field.size]
+        # Clear everything after the first null byte (NumPy only strips trailing null bytes)
+        data = data * (np.cumsum(data == 0, axis=1) == 0)
+        return np.char.decode(np.ascontiguousarray(data).view(f"S{field.size}").reshape(-1), "latin-1")
+
+    @classmethod
+    def _to_hex(cls, images: Any, offsets: list[int]) -> Any:
+        """
+        Convert some bytes of every image to a hex string
+        :param images: The images
+        :param offsets: Offsets of the bytes (in the order of the hex string)
+        :return: The hex strings as NumPy array
+        """
+        hex_table = np.array([f"{i:02x}" for i in range(256)])
+        return np.ascontiguousarray(hex_table[images[:, offsets]]).view(f"U{2 * len(offsets)}").reshape(-1)
+
+    @classmethod
+    def decode(cls, images: Union[bytes, Any]) -> dict[str, Any]:
+        """
+        Decode tag images to columns of spool specs (like get_spool_specs() for every image)
+        :param images: N x 180 uint8 array or concatenated 180 byte images
+        :return: The columns as NumPy arrays
+        """
+        dtype = cls.get_dtype()
+        images = cls._as_images(images)
+        records = images.view(dtype).reshape(-1)
+        skus = cls._decode_strings(images, "sku")
+        type_names = cls._decode_strings(images, "type")
+
+        # The filament type is only looked up once per sku and type string
+        keys, key_indexes = np.unique(np.stack([skus, type_names], axis=1), axis=0, return_inverse=True)
+        types = np.array([SpoolData._get_type(sku, type_name) for sku, type_name in keys.tolist()], dtype=str)
+
+        color_offset: int = SpoolData.LAYOUT.fields["color"].offset
+        colors = np.char.add("#", cls._to_hex(images, [color_offset + 3, color_offset + 2, color_offset + 1]))
+        no_color = ~images[:, color_offset:color_offset + 4].any(axis=1)
+
+        columns: dict[str, Any] = {
+            "uid": cls._to_hex(images, [0, 1, 2, 4, 5, 6, 7]),
+            "type": types[key_indexes] if len(keys) else np.array([], dtype=str),
+            "manufacturer": cls._decode_strings(images, "manufacturer"),
+            "color": np.where(no_color, "", colors)
+        }
+        for range_name in ["range_a", "range_b", "range_c"]:
+            for name in SpoolData.SPEC_FIELDS[range_name]:
+                columns[name] = records[name]
+        columns.update({
+            "bed_min": records["bed_min"],
+            "bed_max": records["bed_max"],
+            "diameter": records["diameter"] / 100,
+            "length": records["length"],
+            "weight": records["weight"],
+            "raw_sku": skus,
+            "raw_type": type_names,
+            "raw_is_custom": records["custom_marker"] == SpoolData.CUSTOM_MARKER
+        })
+        return columns
+
+    @classmethod
+    def get_columns(cls, spool_specs: Iterable[dict[str, Any]]) -> dict[str, list[Any]]:
+        """
+        Convert spool specs to columns (e.g. for encode())
+        :param spool_specs: JSON spool specs
+        :return: The columns (nested keys are joined by "_")
+        """
+        columns: dict[str, list[Any]] = {}
+        spool_specs = list(spool_specs)
+        for index, specs in enumerate(spool_specs):
+            for key, value in specs.items():
+                items = [(f"{key}_{sub_key}", sub_value) for sub_key, sub_value in value.items()] \
+                    if isinstance(value, dict) else [(key, value)]
+                for name, item in items:
+                    if name not in columns:
+                        columns[name] = [cls.optional_columns.get(name)] * index
+                    columns[name].append(item)
+            for name, column in columns.items():
+                if len(column) <= index:
+                    column.append(cls.optional_columns.get(name))
+        return columns
+
+    @classmethod
+    def get_spool_specs(cls, columns: dict[str, Any], index: int) -> dict[str, Any]:
+        """
+        Get the spool specs of one row of decoded columns
+        :param columns: The columns returned by decode()
+        :param index: Index of the row
+        :return: Spool specs JSON (same as get_spool_specs() of SpoolData)
+        """
+        def get_value(name: str) -> Any:
+            """
+            Get a value as Python type
+            :param name: Name of the column
+            :return: The value
+            """
+            value = columns[name][index]
+            return value.item() if hasattr(value, "item") else value
+
+        spool_specs: dict[str, Any] = {}
+        for field in SpoolData.FIELD_PAGES:
+            if field.startswith("range_"):
+                spool_specs[field] = {key: get_value(f"{field}_{key}") for key in SpoolData.RANGE_KEYS}
+            elif field == "raw":
+                spool_specs[field] = {key: get_value(f"raw_{key}") for key in ["sku", "type", "is_custom"]}
+            else:
+                spool_specs[field] = get_value(field)
+        return spool_specs
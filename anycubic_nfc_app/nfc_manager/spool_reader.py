@@ -1,7 +1,17 @@
 import json
-from typing import Any, Optional
+import struct
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional
 
-from .nfc_reader import CardData, NFCReader
+from .cancel_token import CancelToken
+from .nfc_reader import CardData, NFCReader, ReadResult, WriteResult
+from .operation_queue import OperationQueue, QueuedOperation
+from .sku_index import SkuIndex
+from .tag_layout import LayoutField, TagLayout
+
+if TYPE_CHECKING:
+    from .dump_archive import DumpArchive
 
 
 class SpoolData(CardData):
@@ -9,6 +19,10 @@ class SpoolData(CardData):
     Spool data
     """
 
+    __slots__ = ()
+
+    tag_page_count: int = 0x2d  # Pages of the NTAG213 that spools use
+
     SKUS: dict[str, str] = {
         "PLA": "AHPLBK-101",
         "PLA+": "AHPLPBK-102",  # Material name not recognized by slicer (recognized as PLA)
@@ -33,13 +47,93 @@ class SpoolData(CardData):
         "HTP": "TPU",
         "HFG": "PLA Luminous"
     }
+    # SKUs found on official tags (see format.md, take precedence over the prefixes and the SKUs of the types)
+    KNOWN_SKUS: dict[str, str] = {
+        "HPL16-101": "PLA",  # PLA Basic Pantone Peach Fuzz
+        "HPL17-101": "PLA",  # PLA Basic Pantone Interstellar Violet
+        "HPL18-101": "PLA",  # PLA Basic Pantone Tropical Turquoise
+        "HPL19-101": "PLA",  # PLA Basic Pantone Spring Leaf
+        "HPL19-102": "PLA",  # PLA Basic Pantone Spring Leaf (dump in format.md)
+        "AHPLPBW-102": "PLA+",  # PLA+ Bright White
+        "AHPLPDB-102": "PLA+",  # PLA+ Dazzling Blue
+        "AHPLPBK-102": "PLA+",  # PLA+ Pearl Black
+        "AHPLPGY-102": "PLA+",  # PLA+ Texture Grey
+        "AHPLPBR-102": "PLA+",  # PLA+ Bright Red
+        "AHPLCG-103": "PLA",  # PLA Classic Green
+        "AHPLSP-103": "PLA",  # PLA Strawberry Pink
+        "AHPLVO-103": "PLA",  # PLA Vibrant Orange
+        "AHPLVY-103": "PLA",  # PLA Vibrant Yellow
+        "AHPLPO-103": "PLA",  # PLA Purple Opulence (its prefix would be PLA+)
+        "AHPLKB-103": "PLA",  # PLA Dark Brown
+        "AHPLLB-103": "PLA",  # PLA Beige
+        "AHPLRR-103": "PLA"  # PLA Bright Red
+    }
+    # Built once, so a decode only needs a few dict lookups (the SKUs that are written for the types are known as well)
+    SKU_INDEX: SkuIndex = SkuIndex(SKU_PREFIXES, {**{sku: filament_type for filament_type, sku in SKUS.items()},
+                                                  **KNOWN_SKUS})
+
+    # Format versions by the version byte (see format.md, tags are always written with the newest version)
+    FORMAT_VERSIONS: dict[int, int] = {
+        1: 0x64,
+        2: 0x65  # Adds the manufacturer and the print speed ranges
+    }
+    format_version: int = 2
+    # Layout of the fields in the user memory (integers are little endian, strings are null terminated)
+    LAYOUT: TagLayout = TagLayout([
+        LayoutField("magic", 0x04, 0, "B"),
+        LayoutField("version", 0x04, 2, "B"),
+        LayoutField("sku", 0x05, 0, "20s"),
+        LayoutField("manufacturer", 0x0a, 0, "20s", since_version=2),
+        LayoutField("type", 0x0f, 0, "20s"),
+        LayoutField("color", 0x14, 0, "4s"),  # abgr
+        LayoutField("range_a_speed_min", 0x17, 0, "H", since_version=2),
+        LayoutField("range_a_speed_max", 0x17, 2, "H", since_version=2),
+        LayoutField("range_a_nozzle_min", 0x18, 0, "H"),
+        LayoutField("range_a_nozzle_max", 0x18, 2, "H"),
+        LayoutField("range_b_speed_min", 0x19, 0, "H", since_version=2),
+        LayoutField("range_b_speed_max", 0x19, 2, "H", since_version=2),
+        LayoutField("range_b_nozzle_min", 0x1a, 0, "H", since_version=2),
+        LayoutField("range_b_nozzle_max", 0x1a, 2, "H", since_version=2),
+        LayoutField("range_c_speed_min", 0x1b, 0, "H", since_version=2),
+        LayoutField("range_c_speed_max", 0x1b, 2, "H", since_version=2),
+        LayoutField("range_c_nozzle_min", 0x1c, 0, "H", since_version=2),
+        LayoutField("range_c_nozzle_max", 0x1c, 2, "H", since_version=2),
+        LayoutField("bed_min", 0x1d, 0, "H"),
+        LayoutField("bed_max", 0x1d, 2, "H"),
+        LayoutField("diameter", 0x1e, 0, "H"),  # In 10^-2 mm
+        LayoutField("length", 0x1e, 2, "H"),
+        LayoutField("weight", 0x1f, 0, "H"),
+        LayoutField("custom_marker", 0x27, 3, "B")
+    ])
+    CUSTOM_MARKER: int = 0x4d
+    RANGE_KEYS: list[str] = ["speed_min", "speed_max", "nozzle_min", "nozzle_max"]
+    # Layout fields of every field of the spool specs
+    SPEC_FIELDS: dict[str, list[str]] = {
+        "type": ["sku", "type"],
+        "manufacturer": ["manufacturer"],
+        "color": ["color"],
+        "range_a": [f"range_a_{key}" for key in RANGE_KEYS],
+        "range_b": [f"range_b_{key}" for key in RANGE_KEYS],
+        "range_c": [f"range_c_{key}" for key in RANGE_KEYS],
+        "bed_min": ["bed_min"],
+        "bed_max": ["bed_max"],
+        "diameter": ["diameter"],
+        "length": ["length"],
+        "weight": ["weight"],
+        "raw": ["sku", "type", "custom_marker"]
+    }
+    # Pages that every field of the spool specs is read from
+    FIELD_PAGES: dict[str, list[int]] = {
+        "uid": [0x00, 0x01],
+        **LAYOUT.get_group_pages(SPEC_FIELDS)
+    }
 
     def __init__(self, spool_specs: Optional[dict[str, Any]] = None):
         """
         Create a spool data object
         :param spool_specs: Optionally, add spool specs directly
         """
-        super().__init__(page_count=0x2d)
+        super().__init__(page_count=self.tag_page_count)
         if spool_specs:
             self.set_spool_specs(spool_specs)
 
@@ -51,245 +145,156 @@ class SpoolData(CardData):
         """
         return list(cls.SKUS.keys())
 
-    def _write_byte(self, page: int, index: int, data: int) -> None:
-        """
-        Write a byte
-        :param page: Page in the data
-        :param index: Index on the page
-        :param data: Byte to write
-        """
-        page_data = bytearray(self.pages[page])
-        page_data[index] = data
-        self.pages[page] = bytes(page_data)
-
-    def _read_byte(self, page: int, index: int) -> int:
-        """
-        Write a byte
-        :param page: Page in the data
-        :param index: Index on the page
-        :return: read byte
-        """
-        return bytearray(self.pages[page])[index]
-
-    def _write_bytes(self, page: int, index: int, data: int) -> None:
+    def read_uid(self) -> str:
         """
-        Write two bytes (big endian)
-        :param page: Page in the data
-        :param index: Index on the page
-        :param data: Bytes to write
+        Read the tags uid
+        :return: The hex uid
         """
-        low_byte = data % 256
-        high_byte = data // 256
-        self._write_byte(page, index, low_byte)
-        if index == 3:
-            self._write_byte(page + 1, 0, high_byte)
-        else:
-            self._write_byte(page, index + 1, high_byte)
+        # Bytes 0-2 of page 0 and page 1 (byte 3 of page 0 is a check byte)
+        return self.data[0:3].hex() + self.data[4:8].hex()
 
-    def _read_bytes(self, page: int, index: int) -> int:
+    @classmethod
+    def _encode_color(cls, hex_color: str) -> bytes:
         """
-        Read two bytes (big endian)
-        :param page: Page in the data
-        :param index: Index on the page
-        :return: Read bytes
+        Encode a hex color (abgr)
+        :param hex_color: The hex color (with #)
+        :return: The encoded color
         """
-        low_byte: int = self._read_byte(page, index)
-        if index == 3:
-            high_byte = self._read_byte(page + 1, 0)
-        else:
-            high_byte = self._read_byte(page, index + 1)
-        return high_byte * 256 + low_byte
+        return b"\xff" + bytes.fromhex(hex_color.lstrip('#')[:6])[::-1]
 
-    def read_uid(self) -> str:
-        """
-        Read the tags uid
-        :return: The hex uid
+    @classmethod
+    def _decode_color(cls, data: bytes) -> str:
         """
-        a = self._read_byte(0, 0)
-        b = self._read_byte(0, 1)
-        c = self._read_byte(0, 2)
-        d = self._read_byte(1, 0)
-        e = self._read_byte(1, 1)
-        f = self._read_byte(1, 2)
-        g = self._read_byte(1, 3)
-        uid: str = f"{a:02x}{b:02x}{c:02x}{d:02x}{e:02x}{f:02x}{g:02x}"
-        return uid
-
-    def _write_color(self, page: int, hex_color: str) -> None:
-        """
-        Write a hex color (abgr)
-        :param page: Page in the data
-        :param hex_color: The hex color to write (with #)
-        """
-        if not hex_color:
-            return
-        hex_color = hex_color.lstrip('#')
-        r, g, b = tuple(int(hex_color[i:i + 2], 16) for i in (0, 2, 4))
-        self._write_byte(page, 0, 255)
-        self._write_byte(page, 1, b)
-        self._write_byte(page, 2, g)
-        self._write_byte(page, 3, r)
-
-    def _read_color(self, page: int) -> str:
-        """
-        Read a color (abgr)
-        :param page: Page in the data
+        Decode a color (abgr)
+        :param data: The encoded color
         :return: The hex color code
         """
-        a = self._read_byte(page, 0)
-        b = self._read_byte(page, 1)
-        g = self._read_byte(page, 2)
-        r = self._read_byte(page, 3)
-        color: str = f"#{r:02x}{g:02x}{b:02x}"
-        if color == "#000000" and a == 0:
+        if data == b"\x00\x00\x00\x00":
             return ""
-        return color
+        return "#" + data[:0:-1].hex()
 
-    def _write_string(self, page: int, data: str) -> None:
-        """
-        Write a string (max 20 characters)
-        :param page: Page in the data
-        :param data: String to write
-        """
-        for i in range(min(len(data), 20)):
-            self._write_byte(page + i // 4, i % 4, ord(data[i]))
-
-    def _read_string(self, page) -> str:
+    @classmethod
+    def _encode_string(cls, data: str) -> bytes:
         """
-        Read a string (max 20 characters)
-        :param page: Page in the data
-        :return: The read string
+        Encode a string (max 20 characters)
+        :param data: String to encode
+        :return: The encoded string
         """
-        data: str = ""
-        i = 0
-        byte = self._read_byte(page, i)
-        while byte > 0:
-            data += chr(byte)
-            if len(data) >= 20:
-                break
-            i += 1
-            if i == 4:
-                i = 0
-                page += 1
-            byte = self._read_byte(page, i)
-        return data
+        return data[:20].encode("latin-1")
 
-    def _set_format_version(self, version: int) -> None:
+    @classmethod
+    def _decode_string(cls, data: bytes) -> str:
         """
-        Set the format version of the tag
-        :param version: Version (1 or 2 (adds print speed))
+        Decode a string (null terminated or 20 characters long)
+        :param data: The encoded string
+        :return: The decoded string
         """
-        if version == 1:
-            self._write_byte(0x04, 2, 0x64)
-        elif version == 2:
-            self._write_byte(0x04, 2, 0x65)
+        return data.split(b"\x00", 1)[0].decode("latin-1")
 
     def set_spool_specs(self, spool_specs: dict[str, Any]) -> None:
         """
         Set the spool specs data
         :param spool_specs: Spool specs JSON
         """
-        # Static
-        self._write_byte(0x04, 0, 0x7b)
-        self._write_byte(0x27, 3, 0x4d)  # Custom spool marker
-        self._set_format_version(2)
-
-        # SKU, manufacturer and type
-        self._write_string(0x05, self.SKUS.get(spool_specs["type"], "AHPLBK-101"))
-        self._write_string(0x0a, spool_specs.get("manufacturer", "AC"))
-        self._write_string(0x0f, spool_specs["type"])
-
-        # Color
-        self._write_color(0x14, spool_specs["color"])
-
-        # Print speed (optional)
-        self._write_bytes(0x17, 0, spool_specs["range_a"].get("speed_min", 0))
-        self._write_bytes(0x17, 2, spool_specs["range_a"].get("speed_max", 0))
-
-        # Nozzle temp
-        self._write_bytes(0x18, 0, spool_specs["range_a"]["nozzle_min"])
-        self._write_bytes(0x18, 2, spool_specs["range_a"]["nozzle_max"])
-
+        values: dict[str, Any] = {
+            # Static
+            "magic": 0x7b,
+            "version": self.FORMAT_VERSIONS[self.format_version],
+            "custom_marker": self.CUSTOM_MARKER,
+            # SKU, manufacturer and type
+            "sku": self._encode_string(self.SKUS.get(spool_specs["type"], "AHPLBK-101")),
+            "manufacturer": self._encode_string(spool_specs.get("manufacturer", "AC")),
+            "type": self._encode_string(spool_specs["type"]),
+            # Print speed (optional) and nozzle temp
+            "range_a_speed_min": spool_specs["range_a"].get("speed_min", 0),
+            "range_a_speed_max": spool_specs["range_a"].get("speed_max", 0),
+            "range_a_nozzle_min": spool_specs["range_a"]["nozzle_min"],
+            "range_a_nozzle_max": spool_specs["range_a"]["nozzle_max"],
+            # Bed temp, diameter, length and weight
+            "bed_min": spool_specs["bed_min"],
+            "bed_max": spool_specs["bed_max"],
+            "diameter": round(spool_specs["diameter"] * 100),
+            "length": spool_specs["length"],
+            "weight": spool_specs["weight"]
+        }
+        # Color (optional)
+        if spool_specs["color"]:
+            values["color"] = self._encode_color(spool_specs["color"])
         # Additional print speed ranges (optional)
-        if "range_b" in spool_specs:
-            self._write_bytes(0x19, 0, spool_specs["range_b"].get("speed_min", 0))
-            self._write_bytes(0x19, 2, spool_specs["range_b"].get("speed_max", 0))
-            self._write_bytes(0x1a, 0, spool_specs["range_b"].get("nozzle_min", 0))
-            self._write_bytes(0x1a, 2, spool_specs["range_b"].get("nozzle_max", 0))
-        if "range_c" in spool_specs:
-            self._write_bytes(0x1b, 0, spool_specs["range_c"].get("speed_min", 0))
-            self._write_bytes(0x1b, 2, spool_specs["range_c"].get("speed_max", 0))
-            self._write_bytes(0x1c, 0, spool_specs["range_c"].get("nozzle_min", 0))
-            self._write_bytes(0x1c, 2, spool_specs["range_c"].get("nozzle_max", 0))
-
-        # Bed temp
-        self._write_bytes(0x1d, 0, spool_specs["bed_min"])
-        self._write_bytes(0x1d, 2, spool_specs["bed_max"])
+        for range_name in ["range_b", "range_c"]:
+            if range_name in spool_specs:
+                for key in self.RANGE_KEYS:
+                    values[f"{range_name}_{key}"] = spool_specs[range_name].get(key, 0)
+        self.LAYOUT.pack(self.data, values, self.format_version)
 
-        # Diameter
-        self._write_bytes(0x1e, 0, round(spool_specs["diameter"] * 100))
+    @classmethod
+    def get_field_pages(cls, fields: Iterable[str]) -> list[int]:
+        """
+        Get the pages that some fields of the spool specs are read from
+        :param fields: Names of the fields (top level keys of the spool specs)
+        :return: Page numbers (ascending)
+        """
+        pages: set[int] = set()
+        for field in fields:
+            if field not in cls.FIELD_PAGES:
+                raise ValueError(f"Unknown spool field: {field}")
+            pages.update(cls.FIELD_PAGES[field])
+        return sorted(pages)
 
-        # Length
-        self._write_bytes(0x1e, 2, spool_specs["length"])
+    @classmethod
+    def _get_type(cls, sku: str, type_name: str) -> str:
+        """
+        Get the filament type (from the known sku, else from the longest matching sku prefix)
+        :param sku: The sku of the spool
+        :param type_name: The type string of the spool (used if the sku is unknown)
+        :return: The filament type
+        """
+        sku_type: str = cls.SKU_INDEX.get_type(sku) or type_name
+        if sku_type not in cls.SKUS:
+            sku_type = next(iter(cls.SKUS))
+        return sku_type
 
-        # Weight
-        self._write_bytes(0x1f, 0, spool_specs["weight"])
+    def _get_range(self, values: dict[str, Any], range_name: str) -> dict[str, int]:
+        """
+        Get a print speed range
+        :param values: Unpacked layout fields
+        :param range_name: Name of the range (e.g. "range_a")
+        :return: The range
+        """
+        return dict(zip(self.RANGE_KEYS, [values[name] for name in self.SPEC_FIELDS[range_name]]))
 
-    def get_spool_specs(self) -> dict[str, Any]:
+    def get_spool_specs(self, fields: Optional[Iterable[str]] = None) -> dict[str, Any]:
         """
         Get the spool specs data
+        :param fields: Optional names of the fields to get (None = all fields)
         :return: Spool specs JSON
         """
-        # Read sku and calculate type from the longest matching prefix
-        sku: str = self._read_string(0x05)
-        possible_prefixes: list[str] = []
-        for p in self.SKU_PREFIXES.keys():
-            if sku.startswith(p):
-                possible_prefixes.append(p)
-        possible_prefixes.sort(key=len, reverse=True)
-        read_type: str = self._read_string(0x0f)
-        sku_type: str = self.SKU_PREFIXES[possible_prefixes[0]] if possible_prefixes else read_type
-        possible_types: list[str] = self.get_available_filament_types()
-        if sku_type not in possible_types:
-            sku_type = possible_types[0]
-
-        # Read specs
+        # The whole image is decoded in one pass (cheaper than decoding only some fields separately)
+        values: dict[str, Any] = self.LAYOUT.unpack(self.data)
+        sku: str = self._decode_string(values["sku"])
+        type_name: str = self._decode_string(values["type"])
         spool_specs: dict[str, Any] = {
             "uid": self.read_uid(),
-            "type": sku_type,
-            "manufacturer": self._read_string(0x0a),
-            "color": self._read_color(0x14),
-            "range_a": {
-                "speed_min": self._read_bytes(0x17, 0),
-                "speed_max": self._read_bytes(0x17, 2),
-                "nozzle_min": self._read_bytes(0x18, 0),
-                "nozzle_max": self._read_bytes(0x18, 2),
-            },
-            "range_b": {
-                "speed_min": self._read_bytes(0x19, 0),
-                "speed_max": self._read_bytes(0x19, 2),
-                "nozzle_min": self._read_bytes(0x1a, 0),
-                "nozzle_max": self._read_bytes(0x1a, 2)
-            },
-            "range_c": {
-                "speed_min": self._read_bytes(0x1b, 0),
-                "speed_max": self._read_bytes(0x1b, 2),
-                "nozzle_min": self._read_bytes(0x1c, 0),
-                "nozzle_max": self._read_bytes(0x1c, 2)
-            },
-            "bed_min": self._read_bytes(0x1d, 0),
-            "bed_max": self._read_bytes(0x1d, 2),
-            "diameter": self._read_bytes(0x1e, 0) / 100,
-            "length": self._read_bytes(0x1e, 2),
-            "weight": self._read_bytes(0x1f, 0),
+            "type": self._get_type(sku, type_name),
+            "manufacturer": self._decode_string(values["manufacturer"]),
+            "color": self._decode_color(values["color"]),
+            "range_a": self._get_range(values, "range_a"),
+            "range_b": self._get_range(values, "range_b"),
+            "range_c": self._get_range(values, "range_c"),
+            "bed_min": values["bed_min"],
+            "bed_max": values["bed_max"],
+            "diameter": values["diameter"] / 100,
+            "length": values["length"],
+            "weight": values["weight"],
             "raw": {  # Raw data for research purposes
                 "sku": sku,
-                "type": read_type,
-                "is_custom": self._read_bytes(0x27, 3) == 0x4d
-            },
+                "type": type_name,
+                "is_custom": values["custom_marker"] == self.CUSTOM_MARKER
+            }
         }
-
-        # Return
+        if fields is not None:
+            fields = set(fields)
+            spool_specs = {name: value for name, value in spool_specs.items() if name in fields}
         return spool_specs
 
     def dump(self) -> str:
@@ -300,16 +305,134 @@ class SpoolData(CardData):
         return json.dumps(self.get_spool_specs(), indent=4)
 
 
+class SpoolImageCache:
+    """
+    Memoized tag images of spool specs (presets are kept, other specs are evicted least recently used first)
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Create an empty cache
+        :param max_entries: Maximum number of cached images of specs that are no presets
+        """
+        self.max_entries: int = max_entries
+        self.lock: threading.Lock = threading.Lock()
+        # Images of the presets without color (by key of the specs without color)
+        self.presets: dict[frozenset, bytes] = {}
+        self.entries: OrderedDict[frozenset, SpoolData] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @classmethod
+    def get_key(cls, spool_specs: dict[str, Any]) -> Optional[frozenset]:
+        """
+        Get a hashable key of spool specs (independent of the order of the keys)
+        :param spool_specs: The spool specs
+        :return: The key or None if the specs contain unhashable values (they are not cached then)
+        """
+        try:
+            return frozenset([(key, frozenset(value.items()) if isinstance(value, dict) else value)
+                              for key, value in spool_specs.items()])
+        except TypeError:
+            return None
+
+    @classmethod
+    def _get_preset_key(cls, spool_specs: dict[str, Any]) -> Optional[frozenset]:
+        """
+        Get the key of spool specs without their color
+        :param spool_specs: The spool specs
+        :return: The key
+        """
+        return cls.get_key({key: value for key, value in spool_specs.items() if key != "color"})
+
+    def add_presets(self, presets: Iterable[dict[str, Any]]) -> None:
+        """
+        Encode presets, so specs that only differ from one in the color don't have to be encoded field by field
+        :param presets: Spool specs of the presets (their color is ignored)
+        """
+        for preset in presets:
+            key: Optional[frozenset] = self._get_preset_key(preset)
+            try:
+                image: bytes = bytes(SpoolData({**preset, "color": ""}).data)
+            except (KeyError, TypeError, ValueError, struct.error) as e:  # e.g. a temperature that doesn't fit
+                print(f"[Error] Invalid filament preset {preset.get('type')}: {e}")
+                continue
+            if key is not None:
+                with self.lock:
+                    self.presets[key] = image
+
+    def get_spool_data(self, spool_specs: dict[str, Any]) -> SpoolData:
+        """
+        Get the tag image of spool specs (the returned object is shared and must not be changed)
+        :param spool_specs: The spool specs
+        :return: The spool data
+        """
+        key: Optional[frozenset] = self.get_key(spool_specs)
+        if key is None:
+            return SpoolData(spool_specs)
+        with self.lock:
+            spool_data: Optional[SpoolData] = self.entries.get(key)
+            if spool_data is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return spool_data
+            self.misses += 1
+            preset: Optional[bytes] = self.presets.get(self._get_preset_key(spool_specs))
+        if preset is None:
+            spool_data = SpoolData(spool_specs)
+        else:
+            spool_data = SpoolData()
+            spool_data.data[:] = preset
+            if spool_specs.get("color"):
+                SpoolData.LAYOUT.pack(spool_data.data, {"color": SpoolData._encode_color(spool_specs["color"])})
+        with self.lock:
+            self.entries[key] = spool_data
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return spool_data
+
+    def clear(self) -> None:
+        """
+        Forget all images except the ones of the presets
+        """
+        with self.lock:
+            self.entries.clear()
+
+    def get_statistics(self) -> dict[str, Any]:
+        """
+        Get the cache statistics
+        :return: JSON data
+        """
+        with self.lock:
+            return {
+                "presets": len(self.presets),
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
 class SpoolReader:
     """
-    Reader/writer for Anycubic filament spools
+    Reader/writer for Anycubic filament spools (operations are serialized, so their APDUs never interleave)
     """
 
-    def __init__(self):
+    # Maximum number of operations waiting in the queue (further ones are rejected)
+    max_queue_length: int = 16
+    # Gaps of up to this many pages are read along when only some fields are read (saves commands)
+    range_gap_pages: int = 4
+    # Tag images of the written spool specs (shared by all readers)
+    image_cache: SpoolImageCache = SpoolImageCache()
+
+    def __init__(self, reader: Optional[NFCReader] = None):
         """
         Initialize card reader
+        :param reader: Optional reader to use (else the reader is selected automatically)
         """
-        self.reader: NFCReader = NFCReader()
+        self.reader: NFCReader = reader or NFCReader()
+        # Held during every exchange with a tag (not while waiting for the tag, so a waiting operation doesn't block)
+        self.lock: threading.RLock = threading.RLock()
+        self.queue: OperationQueue = OperationQueue(self.max_queue_length, self.reader.reader_name or "default")
 
     def get_connection_state(self) -> bool:
         """
@@ -318,11 +441,18 @@ class SpoolReader:
         """
         return self.reader.reader is not None
 
+    def add_connection_listener(self, callback: Callable[[bool], None]) -> None:
+        """
+        Add a listener for connection state changes (e.g. a reader was plugged in)
+        :param callback: Function that is called with the new connection state
+        """
+        self.reader.add_connection_listener(callback)
+
     def cancel_wait_for_tag(self) -> None:
         """
-        Cancel the waiting for a tag
+        Cancel every pending operation (use the cancel token of an operation to only cancel that one)
         """
-        self.reader.waiting_for_tag = False
+        self.reader.cancel_wait_for_card()
 
     @classmethod
     def get_available_filament_types(cls) -> list[str]:
@@ -332,26 +462,110 @@ class SpoolReader:
         """
         return SpoolData.get_available_filament_types()
 
-    def read_spool(self) -> Optional[dict[str, Any]]:
+    def read_spool_detailed(self, timeout: Optional[float] = None, token: Optional[CancelToken] = None,
+                            cached: Optional[bool] = None) -> ReadResult:
+        """
+        Wait for a spool, read it and report the reason of a failure
+        :param timeout: Time to wait for the spool in seconds (None = use the card timeout of the reader)
+        :param token: Optional cancel token (and deadline) of the operation
+        :param cached: Serve a recently read or written spool from the tag cache (None = default of the reader,
+                       False = force a full read)
+        :return: The read result (its data is a SpoolData object on success)
+        """
+        with self.reader.session(timeout, token) as session:
+            if not session:
+                return ReadResult(error=ReadResult.ERROR_NO_CARD)
+            with self.lock:
+                result: ReadResult = session.read_card_detailed(cached=cached)
+        if result.data is not None:
+            spool_data: SpoolData = SpoolData()
+            spool_data.pages = result.data.pages
+            result.data = spool_data
+        return result
+
+    def read_spool(self, timeout: Optional[float] = None, token: Optional[CancelToken] = None,
+                   cached: Optional[bool] = None) -> Optional[dict[str, Any]]:
         """
         Wait for a spool, read it and return its data
+        :param timeout: Time to wait for the spool in seconds (None = use the card timeout of the reader)
+        :param token: Optional cancel token (and deadline) of the operation
+        :param cached: Serve a recently read or written spool from the tag cache (None = default of the reader,
+                       False = force a full read)
         :return: JSON data of the spool on success else None
         """
-        card_data: Optional[CardData] = self.reader.read_card()
-        if not card_data:
+        result: ReadResult = self.read_spool_detailed(timeout, token, cached)
+        if not result.success:
             return None
+        return result.data.get_spool_specs()
+
+    def _get_page_ranges(self, pages: list[int]) -> list[tuple[int, int]]:
+        """
+        Group pages to ranges that are read with as few commands as possible
+        :param pages: Page numbers (ascending)
+        :return: Page ranges as (first page, number of pages) tuples
+        """
+        # Pages per command in the read mode of the reader (the fastest one until the first read)
+        pages_per_command: int = {
+            NFCReader.READ_MODE_READ: 4,
+            NFCReader.READ_MODE_PAGE: 1
+        }.get(self.reader.read_mode, self.reader.fast_read_max_pages)
+        ranges: list[tuple[int, int]] = []
+        for page in pages:
+            if ranges:
+                start, count = ranges[-1]
+                # Reading a few unneeded pages is cheaper than another command (not if every page is a command)
+                gap: int = page - (start + count)
+                if gap == 0 or page - start < pages_per_command or \
+                        (pages_per_command > 1 and gap < self.range_gap_pages):
+                    ranges[-1] = (start, page - start + 1)
+                    continue
+            ranges.append((page, 1))
+        return ranges
+
+    def read_spool_fields(self, fields: Iterable[str], timeout: Optional[float] = None,
+                          token: Optional[CancelToken] = None) -> Optional[dict[str, Any]]:
+        """
+        Wait for a spool and only read the pages of some fields (e.g. ["type", "color"] for a quick check)
+        :param fields: Names of the fields (top level keys of the spool specs)
+        :param timeout: Time to wait for the spool in seconds (None = use the card timeout of the reader)
+        :param token: Optional cancel token (and deadline) of the operation
+        :return: JSON data with the requested fields on success else None
+        """
+        fields = list(fields)
         spool_data: SpoolData = SpoolData()
-        spool_data.pages = card_data.pages
-        return spool_data.get_spool_specs()
-
-    def read_spool_raw(self) -> tuple[Optional[str], Optional[str]]:
+        with self.reader.session(timeout, token) as session:
+            if not session:
+                return None
+            with self.lock:
+                for start, count in self._get_page_ranges(SpoolData.get_field_pages(fields)):
+                    pages: Optional[list[bytes]] = session.read_pages(start, count)
+                    if pages is None:
+                        print(f"[Error] Failed to read the pages {start:02x}-{start + count - 1:02x} of the spool.")
+                        return None
+                    spool_data.pages[start:start + count] = pages
+        return spool_data.get_spool_specs(fields)
+
+    def read_spool_raw(self, token: Optional[CancelToken] = None,
+                       archive: Optional["DumpArchive"] = None) -> tuple[Optional[str], Optional[str]]:
         """
         Wait for a spool, read it and return its raw data (+ interpretation if possible)
+        :param token: Optional cancel token (and deadline) of the operation
+        :param archive: Optional dump archive that the tag image is added to
         :return: Raw data of the nfc tag
         """
-        card_data: Optional[CardData] = self.reader.read_card()
+        with self.reader.session(token=token) as session:
+            if not session:
+                return None, None
+            with self.lock:
+                # Dumps always show the current content of the tag
+                card_data: Optional[CardData] = session.read_card(cached=False)
         if not card_data:
             return None, None
+        if archive is not None:
+            try:
+                archive.append(card_data, label=self.reader.reader_name or "")
+            except (OSError, ValueError) as e:
+                print(f"[Error] Failed to add the dump to the archive: {e}")
         raw_data: str = card_data.dump()
         try:
             spool_data: SpoolData = SpoolData()
@@ -361,12 +575,89 @@ class SpoolReader:
         except:
             return 14*"0", raw_data
 
-    def write_spool(self, spool_specs: dict[str, Any]) -> bool:
+    def write_spool_detailed(self, spool_specs: dict[str, Any], differential: bool = False, verify: bool = False,
+                             token: Optional[CancelToken] = None) -> WriteResult:
+        """
+        Wait for a spool, write the data and report the state of every page
+        :param spool_specs: JSON spool data
+        :param differential: Only write the pages that differ from the data on the spool
+        :param verify: Read the written pages back and rewrite the ones that don't match
+        :param token: Optional cancel token (and deadline) of the operation
+        :return: The write result
+        """
+        spool_data: SpoolData = self.image_cache.get_spool_data(spool_specs)
+        with self.reader.session(token=token) as session:
+            if not session:
+                return WriteResult()
+            with self.lock:
+                return session.write_card_detailed(spool_data, differential=differential, verify=verify)
+
+    def write_spool(self, spool_specs: dict[str, Any], differential: bool = False, verify: bool = False,
+                    token: Optional[CancelToken] = None) -> bool:
         """
         Wait for a spool and write the data
         :param spool_specs: JSON spool data
+        :param differential: Only write the pages that differ from the data on the spool
+        :param verify: Read the written pages back and rewrite the ones that don't match
+        :param token: Optional cancel token (and deadline) of the operation
         :return: Success state
         """
-        spool_data: SpoolData = SpoolData()
-        spool_data.set_spool_specs(spool_specs)
-        return self.reader.write_card(spool_data)
+        return self.write_spool_detailed(spool_specs, differential, verify, token).success
+
+    def submit(self, function: Callable[["SpoolReader", CancelToken], Any],
+               priority: int = OperationQueue.PRIORITY_NORMAL,
+               token: Optional[CancelToken] = None) -> Optional[QueuedOperation]:
+        """
+        Queue an operation (the operations are executed one after another by the worker of this reader)
+        :param function: Function to execute (called with this spool reader and the cancel token of the operation)
+        :param priority: Priority (lower values are executed first)
+        :param token: Optional cancel token (and deadline) of the operation
+        :return: The queued operation or None if the queue is full
+        """
+        return self.queue.submit(lambda operation_token: function(self, operation_token), priority, token)
+
+    def queue_read_spool(self, priority: int = OperationQueue.PRIORITY_NORMAL,
+                         token: Optional[CancelToken] = None) -> Optional[QueuedOperation]:
+        """
+        Queue a spool read
+        :param priority: Priority (lower values are executed first)
+        :param token: Optional cancel token (and deadline) of the operation
+        :return: The queued operation (result: JSON data of the spool on success else None) or None if the queue is full
+        """
+        return self.submit(lambda spool_reader, operation_token: spool_reader.read_spool(token=operation_token),
+                           priority, token)
+
+    def queue_read_spool_raw(self, priority: int = OperationQueue.PRIORITY_NORMAL,
+                             token: Optional[CancelToken] = None,
+                             archive: Optional["DumpArchive"] = None) -> Optional[QueuedOperation]:
+        """
+        Queue a raw spool read (dump)
+        :param priority: Priority (lower values are executed first)
+        :param token: Optional cancel token (and deadline) of the operation
+        :param archive: Optional dump archive that the tag image is added to
+        :return: The queued operation (result: uid and raw data of the nfc tag) or None if the queue is full
+        """
+        return self.submit(lambda spool_reader, operation_token: spool_reader.read_spool_raw(operation_token, archive),
+                           priority, token)
+
+    def queue_write_spool(self, spool_specs: dict[str, Any], differential: bool = False, verify: bool = False,
+                          priority: int = OperationQueue.PRIORITY_NORMAL,
+                          token: Optional[CancelToken] = None) -> Optional[QueuedOperation]:
+        """
+        Queue a spool write
+        :param spool_specs: JSON spool data
+        :param differential: Only write the pages that differ from the data on the spool
+        :param verify: Read the written pages back and rewrite the ones that don't match
+        :param priority: Priority (lower values are executed first)
+        :param token: Optional cancel token (and deadline) of the operation
+        :return: The queued operation (result: success state) or None if the queue is full
+        """
+        return self.submit(lambda spool_reader, operation_token: spool_reader.write_spool(
+            spool_specs, differential, verify, operation_token), priority, token)
+
+    def get_queue_statistics(self) -> dict[str, Any]:
+        """
+        Get the length and wait time statistics of the operation queue
+        :return: JSON data (durations in milliseconds)
+        """
+        return self.queue.get_statistics()
@@ -0,0 +1,179 @@
+import json
+import threading
+import time
+from concurrent.futures import CancelledError
+from typing import Any, Callable, Optional, TextIO
+
+from .cancel_token import CancelToken
+from .nfc_reader import NFCReader
+from .operation_queue import OperationQueue, QueuedOperation
+from .spool_reader import SpoolReader
+
+
+class SpoolScanner:
+    """
+    Continuous scan mode (reads every placed spool and reports each uid only once per duplicate window)
+    """
+
+    # Time in which the same uid is not reported again (in seconds)
+    duplicate_window: float = 10.0
+
+    def __init__(self, spool_reader: SpoolReader, duplicate_window: Optional[float] = None):
+        """
+        Create a scanner (call start() to start scanning)
+        :param spool_reader: The spool reader to scan with
+        :param duplicate_window: Optional time in which the same uid is not reported again (in seconds)
+        """
+        self.spool_reader: SpoolReader = spool_reader
+        if duplicate_window is not None:
+            self.duplicate_window = duplicate_window
+        self.last_seen: dict[str, float] = {}
+        self.subscribers: list[Callable[[dict[str, Any]], None]] = []
+        self.running: bool = False
+        self.lock: threading.Lock = threading.Lock()
+        self.scan_thread: Optional[threading.Thread] = None
+        self.token: CancelToken = CancelToken()
+
+    def subscribe(self, callback: Callable[[dict[str, Any]], None]) -> None:
+        """
+        Subscribe to scan results
+        :param callback: Function that is called with every scan result (JSON data)
+        """
+        with self.lock:
+            self.subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[dict[str, Any]], None]) -> None:
+        """
+        Unsubscribe from scan results
+        :param callback: The subscribed function
+        """
+        with self.lock:
+            if callback in self.subscribers:
+                self.subscribers.remove(callback)
+
+    def add_json_lines_output(self, stream: TextIO) -> Callable[[dict[str, Any]], None]:
+        """
+        Write every scan result as one JSON line to a stream
+        :param stream: Text stream (e.g. an opened file)
+        :return: The subscribed function (to unsubscribe later)
+        """
+        def write_line(result: dict[str, Any]) -> None:
+            """
+            Write a scan result as JSON line
+            :param result: JSON scan result
+            """
+            stream.write(json.dumps(result) + "\n")
+            stream.flush()
+
+        self.subscribe(write_line)
+        return write_line
+
+    def is_running(self) -> bool:
+        """
+        Check if the scanner is running
+        :return: True if it is running else False
+        """
+        return self.running
+
+    def start(self) -> None:
+        """
+        Start scanning (does nothing if the scanner is already running)
+        """
+        if self.running:
+            return
+        if self.scan_thread is not None and self.scan_thread.is_alive():
+            self.scan_thread.join()  # Let a stopped scan finish first
+        with self.lock:
+            self.running = True
+            self.token = CancelToken()
+            self.last_seen.clear()
+        self.scan_thread = threading.Thread(target=self._run)
+        self.scan_thread.daemon = True
+        self.scan_thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop scanning
+        """
+        self.running = False
+        self.token.cancel()
+
+    def _is_duplicate(self, uid: str) -> bool:
+        """
+        Check if a uid was already reported within the duplicate window (and remember it)
+        :param uid: Uid of the spool
+        :return: True if it was reported else False
+        """
+        now: float = time.monotonic()
+        # Forget expired uids, so a long scan doesn't collect every uid
+        for expired_uid in [u for u, seen in self.last_seen.items() if now - seen >= self.duplicate_window]:
+            del self.last_seen[expired_uid]
+        duplicate: bool = uid in self.last_seen
+        self.last_seen[uid] = now
+        return duplicate
+
+    def _publish(self, result: dict[str, Any]) -> None:
+        """
+        Send a scan result to all subscribers
+        :param result: JSON scan result
+        """
+        with self.lock:
+            subscribers: list[Callable[[dict[str, Any]], None]] = list(self.subscribers)
+        for callback in subscribers:
+            try:
+                callback(result)
+            except Exception as e:
+                print(f"[Error] Scan subscriber failed: {e}")
+
+    def _read_spool(self, timeout: float, token: CancelToken) -> Optional[dict[str, Any]]:
+        """
+        Read the placed spool through the operation queue of the reader (after the reads and writes of the user)
+        :param timeout: Time to wait for the spool in seconds
+        :param token: Cancel token of the scan
+        :return: JSON data of the spool on success else None
+        """
+        operation: Optional[QueuedOperation] = self.spool_reader.submit(
+            lambda spool_reader, operation_token: spool_reader.read_spool(timeout, operation_token),
+            OperationQueue.PRIORITY_LOW, token)
+        if operation is None:
+            return None  # The queue is full
+        try:
+            return operation.result()
+        except CancelledError:
+            return None  # Stopped while waiting in the queue
+
+    def _run(self) -> None:
+        """
+        Read every placed spool until the scanner is stopped
+        """
+        nfc_reader: NFCReader = self.spool_reader.reader
+        token: CancelToken = self.token
+        try:
+            while self.running and not token.is_cancelled():
+                # Wait for a tag (in slices, so the scan continues when a reader is plugged in)
+                if not nfc_reader.wait_for_card_presence(nfc_reader.status_change_slice, token):
+                    if nfc_reader.reader is None:
+                        token.sleep(nfc_reader.status_change_slice)  # No reader connected
+                    continue
+                try:
+                    spool_specs: Optional[dict[str, Any]] = self._read_spool(nfc_reader.status_change_slice, token)
+                except Exception as e:
+                    # A failed read of one tag doesn't stop the scan
+                    print(f"[Error] Scan read failed: {e}")
+                    spool_specs = None
+                if token.is_cancelled():
+                    break
+                if spool_specs is None:
+                    self._publish({"success": False, "time": time.time()})
+                elif not self._is_duplicate(spool_specs["uid"]):
+                    self._publish({"success": True, "uid": spool_specs["uid"], "data": spool_specs,
+                                   "time": time.time()})
+
+                # Every placed tag is only read once (an unreadable tag has to be placed again as well)
+                while not token.is_cancelled() and not nfc_reader.wait_for_card_removal(
+                        nfc_reader.status_change_slice, token):
+                    if nfc_reader.reader is None:
+                        break
+        finally:
+            # Also stopped by cancelling every operation of the reader
+            self.running = False
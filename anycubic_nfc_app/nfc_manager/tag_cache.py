@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class TagCacheEntry:
+    """
+    Cached memory image of a tag
+    """
+
+    def __init__(self, pages: list[bytes]):
+        """
+        Create an entry
+        :param pages: The pages of the tag
+        """
+        self.pages: tuple[bytes, ...] = tuple(bytes(page) for page in pages)
+        self.updated_at: float = time.monotonic()
+
+
+class TagCache:
+    """
+    Memory images of recently read or written tags by uid (a read can be answered from it after getting the uid)
+    """
+
+    def __init__(self, max_age: float = 600.0, max_entries: int = 512):
+        """
+        Create an empty cache
+        :param max_age: Time after which an image is not used anymore (in seconds)
+        :param max_entries: Maximum number of cached tags (the least recently used ones are removed)
+        """
+        self.max_age: float = max_age
+        self.max_entries: int = max_entries
+        self.lock: threading.Lock = threading.Lock()
+        self.entries: OrderedDict[str, TagCacheEntry] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get(self, uid: str) -> Optional[TagCacheEntry]:
+        """
+        Get the image of a tag
+        :param uid: Uid of the tag (hex)
+        :return: The entry or None if the tag is unknown or its image is too old
+        """
+        with self.lock:
+            entry: Optional[TagCacheEntry] = self.entries.get(uid)
+            if entry is not None and time.monotonic() - entry.updated_at > self.max_age:
+                del self.entries[uid]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(uid)
+            self.hits += 1
+            return entry
+
+    def put(self, uid: str, pages: list[bytes]) -> None:
+        """
+        Remember the image of a tag
+        :param uid: Uid of the tag (hex)
+        :param pages: All pages of the tag
+        """
+        with self.lock:
+            self.entries[uid] = TagCacheEntry(pages)
+            self.entries.move_to_end(uid)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def update_pages(self, uid: str, pages: dict[int, bytes]) -> None:
+        """
+        Update written pages in the image of a tag (does nothing if the tag is unknown)
+        :param uid: Uid of the tag (hex)
+        :param pages: Written data by page number
+        """
+        with self.lock:
+            entry: Optional[TagCacheEntry] = self.entries.get(uid)
+            if entry is None:
+                return
+            image: list[bytes] = list(entry.pages)
+            for page, data in pages.items():
+                image[page] = data
+            self.entries[uid] = TagCacheEntry(image)
+            self.entries.move_to_end(uid)
+
+    def invalidate(self, uid: str) -> None:
+        """
+        Forget the image of a tag (e.g. after a failed write)
+        :param uid: Uid of the tag (hex)
+        """
+        with self.lock:
+            self.entries.pop(uid, None)
+
+    def clear(self) -> None:
+        """
+        Forget all images
+        """
+        with self.lock:
+            self.entries.clear()
+
+    def get_statistics(self) -> dict[str, Any]:
+        """
+        Get the cache statistics
+        :return: JSON data
+        """
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses
+            }
@@ -0,0 +1,108 @@
+import struct
+from typing import Any, Iterable, Optional
+
+
+class LayoutField:
+    """
+    A field in the memory image of a tag
+    """
+
+    def __init__(self, name: str, page: int, index: int, struct_format: str, since_version: int = 1):
+        """
+        Create a field
+        :param name: Name of the field
+        :param page: Page of the first byte
+        :param index: Index of the first byte on the page
+        :param struct_format: Format of the value (struct syntax, little endian, e.g. "H" or "20s")
+        :param since_version: First format version that contains the field
+        """
+        self.name: str = name
+        self.page: int = page
+        self.index: int = index
+        self.struct_format: str = struct_format
+        self.since_version: int = since_version
+        self.offset: int = page * 4 + index
+        self.size: int = struct.calcsize(f"<{struct_format}")
+
+    def get_pages(self) -> list[int]:
+        """
+        Get the pages that the field is stored on
+        :return: Page numbers (ascending)
+        """
+        return list(range(self.offset // 4, (self.offset + self.size - 1) // 4 + 1))
+
+
+class TagLayout:
+    """
+    Byte layout of the fields in a tag image (compiled to one struct, so a whole image is converted in one pass)
+    """
+
+    def __init__(self, fields: list[LayoutField]):
+        """
+        Create and compile a layout
+        :param fields: The fields (must not overlap)
+        """
+        self.fields: dict[str, LayoutField] = {field.name: field for field in sorted(fields, key=lambda f: f.offset)}
+        self.start: int = min(field.offset for field in fields)
+        # Packing unpacks the bytes between the fields as raw values, so it doesn't change them
+        struct_format: str = "<"
+        decode_format: str = "<"
+        self.positions: dict[str, int] = {}
+        position: int = 0
+        offset: int = self.start
+        for field in self.fields.values():
+            if field.offset < offset:
+                raise ValueError(f"Layout field {field.name} overlaps the previous field")
+            if field.offset > offset:
+                struct_format += f"{field.offset - offset}s"
+                decode_format += f"{field.offset - offset}x"
+                position += 1
+            struct_format += field.struct_format
+            decode_format += field.struct_format
+            self.positions[field.name] = position
+            position += 1
+            offset = field.offset + field.size
+        self.end: int = offset
+        self.struct: struct.Struct = struct.Struct(struct_format)
+        self.decode_struct: struct.Struct = struct.Struct(decode_format)  # Only the field values
+
+    def unpack(self, data: bytes) -> dict[str, Any]:
+        """
+        Get the values of all fields
+        :param data: Memory image of the tag
+        :return: The values by field name
+        """
+        return dict(zip(self.fields, self.decode_struct.unpack_from(data, self.start)))
+
+    def pack(self, data: bytearray, values: dict[str, Any], version: Optional[int] = None) -> None:
+        """
+        Set the values of some fields in place (the other bytes are kept)
+        :param data: Memory image of the tag
+        :param values: The values by field name
+        :param version: Optional format version (fields that are newer than it are skipped)
+        """
+        current_values: list[Any] = list(self.struct.unpack_from(data, self.start))
+        positions: dict[str, int] = self.positions
+        for name, value in values.items():
+            if version is None or self.fields[name].since_version <= version:
+                current_values[positions[name]] = value
+        self.struct.pack_into(data, self.start, *current_values)
+
+    def get_pages(self, names: Iterable[str]) -> list[int]:
+        """
+        Get the pages that some fields are stored on
+        :param names: Names of the fields
+        :return: Page numbers (ascending)
+        """
+        pages: set[int] = set()
+        for name in names:
+            pages.update(self.fields[name].get_pages())
+        return sorted(pages)
+
+    def get_group_pages(self, groups: dict[str, list[str]]) -> dict[str, list[int]]:
+        """
+        Get the pages of groups of fields (e.g. the fields that one value is decoded from)
+        :param groups: Names of the fields by group name
+        :return: Page numbers (ascending) by group name
+        """
+        return {group: self.get_pages(names) for group, names in groups.items()}
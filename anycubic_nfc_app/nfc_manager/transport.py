@@ -0,0 +1,105 @@
+from abc import ABC, abstractmethod
+
+from smartcard.pcsc.PCSCReader import PCSCReader
+from smartcard.reader.Reader import Reader
+from smartcard.scard import (SCARD_SCOPE_USER, SCardCancel, SCardEstablishContext, SCardGetStatusChange,
+                             SCardListReaders)
+
+
+class Transport(ABC):
+    """
+    Access to the reader devices (the functions follow the PC/SC API, so a simulation can replace it)
+    """
+
+    @abstractmethod
+    def establish_context(self) -> tuple[int, int]:
+        """
+        Establish a context for status change requests
+        :return: Result code and context
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_readers(self, context: int) -> tuple[int, list[str]]:
+        """
+        List the connected readers
+        :param context: Context
+        :return: Result code and names of the connected readers
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_status_change(self, context: int, timeout: int, reader_states: list[tuple]) -> tuple[int, list[tuple]]:
+        """
+        Wait until the state of a reader differs from the given state
+        :param context: Context
+        :param timeout: Timeout in milliseconds (INFINITE = no timeout)
+        :param reader_states: Known states as (reader name, state) tuples
+        :return: Result code and new states as (reader name, event state, atr) tuples
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def cancel(self, context: int) -> int:
+        """
+        Cancel a pending status change request
+        :param context: Context of the request
+        :return: Result code
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_reader(self, reader_name: str) -> Reader:
+        """
+        Get a reader that can create card connections
+        :param reader_name: Name of the reader
+        :return: The reader
+        """
+        raise NotImplementedError
+
+
+class PCSCTransport(Transport):
+    """
+    Access to the reader devices through the PC/SC service
+    """
+
+    def establish_context(self) -> tuple[int, int]:
+        """
+        Establish a context for status change requests
+        :return: Result code and context
+        """
+        return SCardEstablishContext(SCARD_SCOPE_USER)
+
+    def list_readers(self, context: int) -> tuple[int, list[str]]:
+        """
+        List the connected readers
+        :param context: Context
+        :return: Result code and names of the connected readers
+        """
+        return SCardListReaders(context, [])
+
+    def get_status_change(self, context: int, timeout: int, reader_states: list[tuple]) -> tuple[int, list[tuple]]:
+        """
+        Wait until the state of a reader differs from the given state
+        :param context: Context
+        :param timeout: Timeout in milliseconds (INFINITE = no timeout)
+        :param reader_states: Known states as (reader name, state) tuples
+        :return: Result code and new states as (reader name, event state, atr) tuples
+        """
+        return SCardGetStatusChange(context, timeout, reader_states)
+
+    def cancel(self, context: int) -> int:
+        """
+        Cancel a pending status change request
+        :param context: Context of the request
+        :return: Result code
+        """
+        return SCardCancel(context)
+
+    def get_reader(self, reader_name: str) -> Reader:
+        """
+        Get a reader that can create card connections
+        :param reader_name: Name of the reader
+        :return: The reader
+        """
+        return PCSCReader(reader_name)
@@ -1,5 +1,11 @@
 const socket = io();
 var canceled = false;
+var scanning = false;
+var scanCount = 0;
+var readRetries = 0;
+// Read errors that may succeed when reading again (e.g. the tag was moved) and the maximum number of automatic retries
+const RETRYABLE_READ_ERRORS = ["no_card", "read_failed", "card_removed"];
+const MAX_READ_RETRIES = 3;
 
 function downloadTextFile(filename, content) {
     const blob = new Blob([content], { type: "text/plain" });
@@ -41,6 +47,7 @@ function updateNFCOverlay(show, showError=false) {
 }
 
 function readTag() {
+    readRetries = 0;
     updateNFCOverlay(true);
     socket.emit("read_tag");
 }
@@ -61,8 +68,51 @@ function cancelNFC() {
     socket.emit("cancel_nfc");
 }
 
+function toggleScan() {
+    socket.emit(scanning ? "stop_scan" : "start_scan");
+}
+
+function updateScanState(isScanning) {
+    scanning = isScanning;
+    document.getElementById("scanButton").innerHTML = scanning ? "Stop Scan" : "Start Scan";
+}
+
+function addScanResult(data) {
+    var row = document.createElement("tr");
+    var color = document.createElement("span");
+    color.style = `display: inline-block; width: 1em; height: 1em; border: 1px solid #000; background-color: ${data.data.color};`;
+    for (const value of [data.uid, data.data.type, data.data.manufacturer, color]) {
+        var cell = document.createElement("td");
+        if(value instanceof Node) {
+            cell.appendChild(value);
+        } else {
+            cell.textContent = value;
+        }
+        row.appendChild(cell);
+    }
+    row.style = "cursor: pointer;";
+    row.onclick = () => loadFilamentData(data.data);
+    document.getElementById("scanResults").prepend(row);
+    scanCount++;
+    document.getElementById("scanCount").innerHTML = scanCount == 1 ? "1 spool" : `${scanCount} spools`;
+}
+
 socket.on("nfc_state", (data) => {
     updateConnectionState(data.reader_connected);
+    if("scanning" in data) {
+        updateScanState(data.scanning);
+    }
+});
+
+socket.on("scan_state", (data) => {
+    updateScanState(data.scanning);
+});
+
+socket.on("scan_result", (data) => {
+    document.getElementById("scanError").style = data.success ? "display: none" : "";
+    if(data.success) {
+        addScanResult(data);
+    }
 });
 
 socket.on("read_done", (data) => {
@@ -74,9 +124,16 @@ socket.on("read_done", (data) => {
     if(data.success) {
         loadFilamentData(data.data);
         updateNFCOverlay(false);
-    } else {
+    } else if(data.error == "busy") {
+        // Rejected, because the reader is busy (don't retry automatically)
+        updateNFCOverlay(true, true);
+    } else if(RETRYABLE_READ_ERRORS.includes(data.error) && readRetries < MAX_READ_RETRIES) {
+        readRetries++;
         updateNFCOverlay(true, true);
         socket.emit("read_tag");
+    } else {
+        // Not retryable or retried too often (the user has to start a new read)
+        updateNFCOverlay(true, true);
     }
 });
 
@@ -88,6 +145,13 @@ socket.on("write_done", (data) => {
     }
     if(data.success) {
         updateNFCOverlay(false);
+    } else if(data.error == "busy") {
+        // Rejected, because the reader is busy (don't retry automatically)
+        updateNFCOverlay(true, true);
+    } else if(data.error == "invalid") {
+        // Rejected, because the data is invalid (retrying would fail again)
+        updateNFCOverlay(false);
+        alert(Object.entries(data.fields).map(([field, error]) => `${field} ${error}`).join("\n"));
     } else {
         updateNFCOverlay(true, true);
         socket.emit("write_tag", getFilamentData());
@@ -103,6 +167,9 @@ socket.on("dump_done", (data) => {
     if(data.success) {
         downloadTextFile(data.filename, data.data);
         updateNFCOverlay(false);
+    } else if(data.error == "busy") {
+        // Rejected, because the reader is busy (don't retry automatically)
+        updateNFCOverlay(true, true);
     } else {
         updateNFCOverlay(true, true);
         socket.emit("create_dump");
@@ -1,16 +1,19 @@
 import argparse
 
 import eventlet
+from eventlet import tpool
 from smartcard.System import readers
 
 eventlet.monkey_patch()
 
-from typing import Any, Optional
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
 
 from flask import Flask, render_template, request
 from flask_socketio import SocketIO
 
-from .nfc_manager import SpoolReader, NFCReader
+from .nfc_manager import (CancelToken, DumpArchive, QueuedOperation, ReadResult, SpoolReader, SpoolScanner,
+                          SpoolSpecsSchema, NFCReader, WriteResult, metrics)
 
 # App settings
 app = Flask(__name__)
@@ -163,7 +166,23 @@ filament_presets: dict[str, dict[str, Any]] = {
     },
 }
 
+# Wait for tags in native threads, so the green threads of the server keep running
+NFCReader.blocking_call = tpool.execute
 spool_reader: SpoolReader = SpoolReader()
+spool_scanner: SpoolScanner = SpoolScanner(spool_reader)
+# Encode the presets once, so writing them only needs to set the color
+SpoolReader.image_cache.add_presets(filament_presets.values())
+
+# Time after which a pending nfc action of a client is abandoned (in seconds)
+operation_timeout: float = 120.0
+# Cancel token of the pending nfc action of every client (by socket id)
+pending_operations: dict[str, CancelToken] = {}
+# Archive that every dump is added to (set with --dump_archive)
+dump_archive: Optional[DumpArchive] = None
+# Read the written pages back and rewrite the ones that don't match (disable with --no_verify_writes)
+verify_writes: bool = True
+# Only write the pages that differ from the data on the spool (enable with --differential_writes)
+differential_writes: bool = False
 
 
 @app.route("/", methods=["GET", "POST"])
@@ -175,23 +194,156 @@ def root():
                            filament_types=SpoolReader.get_available_filament_types())
 
 
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    """
+    Export the APDU, operation, queue, tag cache and image cache metrics of the readers (JSON)
+    """
+    return {
+        **metrics.to_dict(),
+        "queue": spool_reader.get_queue_statistics(),
+        "tag_cache": spool_reader.reader.tag_cache.get_statistics(),
+        "image_cache": SpoolReader.image_cache.get_statistics()
+    }
+
+
 @socketio.on("ping")
 def handle_ping():
     """
     Handle a ping from the client
     """
     socketio.emit("nfc_state", {
-        "reader_connected": spool_reader.get_connection_state()
+        "reader_connected": spool_reader.get_connection_state(),
+        "scanning": spool_scanner.is_running()
+    })
+
+
+def _push_connection_state(connected: bool):
+    """
+    Push the connection state to all clients when a reader was plugged in or removed
+    :param connected: New connection state
+    """
+    socketio.emit("nfc_state", {
+        "reader_connected": connected
     })
 
 
+spool_reader.add_connection_listener(_push_connection_state)
+
+
+def _push_scan_result(result: dict[str, Any]):
+    """
+    Push a result of the continuous scan to all clients
+    :param result: JSON scan result
+    """
+    socketio.emit("scan_result", result)
+
+
+spool_scanner.subscribe(_push_scan_result)
+
+
+@socketio.on("start_scan")
+def start_scan():
+    """
+    Start the continuous scan (every placed spool is read and reported once)
+    """
+    spool_scanner.start()
+    socketio.emit("scan_state", {"scanning": True})
+
+
+@socketio.on("stop_scan")
+def stop_scan():
+    """
+    Stop the continuous scan
+    """
+    _stop_scan()
+
+
+def _stop_scan():
+    """
+    Stop the continuous scan if it is running (single reads and writes need the reader)
+    """
+    if spool_scanner.is_running():
+        spool_scanner.stop()
+        socketio.emit("scan_state", {"scanning": False})
+
+
+def _start_operation(socket_id) -> CancelToken:
+    """
+    Create the cancel token for a new nfc action of a client (replaces a pending action of the client)
+    :param socket_id: Id of the socket of the client
+    :return: The cancel token
+    """
+    token: CancelToken = CancelToken(operation_timeout)
+    previous_token: Optional[CancelToken] = pending_operations.get(socket_id)
+    if previous_token:
+        previous_token.cancel()
+    pending_operations[socket_id] = token
+    return token
+
+
+def _finish_operation(socket_id, token: CancelToken):
+    """
+    Forget the cancel token of a finished nfc action
+    :param socket_id: Id of the socket of the client
+    :param token: The cancel token of the action
+    """
+    if pending_operations.get(socket_id) is token:
+        del pending_operations[socket_id]
+
+
+def _cancel_operation(socket_id):
+    """
+    Cancel the pending nfc action of a client (actions of other clients continue)
+    :param socket_id: Id of the socket of the client
+    """
+    token: Optional[CancelToken] = pending_operations.pop(socket_id, None)
+    if token:
+        token.cancel()
+
+
 @socketio.on("cancel_nfc")
 def cancel_nfc():
     """
     Cancel the current nfc action
     """
-    spool_reader.cancel_wait_for_tag()
-    socketio.emit("canceled")
+    _cancel_operation(request.sid)
+    socketio.emit("canceled", to=request.sid)
+
+
+@socketio.on("disconnect")
+def disconnect():
+    """
+    Abandon the pending nfc action of a disconnected client
+    """
+    _cancel_operation(request.sid)
+
+
+def _respond_when_done(operation: Optional[QueuedOperation], socket_id, token: CancelToken, event: str,
+                       get_result: Callable[[Any], dict[str, Any]]):
+    """
+    Send the result of a queued nfc action to the client when it is done
+    :param operation: The queued operation (None if the queue was full)
+    :param socket_id: Id of the socket to respond to
+    :param token: Cancel token of the action
+    :param event: Name of the result event
+    :param get_result: Function that converts the result of the operation to the JSON result (None if it failed)
+    """
+    if operation is None:
+        _finish_operation(socket_id, token)
+        socketio.emit(event, {"success": False, "error": "busy"}, to=socket_id)
+        return
+
+    def on_done(future: Future):
+        """
+        Respond with the result of the operation
+        :param future: Future of the operation
+        """
+        _finish_operation(socket_id, token)
+        failed: bool = future.cancelled() or future.exception() is not None
+        socketio.emit(event, get_result(None if failed else future.result()), to=socket_id)
+
+    operation.future.add_done_callback(on_done)
 
 
 @socketio.on("read_tag")
@@ -199,21 +351,25 @@ def read_tag():
     """
     Read from a tag
     """
-    socketio.start_background_task(_read_tag_async, request.sid)
+    _stop_scan()
+    token: CancelToken = _start_operation(request.sid)
+    operation: Optional[QueuedOperation] = spool_reader.submit(
+        lambda reader, operation_token: reader.read_spool_detailed(token=operation_token), token=token)
+    _respond_when_done(operation, request.sid, token, "read_done", _get_read_result)
 
 
-def _read_tag_async(socket_id):
+def _get_read_result(read_result: Optional[ReadResult]) -> dict[str, Any]:
     """
-    Read from a tag (async)
-    :param socket_id: Id of the socket to respond to
+    Create the result of a read
+    :param read_result: Result of the read (None if the operation failed)
+    :return: JSON result
     """
-    spool_data: Optional[dict[str, Any]] = spool_reader.read_spool()
-    result: dict[str, Any] = {
-        "success": spool_data is not None
-    }
-    if spool_data:
-        result["data"] = spool_data
-    socketio.emit("read_done", result, to=socket_id)
+    if read_result is None:
+        return {"success": False, "error": ReadResult.ERROR_NO_CARD}
+    result: dict[str, Any] = read_result.to_dict()
+    if read_result.success:
+        result["data"] = read_result.data.get_spool_specs()
+    return result
 
 
 @socketio.on("write_tag")
@@ -222,23 +378,32 @@ def write_tag(tag_data: dict[str, Any]):
     Write to a tag
     :param tag_data: Data to write to the tag
     """
-    tag_data["diameter"] = 1.75
-    tag_data["length"] = 330
-    tag_data["weight"] = 1000
-    socketio.start_background_task(_write_tag_async, tag_data, request.sid)
-
-
-def _write_tag_async(tag_data: dict[str, Any], socket_id):
+    if isinstance(tag_data, dict):
+        tag_data["diameter"] = 1.75
+        tag_data["length"] = 330
+        tag_data["weight"] = 1000
+    # Invalid data is rejected before a tag is needed (field errors by field name)
+    errors: dict[str, str] = SpoolSpecsSchema.validate(tag_data)
+    if errors:
+        socketio.emit("write_done", {"success": False, "error": "invalid", "fields": errors}, to=request.sid)
+        return
+    _stop_scan()
+    token: CancelToken = _start_operation(request.sid)
+    operation: Optional[QueuedOperation] = spool_reader.submit(
+        lambda reader, operation_token: reader.write_spool_detailed(tag_data, differential_writes, verify_writes,
+                                                                    operation_token), token=token)
+    _respond_when_done(operation, request.sid, token, "write_done", _get_write_result)
+
+
+def _get_write_result(write_result: Optional[WriteResult]) -> dict[str, Any]:
     """
-    Write to a tag (async)
-    :param tag_data: Date to write to the tag
-    :param socket_id: Id of the socket to respond to
+    Create the result of a write
+    :param write_result: Result of the write (None if the operation failed)
+    :return: JSON result (with the state of every page)
     """
-    success: bool = spool_reader.write_spool(spool_specs=tag_data)
-    result: dict[str, Any] = {
-        "success": success
-    }
-    socketio.emit("write_done", result, to=socket_id)
+    if write_result is None:
+        return {"success": False}
+    return write_result.to_dict()
 
 
 @socketio.on("create_dump")
@@ -246,22 +411,26 @@ def create_dump():
     """
     Create a dump of a tag
     """
-    socketio.start_background_task(_create_dump_async, request.sid)
+    _stop_scan()
+    token: CancelToken = _start_operation(request.sid)
+    _respond_when_done(spool_reader.queue_read_spool_raw(token=token, archive=dump_archive), request.sid, token,
+                       "dump_done", _get_dump_result)
 
 
-def _create_dump_async(socket_id):
+def _get_dump_result(dump: Optional[tuple[Optional[str], Optional[str]]]) -> dict[str, Any]:
     """
-    Read from a tag (async)
-    :param socket_id: Id of the socket to respond to
+    Create the result of a dump
+    :param dump: Uid and raw data of the nfc tag (None if the read failed)
+    :return: JSON result
     """
-    uid, dump_data = spool_reader.read_spool_raw()
+    uid, dump_data = dump or (None, None)
     result: dict[str, Any] = {
         "success": dump_data is not None
     }
     if dump_data:
         result["filename"] = f"spool_dump_{uid}.txt"
         result["data"] = dump_data
-    socketio.emit("dump_done", result, to=socket_id)
+    return result
 
 
 def get_connected_readers() -> list[str]:
@@ -279,6 +448,8 @@ def set_preferred_reader(reader_filter: str) -> None:
     """
     if reader_filter:
         NFCReader.preferred_reader = reader_filter
+        # The spool reader already selected a reader when the app was imported
+        spool_reader.reader.select_reader()
 
 
 def start_web_app(port: int):
@@ -292,6 +463,18 @@ def start_web_app(port: int):
                         help='Add this flag to print connected readers on startup')
     parser.add_argument('--preferred_reader', type=str, default=None,
                         help='Default reader to select (the reader name must contain that)')
+    parser.add_argument('--scan_log', type=str, default=None,
+                        help='File to append the results of the continuous scan to (one JSON object per line)')
+    parser.add_argument('--scan_window', type=float, default=None,
+                        help='Seconds in which the continuous scan reports the same spool only once')
+    parser.add_argument('--tag_cache', action='store_true',
+                        help='Only read the uid of recently read or written spools and use the cached data')
+    parser.add_argument('--dump_archive', type=str, default=None,
+                        help='Binary dump archive to add every dump to (created if it does not exist)')
+    parser.add_argument('--no_verify_writes', action='store_true',
+                        help='Do not read the written pages back (faster, but bad pages are not rewritten)')
+    parser.add_argument('--differential_writes', action='store_true',
+                        help='Only write the pages that differ from the data on the spool')
     args = parser.parse_args()
 
     # Start web app
@@ -303,6 +486,28 @@ def start_web_app(port: int):
         print(f"Set '{args.preferred_reader}' as preferred reader (the reader name must contain that)\n")
         set_preferred_reader(args.preferred_reader)
 
+    # Continuous scan settings
+    if args.scan_window is not None:
+        spool_scanner.duplicate_window = args.scan_window
+    if args.scan_log:
+        print(f"Writing continuous scan results to '{args.scan_log}'\n")
+        spool_scanner.add_json_lines_output(open(args.scan_log, "a", encoding="utf-8"))
+
+    # Serve reads of known spools from the tag cache
+    if args.tag_cache:
+        NFCReader.use_tag_cache = True
+
+    # Archive every dump
+    if args.dump_archive:
+        global dump_archive
+        print(f"Adding dumps to the archive '{args.dump_archive}'\n")
+        dump_archive = DumpArchive(args.dump_archive)
+
+    # Write settings
+    global verify_writes, differential_writes
+    verify_writes = not args.no_verify_writes
+    differential_writes = args.differential_writes
+
     print("Anycubic NFC App started. Access it under http://localhost:8080")
     print("Press Ctrl+C or just close this window to exit")
     socketio.run(app, port=port, host="0.0.0.0")
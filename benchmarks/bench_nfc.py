@@ -0,0 +1,336 @@
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+from anycubic_nfc_app.nfc_manager import (NFCReader, SimulatedReader, SimulatedTransport, SpoolBatch, SpoolData,
+                                           SpoolReader, VirtualNTAG213)
+from anycubic_nfc_app.nfc_manager.spool_batch import np
+from anycubic_nfc_app.nfc_manager.nfc_reader import CardData
+from benchmarks.fixtures import load_tag_images
+
+# Version of the result file format
+RESULT_FORMAT: int = 1
+# Time per APDU of the simulated reader (an ACR122U needs a few milliseconds per APDU)
+DEFAULT_LATENCY: float = 0.004
+# Allowed slowdown of the median before a benchmark counts as regression
+DEFAULT_THRESHOLD: float = 0.2
+# Number of records of the batch codec benchmarks
+BATCH_SIZE: int = 10000
+
+
+class Benchmark:
+    """
+    A benchmark case
+    """
+
+    def __init__(self, name: str, function: Callable[[], Any], iterations: int,
+                 setup: Optional[Callable[[], None]] = None, teardown: Optional[Callable[[], None]] = None):
+        """
+        Create a benchmark case
+        :param name: Name of the case (key in the result file, must not depend on the fixtures or sizes of a run)
+        :param function: Function to measure
+        :param iterations: Number of measured calls
+        :param setup: Optional function that is called before the case runs (not measured)
+        :param teardown: Optional function that is called after the case ran (also if it failed)
+        """
+        self.name: str = name
+        self.function: Callable[[], Any] = function
+        self.iterations: int = iterations
+        self.setup: Optional[Callable[[], None]] = setup
+        self.teardown: Optional[Callable[[], None]] = teardown
+
+    def run(self, warmup: int = 3) -> dict[str, Any]:
+        """
+        Run the case
+        :param warmup: Number of unmeasured calls before the measurement
+        :return: JSON result (durations in milliseconds)
+        """
+        if self.setup is not None:
+            self.setup()
+        try:
+            for _ in range(warmup):
+                self.function()
+            durations: list[float] = []
+            for _ in range(self.iterations):
+                start_time: float = time.perf_counter()
+                self.function()
+                durations.append(time.perf_counter() - start_time)
+        finally:
+            if self.teardown is not None:
+                self.teardown()
+        durations.sort()
+        mean: float = sum(durations) / len(durations)
+        return {
+            "iterations": len(durations),
+            "mean_ms": mean * 1000,
+            "min_ms": durations[0] * 1000,
+            "max_ms": durations[-1] * 1000,
+            "p50_ms": self.percentile(durations, 50) * 1000,
+            "p95_ms": self.percentile(durations, 95) * 1000,
+            "ops_per_second": 1 / mean if mean > 0 else 0.0
+        }
+
+    @classmethod
+    def percentile(cls, durations: list[float], percent: float) -> float:
+        """
+        Get a percentile (nearest rank)
+        :param durations: Sorted durations
+        :param percent: Percentile (0-100)
+        :return: The duration
+        """
+        index: int = min(len(durations) - 1, max(0, math.ceil(percent / 100 * len(durations)) - 1))
+        return durations[index]
+
+
+class ReaderFixture:
+    """
+    A simulated reader with a spool reader for one benchmark case (every case starts with a new reader)
+    """
+
+    def __init__(self, latency: float):
+        """
+        Create the fixture (the reader is created by setup())
+        :param latency: Time per APDU of the simulated reader in seconds
+        """
+        self.latency: float = latency
+        self.simulated_reader: Optional[SimulatedReader] = None
+        self.spool_reader: Optional[SpoolReader] = None
+
+    def setup(self) -> None:
+        """
+        Create the simulated reader and the spool reader
+        """
+        transport: SimulatedTransport = SimulatedTransport()
+        self.simulated_reader = transport.add_reader(latency=self.latency)
+        self.spool_reader = SpoolReader(NFCReader(transport=transport))
+
+    def teardown(self) -> None:
+        """
+        Stop the spool reader, so its monitor thread doesn't slow down the following cases
+        """
+        self.spool_reader.cancel_wait_for_tag()
+        self.spool_reader.reader.reader_monitor.stop()
+        self.simulated_reader = None
+        self.spool_reader = None
+
+
+def create_codec_benchmarks(tag_images: dict[str, list[bytes]], iterations: int) -> list[Benchmark]:
+    """
+    Create the benchmarks of the spool data encoding (no reader involved)
+    :param tag_images: Pages of the fixture tags
+    :param iterations: Number of measured calls per case
+    :return: The benchmark cases
+    """
+    benchmarks: list[Benchmark] = []
+    for fixture_name, pages in tag_images.items():
+        spool_data: SpoolData = SpoolData()
+        spool_data.pages = list(pages)
+        spool_specs: dict[str, Any] = spool_data.get_spool_specs()
+        card_data: CardData = CardData(page_count=len(pages))
+        card_data.pages = list(pages)
+        benchmarks += [
+            Benchmark(f"set_spool_specs[{fixture_name}]", lambda s=spool_specs: SpoolData().set_spool_specs(s),
+                      iterations),
+            Benchmark(f"get_spool_data_cached[{fixture_name}]",
+                      lambda s=spool_specs: SpoolReader.image_cache.get_spool_data(s), iterations),
+            Benchmark(f"get_spool_specs[{fixture_name}]", spool_data.get_spool_specs, iterations),
+            Benchmark(f"card_dump[{fixture_name}]", card_data.dump, iterations)
+        ]
+
+    # Batch conversions of all fixtures (only with NumPy)
+    if np is not None:
+        all_specs: list[dict[str, Any]] = []
+        for pages in tag_images.values():
+            spool_data = SpoolData()
+            spool_data.pages = list(pages)
+            all_specs.append(spool_data.get_spool_specs())
+        # Always BATCH_SIZE records, so the results of runs with other fixtures stay comparable
+        records: list[dict[str, Any]] = [all_specs[i % len(all_specs)] for i in range(BATCH_SIZE)]
+        columns: dict[str, list[Any]] = SpoolBatch.get_columns(records)
+        images = SpoolBatch.encode(columns)
+        batch_iterations: int = max(1, iterations // 1000)
+        benchmarks += [
+            Benchmark("batch_encode", lambda: SpoolBatch.encode(columns), batch_iterations),
+            Benchmark("batch_decode", lambda: SpoolBatch.decode(images), batch_iterations)
+        ]
+    return benchmarks
+
+
+def create_reader_benchmarks(tag_images: dict[str, list[bytes]], iterations: int,
+                             latency: float) -> list[Benchmark]:
+    """
+    Create the benchmarks of the reader operations (with a simulated reader and tag)
+    :param tag_images: Pages of the fixture tags
+    :param iterations: Number of measured calls per case
+    :param latency: Time per APDU of the simulated reader in seconds
+    :return: The benchmark cases
+    """
+    benchmarks: list[Benchmark] = []
+    for fixture_name, pages in tag_images.items():
+        spool_data: SpoolData = SpoolData()
+        spool_data.pages = list(pages)
+        spool_specs: dict[str, Any] = spool_data.get_spool_specs()
+
+        def add(name: str, function: Callable[[ReaderFixture], Any]) -> None:
+            """
+            Add a case with its own reader fixture
+            :param name: Name of the case (without the fixture name)
+            :param function: Function to measure (called with the reader fixture)
+            """
+            fixture: ReaderFixture = ReaderFixture(latency)
+            benchmarks.append(Benchmark(f"{name}[{fixture_name}]", lambda: function(fixture), iterations,
+                                        fixture.setup, fixture.teardown))
+
+        def insert_tag(fixture: ReaderFixture, image: list[bytes] = pages) -> None:
+            """
+            Place a fresh tag with the fixture image on the simulated reader
+            :param fixture: The reader fixture
+            :param image: Pages of the tag
+            """
+            tag: Optional[VirtualNTAG213] = fixture.simulated_reader.tag
+            if tag is None or tag.pages[:len(image)] != image:
+                fixture.simulated_reader.insert_tag(VirtualNTAG213(pages=list(image)))
+
+        def read_spool_raw(fixture: ReaderFixture, insert: Callable[[ReaderFixture], None] = insert_tag) -> None:
+            """
+            Read the raw data of the fixture tag
+            :param fixture: The reader fixture
+            :param insert: Function that places the fixture tag
+            """
+            insert(fixture)
+            fixture.spool_reader.read_spool_raw()
+
+        def read_spool_fields(fixture: ReaderFixture, insert: Callable[[ReaderFixture], None] = insert_tag) -> None:
+            """
+            Read only the type and color of the fixture tag
+            :param fixture: The reader fixture
+            :param insert: Function that places the fixture tag
+            """
+            insert(fixture)
+            fixture.spool_reader.read_spool_fields(["type", "color"])
+
+        def read_card(fixture: ReaderFixture, insert: Callable[[ReaderFixture], None] = insert_tag) -> None:
+            """
+            Read all pages of the fixture tag
+            :param fixture: The reader fixture
+            :param insert: Function that places the fixture tag
+            """
+            insert(fixture)
+            fixture.spool_reader.reader.read_card()
+
+        def read_spool_cached(fixture: ReaderFixture, insert: Callable[[ReaderFixture], None] = insert_tag) -> None:
+            """
+            Read the fixture tag through the tag cache (only the uid is read after the first call)
+            :param fixture: The reader fixture
+            :param insert: Function that places the fixture tag
+            """
+            insert(fixture)
+            fixture.spool_reader.read_spool(cached=True)
+
+        def write_card(fixture: ReaderFixture, verify: bool, differential: bool,
+                       specs: dict[str, Any] = spool_specs) -> None:
+            """
+            Write the fixture data back to a fresh tag
+            :param fixture: The reader fixture
+            :param verify: Read the written pages back
+            :param differential: Only write the changed pages
+            :param specs: Spool specs to write
+            """
+            fixture.simulated_reader.insert_tag(VirtualNTAG213())
+            fixture.spool_reader.write_spool(specs, differential=differential, verify=verify)
+
+        add("read_spool_raw", read_spool_raw)
+        add("read_spool_fields", read_spool_fields)
+        add("read_card", read_card)
+        add("read_spool_cached", read_spool_cached)
+        add("write_card", lambda fixture, f=write_card: f(fixture, False, False))
+        add("write_card_differential", lambda fixture, f=write_card: f(fixture, False, True))
+        add("write_card_verified", lambda fixture, f=write_card: f(fixture, True, False))
+    return benchmarks
+
+
+def compare_results(results: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """
+    Compare the medians of two runs
+    :param results: JSON results of this run
+    :param baseline: JSON results of the run to compare with
+    :param threshold: Allowed slowdown (0.2 = 20%)
+    :return: Names of the regressed benchmarks
+    """
+    regressions: list[str] = []
+    print(f"\n{'Benchmark':<50} {'Baseline':>12} {'Current':>12} {'Change':>8}")
+    for name, result in results["benchmarks"].items():
+        baseline_result: Optional[dict[str, Any]] = baseline.get("benchmarks", {}).get(name)
+        if not baseline_result or baseline_result["p50_ms"] <= 0:
+            print(f"{name:<50} {'-':>12} {result['p50_ms']:>10.3f}ms {'new':>8}")
+            continue
+        change: float = result["p50_ms"] / baseline_result["p50_ms"] - 1
+        marker: str = ""
+        if change > threshold:
+            regressions.append(name)
+            marker = " !"
+        print(f"{name:<50} {baseline_result['p50_ms']:>10.3f}ms {result['p50_ms']:>10.3f}ms "
+              f"{change * 100:>+7.1f}%{marker}")
+    return regressions
+
+
+def main(arguments: Optional[list[str]] = None) -> int:
+    """
+    Run the benchmarks
+    :param arguments: Command line arguments (default: sys.argv)
+    :return: Exit code (1 if a regression was found else 0)
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the NFC and spool data hot paths")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", help="Compare the results with a previous JSON result file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown of the median for --compare (default: 0.2 = 20%%)")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY,
+                        help="Time per APDU of the simulated reader in seconds (default: 0.004)")
+    parser.add_argument("--iterations", type=int, default=2000, help="Iterations of the codec benchmarks")
+    parser.add_argument("--reader-iterations", type=int, default=20, help="Iterations of the reader benchmarks")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this text")
+    args = parser.parse_args(arguments)
+
+    tag_images: dict[str, list[bytes]] = load_tag_images()
+    benchmarks: list[Benchmark] = create_codec_benchmarks(tag_images, args.iterations)
+    benchmarks += create_reader_benchmarks(tag_images, args.reader_iterations, args.latency)
+
+    results: dict[str, Any] = {
+        "format": RESULT_FORMAT,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "latency": args.latency,
+        "benchmarks": {}
+    }
+    print(f"{'Benchmark':<50} {'p50':>10} {'p95':>10} {'ops/s':>10}")
+    for benchmark in benchmarks:
+        if args.filter not in benchmark.name:
+            continue
+        result: dict[str, Any] = benchmark.run()
+        results["benchmarks"][benchmark.name] = result
+        print(f"{benchmark.name:<50} {result['p50_ms']:>8.3f}ms {result['p95_ms']:>8.3f}ms "
+              f"{result['ops_per_second']:>10.1f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=4)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            baseline: dict[str, Any] = json.load(file)
+        regressions: list[str] = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n[Error] {len(regressions)} benchmark(s) regressed by more than {args.threshold * 100:.0f}%")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+import re
+from pathlib import Path
+
+# The known tag images are the dumps in format.md
+FORMAT_FILE: Path = Path(__file__).resolve().parent.parent / "format.md"
+FIXTURE_NAMES: list[str] = ["v1_pla_spring_leaf", "v2_pla_plus_bright_white", "v2_hs_pla_reconstructed"]
+PAGE_PATTERN: re.Pattern = re.compile(r"^\[Page ([0-9a-f]{2})] ([0-9a-f]{2}(?::[0-9a-f]{2}){3})", re.IGNORECASE)
+
+
+def load_tag_images() -> dict[str, list[bytes]]:
+    """
+    Load the tag images from format.md
+    :return: Pages of every tag image by fixture name
+    """
+    images: list[list[bytes]] = []
+    for line in FORMAT_FILE.read_text(encoding="utf-8").splitlines():
+        match = PAGE_PATTERN.match(line.strip())
+        if not match:
+            continue
+        page: int = int(match.group(1), 16)
+        if page == 0:
+            images.append([])
+        images[-1].append(bytes.fromhex(match.group(2).replace(":", "")))
+    return dict(zip(FIXTURE_NAMES, images))
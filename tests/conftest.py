@@ -0,0 +1,54 @@
+import importlib.util
+from typing import Iterator
+
+import pytest
+
+from benchmarks.fixtures import load_tag_images
+
+if importlib.util.find_spec("smartcard") is None:
+    # The nfc manager needs pyscard (also with the simulated transport)
+    collect_ignore_glob: list[str] = ["test_*.py"]
+else:
+    from anycubic_nfc_app.nfc_manager import NFCReader, SimulatedReader, SimulatedTransport, SpoolReader
+
+
+@pytest.fixture
+def transport() -> "SimulatedTransport":
+    """
+    Simulated PC/SC service
+    :return: The transport (without readers)
+    """
+    return SimulatedTransport()
+
+
+@pytest.fixture
+def simulated_reader(transport: "SimulatedTransport") -> "SimulatedReader":
+    """
+    Simulated reader without a tag
+    :param transport: The transport of the reader
+    :return: The reader
+    """
+    return transport.add_reader()
+
+
+@pytest.fixture
+def spool_reader(transport: "SimulatedTransport", simulated_reader: "SimulatedReader") -> Iterator["SpoolReader"]:
+    """
+    Spool reader that uses the simulated reader
+    :param transport: The transport of the reader
+    :param simulated_reader: The simulated reader
+    :return: The spool reader (its reader monitor is stopped after the test)
+    """
+    spool_reader: "SpoolReader" = SpoolReader(NFCReader(transport=transport))
+    yield spool_reader
+    spool_reader.cancel_wait_for_tag()
+    spool_reader.reader.reader_monitor.stop()
+
+
+@pytest.fixture(scope="session")
+def tag_images() -> dict[str, list[bytes]]:
+    """
+    The known tag images (dumps in format.md)
+    :return: Pages of every tag image by fixture name
+    """
+    return load_tag_images()
@@ -0,0 +1,39 @@
+import threading
+import time
+
+from anycubic_nfc_app.nfc_manager import CancelToken, SpoolReader
+
+
+def test_read_is_cancelled_while_waiting_for_a_tag(spool_reader: SpoolReader):
+    token: CancelToken = CancelToken()
+    threading.Timer(0.2, token.cancel).start()
+    start: float = time.monotonic()
+    assert spool_reader.read_spool(timeout=10, token=token) is None
+    assert time.monotonic() - start < 2
+
+
+def test_cancel_wait_for_tag_cancels_every_pending_read(spool_reader: SpoolReader):
+    threading.Timer(0.2, spool_reader.cancel_wait_for_tag).start()
+    start: float = time.monotonic()
+    assert spool_reader.read_spool(timeout=10) is None
+    assert time.monotonic() - start < 2
+
+
+def test_read_stops_at_the_token_deadline(spool_reader: SpoolReader):
+    start: float = time.monotonic()
+    assert spool_reader.read_spool(timeout=10, token=CancelToken(0.3)) is None
+    assert 0.2 < time.monotonic() - start < 2
+
+
+def test_read_stops_at_the_timeout(spool_reader: SpoolReader):
+    start: float = time.monotonic()
+    assert spool_reader.read_spool(timeout=0.3) is None
+    assert 0.2 < time.monotonic() - start < 2
+
+
+def test_cancelled_token_fails_without_waiting(spool_reader: SpoolReader):
+    token: CancelToken = CancelToken()
+    token.cancel()
+    start: float = time.monotonic()
+    assert spool_reader.read_spool(timeout=10, token=token) is None
+    assert time.monotonic() - start < 1
@@ -0,0 +1,107 @@
+from typing import Any
+
+import pytest
+
+from anycubic_nfc_app.nfc_manager import SpoolBatch, SpoolData
+
+
+def get_ranges(*values: int) -> dict[str, dict[str, int]]:
+    """
+    Create the print ranges of spool specs
+    :param values: Speed min, speed max, nozzle min and nozzle max of every given range
+    :return: range_a, range_b and range_c (missing ones are 0)
+    """
+    values += (12 - len(values)) * (0,)
+    return {name: dict(zip(SpoolData.RANGE_KEYS, values[4 * i:4 * i + 4]))
+            for i, name in enumerate(["range_a", "range_b", "range_c"])}
+
+
+SPOOL = {"bed_min": 50, "bed_max": 60, "diameter": 1.75, "length": 330, "weight": 1000}
+
+# Decoded specs and encoded pages (without zero pages) of the known tag images (from the original field codec)
+EXPECTED: dict[str, tuple[dict[str, Any], dict[int, str]]] = {
+    "v1_pla_spring_leaf": (
+        {"uid": "534e63d4720001", "type": "PLA", "manufacturer": "", "color": "#89a84f",
+         **get_ranges(0, 0, 200, 210), **SPOOL, "raw": {"sku": "HPL19-102", "type": "PLA", "is_custom": False}},
+        {0x04: "7b006500", 0x05: "4148504c", 0x06: "424b2d31", 0x07: "30310000", 0x0f: "504c4100",
+         0x14: "ff4fa889", 0x18: "c800d200", 0x1d: "32003c00", 0x1e: "af004a01", 0x1f: "e8030000",
+         0x27: "0000004d"}
+    ),
+    "v2_pla_plus_bright_white": (
+        {"uid": "1d98cd39980000", "type": "PLA+", "manufacturer": "AC", "color": "#f0f0ed",
+         **get_ranges(50, 100, 205, 215), **SPOOL,
+         "raw": {"sku": "AHPLPBW-102", "type": "PLA+", "is_custom": False}},
+        {0x04: "7b006500", 0x05: "4148504c", 0x06: "50424b2d", 0x07: "31303200", 0x0a: "41430000",
+         0x0f: "504c412b", 0x14: "ffedf0f0", 0x17: "32006400", 0x18: "cd00d700", 0x1d: "32003c00",
+         0x1e: "af004a01", 0x1f: "e8030000", 0x27: "0000004d"}
+    ),
+    "v2_hs_pla_reconstructed": (
+        {"uid": "1d98cd39980000", "type": "PLA+", "manufacturer": "AC", "color": "#e10600",
+         **get_ranges(50, 150, 190, 210, 150, 300, 210, 230, 300, 600, 230, 260), **SPOOL,
+         "raw": {"sku": "AHPLPBW-102", "type": "PLA?High?Speed", "is_custom": False}},
+        {0x04: "7b006500", 0x05: "4148504c", 0x06: "50424b2d", 0x07: "31303200", 0x0a: "41430000",
+         0x0f: "504c412b", 0x14: "ff0006e1", 0x17: "32009600", 0x18: "be00d200", 0x19: "96002c01",
+         0x1a: "d200e600", 0x1b: "2c015802", 0x1c: "e6000401", 0x1d: "32003c00", 0x1e: "af004a01",
+         0x1f: "e8030000", 0x27: "0000004d"}
+    )
+}
+
+
+def load_spool_data(pages: list[bytes]) -> SpoolData:
+    """
+    Load a tag image
+    :param pages: Pages of the tag image
+    :return: The spool data
+    """
+    spool_data: SpoolData = SpoolData()
+    spool_data.data[:] = b"".join(pages)
+    return spool_data
+
+
+@pytest.mark.parametrize("name", EXPECTED)
+def test_decode_matches_the_original_codec(name: str, tag_images: dict[str, list[bytes]]):
+    assert load_spool_data(tag_images[name]).get_spool_specs() == EXPECTED[name][0]
+
+
+@pytest.mark.parametrize("name", EXPECTED)
+def test_encode_matches_the_original_codec(name: str):
+    spool_data: SpoolData = SpoolData(EXPECTED[name][0])
+    pages: dict[int, str] = {page: data.hex() for page, data in enumerate(spool_data.pages) if any(data)}
+    assert pages == EXPECTED[name][1]
+
+
+@pytest.mark.parametrize("name", EXPECTED)
+def test_encoded_specs_decode_to_the_same_specs(name: str):
+    spool_specs: dict[str, Any] = EXPECTED[name][0]
+    decoded: dict[str, Any] = load_spool_data(SpoolData(spool_specs).pages).get_spool_specs()
+    for key in ["type", "color", "range_a", "range_b", "range_c", "bed_min", "bed_max", "diameter", "length",
+                "weight"]:
+        assert decoded[key] == spool_specs[key]
+
+
+def test_field_read_matches_the_full_decode(tag_images: dict[str, list[bytes]]):
+    spool_data: SpoolData = load_spool_data(tag_images["v2_hs_pla_reconstructed"])
+    full: dict[str, Any] = spool_data.get_spool_specs()
+    fields: dict[str, Any] = spool_data.get_spool_specs(["color", "range_b", "weight"])
+    for key in ["color", "range_b", "weight"]:
+        assert fields[key] == full[key]
+
+
+def test_batch_codec_matches_spool_data(tag_images: dict[str, list[bytes]]):
+    pytest.importorskip("numpy")
+    images: bytes = b"".join(b"".join(tag_images[name]) for name in EXPECTED)
+    columns: dict[str, Any] = SpoolBatch.decode(images)
+    for index, name in enumerate(EXPECTED):
+        assert SpoolBatch.get_spool_specs(columns, index) == EXPECTED[name][0]
+
+    specs: list[dict[str, Any]] = [EXPECTED[name][0] for name in EXPECTED]
+    encoded: bytes = bytes(SpoolBatch.encode(SpoolBatch.get_columns(specs)))
+    assert encoded == b"".join(bytes(SpoolData(spool_specs).data) for spool_specs in specs)
+
+
+@pytest.mark.parametrize("filament_type", SpoolData.get_available_filament_types())
+def test_every_filament_type_is_decoded_from_its_sku(filament_type: str):
+    spool_specs: dict[str, Any] = {**EXPECTED["v1_pla_spring_leaf"][0], "type": filament_type}
+    decoded: dict[str, Any] = load_spool_data(SpoolData(spool_specs).pages).get_spool_specs()
+    assert decoded["raw"]["sku"] == SpoolData.SKUS[filament_type]
+    assert decoded["type"] == filament_type
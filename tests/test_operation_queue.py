@@ -0,0 +1,62 @@
+import threading
+
+from anycubic_nfc_app.nfc_manager import CancelToken, OperationQueue, QueuedOperation
+
+
+def test_submit_is_rejected_at_the_limit():
+    queue: OperationQueue = OperationQueue(max_length=2, name="test")
+    started: threading.Event = threading.Event()
+    release: threading.Event = threading.Event()
+
+    def block(token: CancelToken) -> str:
+        """
+        Keep the worker busy until the test releases it
+        :param token: Cancel token of the operation
+        :return: Result of the operation
+        """
+        started.set()
+        release.wait(5)
+        return "blocked"
+
+    running: QueuedOperation = queue.submit(block)
+    assert started.wait(5)
+    waiting: list[QueuedOperation] = [queue.submit(lambda token, i=i: i) for i in range(2)]
+    assert all(operation is not None for operation in waiting)
+    assert queue.submit(lambda token: "rejected") is None
+
+    release.set()
+    assert running.result(5) == "blocked"
+    assert [operation.result(5) for operation in waiting] == [0, 1]
+    statistics = queue.get_statistics()
+    assert statistics["rejected"] == 1
+    assert statistics["completed"] == 3
+
+
+def test_operations_are_executed_by_priority():
+    queue: OperationQueue = OperationQueue(name="test")
+    release: threading.Event = threading.Event()
+    order: list[str] = []
+    queue.submit(lambda token: release.wait(5))
+    operations: list[QueuedOperation] = [
+        queue.submit(lambda token: order.append("low"), OperationQueue.PRIORITY_LOW),
+        queue.submit(lambda token: order.append("normal")),
+        queue.submit(lambda token: order.append("high"), OperationQueue.PRIORITY_HIGH)
+    ]
+    release.set()
+    for operation in operations:
+        operation.result(5)
+    assert order == ["high", "normal", "low"]
+
+
+def test_cancelled_operation_is_skipped():
+    queue: OperationQueue = OperationQueue(name="test")
+    release: threading.Event = threading.Event()
+    executed: list[bool] = []
+    queue.submit(lambda token: release.wait(5))
+    operation: QueuedOperation = queue.submit(lambda token: executed.append(True))
+    operation.cancel()
+    release.set()
+    last: QueuedOperation = queue.submit(lambda token: None)
+    last.result(5)
+    assert operation.future.cancelled()
+    assert not executed
@@ -0,0 +1,67 @@
+from typing import Any, Optional
+
+from anycubic_nfc_app.nfc_manager import ReadResult, SimulatedReader, SpoolReader, VirtualNTAG213
+
+
+class LiftedTag(VirtualNTAG213):
+    """
+    Tag that is lifted from the reader after some reads
+    """
+
+    def __init__(self, simulated_reader: SimulatedReader, reads: int, *args: Any, **kwargs: Any):
+        """
+        Create a tag
+        :param simulated_reader: The reader that the tag is placed on
+        :param reads: Number of reads before the tag is lifted
+        :param args: Arguments of VirtualNTAG213
+        :param kwargs: Keyword arguments of VirtualNTAG213
+        """
+        super().__init__(*args, **kwargs)
+        self.simulated_reader: SimulatedReader = simulated_reader
+        self.reads: int = reads
+
+    def read(self, page: int, length: int = 4) -> Optional[bytes]:
+        """
+        Read from the memory (lifts the tag after the configured number of reads)
+        :param page: First page
+        :param length: Number of bytes
+        :return: The data or None if the page doesn't exist
+        """
+        self.reads -= 1
+        if self.reads == 0:
+            self.simulated_reader.remove_tag()
+        return super().read(page, length)
+
+
+def test_transient_tag_errors_are_retried(spool_reader: SpoolReader, simulated_reader: SimulatedReader,
+                                          tag_images: dict[str, list[bytes]]):
+    simulated_reader.insert_tag(VirtualNTAG213(pages=tag_images["v2_pla_plus_bright_white"]))
+    simulated_reader.tag_errors = 2
+    result: ReadResult = spool_reader.read_spool_detailed(timeout=1)
+    assert result.success
+    assert result.data.get_spool_specs()["color"] == "#f0f0ed"
+
+
+def test_lifted_tag_is_reported(spool_reader: SpoolReader, simulated_reader: SimulatedReader,
+                                tag_images: dict[str, list[bytes]]):
+    simulated_reader.insert_tag(LiftedTag(simulated_reader, 2, pages=tag_images["v2_pla_plus_bright_white"]))
+    result: ReadResult = spool_reader.read_spool_detailed(timeout=1)
+    assert not result.success
+    assert result.error == ReadResult.ERROR_CARD_REMOVED
+    assert result.failed_pages
+
+
+def test_lifted_tag_is_reported_in_page_mode(spool_reader: SpoolReader, simulated_reader: SimulatedReader,
+                                             tag_images: dict[str, list[bytes]]):
+    simulated_reader.direct_transmit = False
+    simulated_reader.insert_tag(LiftedTag(simulated_reader, 5, pages=tag_images["v2_pla_plus_bright_white"]))
+    result: ReadResult = spool_reader.read_spool_detailed(timeout=1)
+    assert result.error == ReadResult.ERROR_CARD_REMOVED
+    assert spool_reader.read_spool(timeout=0.1) is None
+
+
+def test_lifted_tag_fails_the_write(spool_reader: SpoolReader, simulated_reader: SimulatedReader):
+    simulated_reader.insert_tag(LiftedTag(simulated_reader, 1))
+    spool_specs: dict[str, Any] = {"type": "PLA", "color": "#112233", "range_a": {"nozzle_min": 190, "nozzle_max": 230},
+                                   "bed_min": 50, "bed_max": 60, "diameter": 1.75, "length": 330, "weight": 1000}
+    assert not spool_reader.write_spool(spool_specs, differential=True)
@@ -0,0 +1,60 @@
+import time
+from typing import Callable, Iterator
+
+import pytest
+
+from anycubic_nfc_app.nfc_manager import NFCReader, SimulatedTransport
+
+ACR122U: str = "ACS ACR122U PICC Interface 0"
+ACR1252: str = "ACS ACR1252 PICC 1"
+
+
+@pytest.fixture
+def nfc_reader(transport: SimulatedTransport) -> Iterator[NFCReader]:
+    """
+    Reader that selects its reader automatically
+    :param transport: The simulated transport
+    :return: The reader (its reader monitor is stopped after the test)
+    """
+    nfc_reader: NFCReader = NFCReader(transport=transport)
+    yield nfc_reader
+    nfc_reader.reader_monitor.stop()
+
+
+def wait_for(condition: Callable[[], bool], timeout: float = 5.0) -> None:
+    """
+    Wait until a condition is met
+    :param condition: Function that returns True when the condition is met
+    :param timeout: Maximum time to wait in seconds
+    """
+    deadline: float = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out"
+        time.sleep(0.02)
+
+
+def test_plugged_in_reader_is_selected(nfc_reader: NFCReader, transport: SimulatedTransport):
+    connection_states: list[bool] = []
+    nfc_reader.add_connection_listener(connection_states.append)
+    assert nfc_reader.reader is None
+
+    transport.add_reader(ACR122U)
+    wait_for(lambda: nfc_reader.reader is not None)
+    assert str(nfc_reader.reader) == ACR122U
+
+    transport.remove_reader(ACR122U)
+    wait_for(lambda: nfc_reader.reader is None)
+    assert connection_states == [True, False]
+
+
+def test_changed_preferred_reader_is_selected(monkeypatch: pytest.MonkeyPatch, transport: SimulatedTransport):
+    transport.add_reader(ACR122U)
+    transport.add_reader(ACR1252)
+    nfc_reader: NFCReader = NFCReader(transport=transport)
+    try:
+        assert str(nfc_reader.reader) == ACR1252
+        monkeypatch.setattr(NFCReader, "preferred_reader", "acr122u")
+        nfc_reader.select_reader()
+        assert str(nfc_reader.reader) == ACR122U
+    finally:
+        nfc_reader.reader_monitor.stop()
@@ -0,0 +1,117 @@
+import threading
+import time
+from typing import Callable, Iterator
+
+import pytest
+
+from anycubic_nfc_app.nfc_manager import PoolJob, ReaderPool, SimulatedTransport, VirtualNTAG213
+
+READER_A: str = "ACS ACR122U A"
+READER_B: str = "ACS ACR122U B"
+
+
+@pytest.fixture
+def pool(transport: SimulatedTransport) -> Iterator[ReaderPool]:
+    """
+    Started reader pool with the readers A and B
+    :param transport: The simulated transport
+    :return: The pool (stopped after the test)
+    """
+    transport.add_reader(READER_A)
+    transport.add_reader(READER_B)
+    pool: ReaderPool = ReaderPool(transport)
+    pool.start()
+    wait_for(lambda: set(pool.spool_readers) == {READER_A, READER_B})
+    yield pool
+    pool.stop()
+
+
+def wait_for(condition: Callable[[], bool], timeout: float = 5.0) -> None:
+    """
+    Wait until a condition is met
+    :param condition: Function that returns True when the condition is met
+    :param timeout: Maximum time to wait in seconds
+    """
+    deadline: float = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out"
+        time.sleep(0.02)
+
+
+def test_job_is_executed_by_the_reader_with_a_tag(pool: ReaderPool, transport: SimulatedTransport):
+    job: PoolJob = pool.read_spool()
+    time.sleep(0.1)
+    transport.readers[READER_B].insert_tag(VirtualNTAG213())
+    assert job.result(5) is not None
+    assert job.reader_name == READER_B
+    assert transport.readers[READER_A].apdu_count == 0
+
+
+def test_jobs_are_executed_by_both_readers(pool: ReaderPool, transport: SimulatedTransport):
+    jobs: list[PoolJob] = [pool.read_spool(), pool.read_spool()]
+    time.sleep(0.1)
+    transport.readers[READER_A].insert_tag(VirtualNTAG213())
+    transport.readers[READER_B].insert_tag(VirtualNTAG213())
+    for job in jobs:
+        assert job.result(5) is not None
+    assert {job.reader_name for job in jobs} == {READER_A, READER_B}
+
+
+def test_replugged_reader_is_used_again(pool: ReaderPool, transport: SimulatedTransport):
+    transport.remove_reader(READER_B)
+    wait_for(lambda: READER_B not in pool.spool_readers)
+
+    transport.add_reader(READER_B)
+    wait_for(lambda: READER_B in pool.spool_readers)
+    job: PoolJob = pool.read_spool()
+    time.sleep(0.1)
+    transport.readers[READER_B].insert_tag(VirtualNTAG213())
+    assert job.result(5) is not None
+    assert job.reader_name == READER_B
+
+
+def test_waiting_job_can_be_cancelled(pool: ReaderPool):
+    job: PoolJob = pool.read_spool()
+    assert job.cancel()
+    assert job.future.cancelled()
+
+
+def test_quickly_replugged_reader_is_used_again(pool: ReaderPool, transport: SimulatedTransport):
+    for _ in range(5):
+        transport.remove_reader(READER_B)
+        time.sleep(0.05)
+        transport.add_reader(READER_B)
+    wait_for(lambda: READER_B in pool.spool_readers and pool.spool_readers[READER_B].get_connection_state())
+    job: PoolJob = pool.read_spool()
+    time.sleep(0.1)
+    transport.readers[READER_B].insert_tag(VirtualNTAG213())
+    assert job.result(5) is not None
+    assert job.reader_name == READER_B
+
+
+def test_statistics_can_be_read_while_readers_change(pool: ReaderPool, transport: SimulatedTransport):
+    errors: list[Exception] = []
+    done: threading.Event = threading.Event()
+
+    def read_statistics() -> None:
+        """
+        Read the statistics until the readers stopped changing
+        """
+        while not done.is_set():
+            try:
+                pool.get_statistics()
+            except Exception as e:
+                errors.append(e)
+
+    statistics_thread: threading.Thread = threading.Thread(target=read_statistics)
+    statistics_thread.start()
+    for i in range(20):
+        transport.add_reader(f"ACS ACR122U {i}")
+        time.sleep(0.01)
+    wait_for(lambda: len(pool.get_statistics()) == 22)
+    for i in range(20):
+        transport.remove_reader(f"ACS ACR122U {i}")
+    done.set()
+    statistics_thread.join()
+    assert errors == []
+    assert len(pool.get_statistics()) == 22
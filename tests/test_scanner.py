@@ -0,0 +1,108 @@
+import time
+from typing import Any, Callable, Iterator, Optional
+
+import pytest
+
+from anycubic_nfc_app.nfc_manager import SimulatedReader, SpoolReader, SpoolScanner, VirtualNTAG213
+
+
+class LiftedTag(VirtualNTAG213):
+    """
+    Tag that is lifted from the reader during the first read
+    """
+
+    def __init__(self, simulated_reader: SimulatedReader, *args: Any, **kwargs: Any):
+        """
+        Create a tag
+        :param simulated_reader: The reader that the tag is placed on
+        :param args: Arguments of VirtualNTAG213
+        :param kwargs: Keyword arguments of VirtualNTAG213
+        """
+        super().__init__(*args, **kwargs)
+        self.simulated_reader: SimulatedReader = simulated_reader
+
+    def read(self, page: int, length: int = 4) -> Optional[bytes]:
+        """
+        Read from the memory (lifts the tag)
+        :param page: First page
+        :param length: Number of bytes
+        :return: The data or None if the page doesn't exist
+        """
+        self.simulated_reader.remove_tag()
+        return super().read(page, length)
+
+
+class BrokenTag(LiftedTag):
+    """
+    Tag that is lifted and breaks the first read with an unexpected error
+    """
+
+    def read(self, page: int, length: int = 4) -> Optional[bytes]:
+        """
+        Read from the memory (lifts the tag and fails)
+        :param page: First page
+        :param length: Number of bytes
+        :return: Never returns
+        """
+        super().read(page, length)
+        raise RuntimeError("Broken tag")
+
+
+@pytest.fixture
+def spool_scanner(spool_reader: SpoolReader) -> Iterator[SpoolScanner]:
+    """
+    Running scanner of the spool reader
+    :param spool_reader: The spool reader to scan with
+    :return: The scanner (stopped after the test)
+    """
+    spool_scanner: SpoolScanner = SpoolScanner(spool_reader)
+    spool_scanner.start()
+    yield spool_scanner
+    spool_scanner.stop()
+    spool_scanner.scan_thread.join(5)
+
+
+def wait_for(condition: Callable[[], bool], timeout: float = 5.0) -> None:
+    """
+    Wait until a condition is met
+    :param condition: Function that returns True when the condition is met
+    :param timeout: Maximum time to wait in seconds
+    """
+    deadline: float = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out"
+        time.sleep(0.02)
+
+
+@pytest.mark.parametrize("tag_class", [LiftedTag, BrokenTag])
+def test_scan_continues_after_a_failed_read(spool_scanner: SpoolScanner, simulated_reader: SimulatedReader,
+                                            tag_images: dict[str, list[bytes]],
+                                            tag_class: type[LiftedTag]):
+    results: list[dict[str, Any]] = []
+    spool_scanner.subscribe(results.append)
+    simulated_reader.direct_transmit = False  # Every page is read with a read binary command
+    simulated_reader.insert_tag(tag_class(simulated_reader))
+    wait_for(lambda: len(results) == 1)
+    assert not results[0]["success"]
+
+    simulated_reader.insert_tag(VirtualNTAG213(pages=tag_images["v2_pla_plus_bright_white"]))
+    wait_for(lambda: len(results) == 2)
+    assert results[1]["success"]
+    assert spool_scanner.is_running()
+
+
+def test_scan_reads_through_the_queue(spool_scanner: SpoolScanner, spool_reader: SpoolReader,
+                                      simulated_reader: SimulatedReader, tag_images: dict[str, list[bytes]]):
+    results: list[dict[str, Any]] = []
+    spool_scanner.subscribe(results.append)
+    simulated_reader.insert_tag(VirtualNTAG213(pages=tag_images["v2_pla_plus_bright_white"]))
+    wait_for(lambda: len(results) == 1)
+    assert results[0]["success"]
+    assert spool_reader.get_queue_statistics()["completed"] == 1
+
+
+def test_stopped_scan_is_not_running(spool_scanner: SpoolScanner):
+    spool_scanner.stop()
+    spool_scanner.scan_thread.join(5)
+    assert not spool_scanner.scan_thread.is_alive()
+    assert not spool_scanner.is_running()
@@ -0,0 +1,81 @@
+import time
+from typing import Optional
+
+import pytest
+
+from anycubic_nfc_app.nfc_manager import (NFCReader, SimulatedReader, SimulatedTransport, SpoolReader, Transport,
+                                          VirtualNTAG213, VirtualNTAG215)
+from anycubic_nfc_app.nfc_manager.nfc_reader import CardData
+
+
+def test_incomplete_transport_can_not_be_created():
+    class IncompleteTransport(Transport):
+        """
+        Transport without the reader lookup
+        """
+
+        def establish_context(self) -> tuple[int, int]:
+            """
+            Establish a context
+            :return: Result code and context
+            """
+            return 0, 1
+
+    with pytest.raises(TypeError):
+        IncompleteTransport()
+
+
+def test_tag_image_is_read(spool_reader: SpoolReader, simulated_reader: SimulatedReader,
+                           tag_images: dict[str, list[bytes]]):
+    pages: list[bytes] = tag_images["v2_pla_plus_bright_white"]
+    simulated_reader.insert_tag(VirtualNTAG213(pages=pages))
+    card_data: Optional[CardData] = spool_reader.reader.read_card(timeout=1)
+    assert card_data is not None
+    assert [bytes(page) for page in card_data.pages] == pages
+    assert simulated_reader.apdu_count > 0
+
+
+def test_tag_image_is_read_without_direct_transmit(spool_reader: SpoolReader, simulated_reader: SimulatedReader,
+                                                   tag_images: dict[str, list[bytes]]):
+    pages: list[bytes] = tag_images["v1_pla_spring_leaf"]
+    simulated_reader.direct_transmit = False
+    simulated_reader.insert_tag(VirtualNTAG213(pages=pages))
+    card_data: Optional[CardData] = spool_reader.reader.read_card(timeout=1)
+    assert card_data is not None
+    assert [bytes(page) for page in card_data.pages] == pages
+    assert spool_reader.reader.read_mode == NFCReader.READ_MODE_PAGE
+
+
+def test_tag_written_through_the_reader_keeps_the_uid(spool_reader: SpoolReader, simulated_reader: SimulatedReader):
+    tag: VirtualNTAG213 = simulated_reader.insert_tag()
+    card_data: CardData = CardData(VirtualNTAG213.page_count)
+    card_data.data[0x10:0x14] = b"\x01\x02\x03\x04"
+    assert spool_reader.reader.write_card(card_data, timeout=1)
+    assert tag.pages[0x04] == b"\x01\x02\x03\x04"
+    assert tag.get_uid() == bytes([0x04, 0x11, 0x22, 0x33, 0x44, 0x55, 0x66])
+
+
+def test_tag_type_is_detected(spool_reader: SpoolReader, simulated_reader: SimulatedReader):
+    simulated_reader.insert_tag(VirtualNTAG215())
+    card_data: Optional[CardData] = spool_reader.reader.read_card(timeout=1)
+    assert card_data is not None
+    assert len(card_data.pages) == VirtualNTAG215.page_count
+
+
+def test_tag_presence_is_reported(spool_reader: SpoolReader, simulated_reader: SimulatedReader):
+    nfc_reader: NFCReader = spool_reader.reader
+    assert not nfc_reader.wait_for_card_presence(0.1)
+    simulated_reader.insert_tag()
+    assert nfc_reader.wait_for_card_presence(1)
+    simulated_reader.remove_tag()
+    assert nfc_reader.wait_for_card_removal(1)
+
+
+def test_unplugged_reader_is_disconnected(spool_reader: SpoolReader, transport: SimulatedTransport,
+                                          simulated_reader: SimulatedReader):
+    assert spool_reader.get_connection_state()
+    transport.remove_reader(simulated_reader.name)
+    deadline: float = time.monotonic() + 5
+    while spool_reader.get_connection_state() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert not spool_reader.get_connection_state()
@@ -0,0 +1,40 @@
+from typing import Any
+
+import pytest
+
+from anycubic_nfc_app.nfc_manager import SpoolImageCache, SpoolSpecsSchema
+
+PLA: dict[str, Any] = {"type": "PLA", "color": "#112233", "range_a": {"nozzle_min": 190, "nozzle_max": 230},
+                       "bed_min": 50, "bed_max": 60, "diameter": 1.75, "length": 330, "weight": 1000}
+
+
+def test_valid_specs_have_no_errors():
+    assert SpoolSpecsSchema.validate(PLA) == {}
+    assert SpoolSpecsSchema.validate({**PLA, "color": "", "manufacturer": "Anycubic"}) == {}
+
+
+@pytest.mark.parametrize("changes, field", [
+    ({"range_a": {"nozzle_min": 190, "nozzle_max": 70000}}, "range_a.nozzle_max"),
+    ({"bed_min": -1}, "bed_min"),
+    ({"color": "red"}, "color"),
+    ({"type": 21 * "A"}, "type"),
+    ({"manufacturer": "€"}, "manufacturer"),
+    ({"diameter": float("nan")}, "diameter"),
+    ({"range_a": [190, 230]}, "range_a"),
+    ({"weight": None}, "weight")
+])
+def test_invalid_field_is_reported(changes: dict[str, Any], field: str):
+    assert list(SpoolSpecsSchema.validate({**PLA, **changes})) == [field]
+
+
+def test_missing_fields_are_reported():
+    assert SpoolSpecsSchema.validate({key: value for key, value in PLA.items() if key != "length"}) == {
+        "length": "is required"}
+    assert SpoolSpecsSchema.validate([]) == {"": "has to be an object"}
+
+
+def test_invalid_preset_is_skipped(capsys: pytest.CaptureFixture):
+    image_cache: SpoolImageCache = SpoolImageCache()
+    image_cache.add_presets([{**PLA, "type": "PETG", "bed_min": 70000}, PLA])
+    assert len(image_cache.presets) == 1
+    assert "Invalid filament preset PETG" in capsys.readouterr().out
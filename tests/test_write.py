@@ -0,0 +1,122 @@
+import threading
+import time
+from typing import Any
+
+from anycubic_nfc_app.nfc_manager import SimulatedReader, SpoolData, SpoolReader, VirtualNTAG213, WriteResult
+
+
+class RecordingTag(VirtualNTAG213):
+    """
+    Tag that records its writes and can ignore the first write of some pages (like a tag that left the field)
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        """
+        Create a tag
+        :param args: Arguments of VirtualNTAG213
+        :param kwargs: Keyword arguments of VirtualNTAG213
+        """
+        super().__init__(*args, **kwargs)
+        self.written_pages: list[int] = []
+        self.lost_pages: set[int] = set()  # Pages whose next write is acknowledged but not stored
+
+    def write(self, page: int, data: bytes) -> bool:
+        """
+        Write a page (and record it)
+        :param page: Page number
+        :param data: 4 bytes
+        :return: Success state
+        """
+        self.written_pages.append(page)
+        if page in self.lost_pages:
+            self.lost_pages.remove(page)
+            return True
+        return super().write(page, data)
+
+
+def get_spool_specs(tag_images: dict[str, list[bytes]]) -> dict[str, Any]:
+    """
+    Get spool specs to write
+    :param tag_images: The known tag images
+    :return: Specs of the Bright White PLA+ spool
+    """
+    spool_data: SpoolData = SpoolData()
+    spool_data.data[:] = b"".join(tag_images["v2_pla_plus_bright_white"])
+    return spool_data.get_spool_specs()
+
+
+def test_write_stores_the_spool_specs(spool_reader: SpoolReader, simulated_reader: SimulatedReader,
+                                      tag_images: dict[str, list[bytes]]):
+    spool_specs: dict[str, Any] = get_spool_specs(tag_images)
+    tag: RecordingTag = RecordingTag()
+    simulated_reader.insert_tag(tag)
+    assert spool_reader.write_spool(spool_specs)
+    expected: SpoolData = SpoolData(spool_specs)
+    assert tag.pages[0x04:0x28] == expected.pages[0x04:0x28]
+    assert spool_reader.read_spool(timeout=1)["color"] == spool_specs["color"]
+
+
+def test_differential_write_skips_unchanged_pages(spool_reader: SpoolReader, simulated_reader: SimulatedReader,
+                                                  tag_images: dict[str, list[bytes]]):
+    spool_specs: dict[str, Any] = get_spool_specs(tag_images)
+    tag: RecordingTag = RecordingTag()
+    simulated_reader.insert_tag(tag)
+    assert spool_reader.write_spool(spool_specs)
+
+    tag.written_pages.clear()
+    result: WriteResult = spool_reader.write_spool_detailed(spool_specs, differential=True)
+    assert result.success
+    assert tag.written_pages == []
+    assert set(result.pages.values()) == {WriteResult.PAGE_UNCHANGED}
+
+    color_page: int = SpoolData.get_field_pages(["color"])[0]
+    result = spool_reader.write_spool_detailed({**spool_specs, "color": "#123456"}, differential=True)
+    assert result.success
+    assert tag.written_pages == [color_page]
+    assert result.get_pages(WriteResult.PAGE_WRITTEN) == [color_page]
+    assert spool_reader.read_spool(timeout=1)["color"] == "#123456"
+
+
+def test_verify_only_rewrites_bad_pages(spool_reader: SpoolReader, simulated_reader: SimulatedReader,
+                                        tag_images: dict[str, list[bytes]]):
+    spool_specs: dict[str, Any] = get_spool_specs(tag_images)
+    tag: RecordingTag = RecordingTag()
+    tag.lost_pages = {0x05, 0x14}
+    simulated_reader.insert_tag(tag)
+
+    result: WriteResult = spool_reader.write_spool_detailed(spool_specs, verify=True)
+    assert result.success
+    assert result.get_pages(WriteResult.PAGE_REWRITTEN) == [0x05, 0x14]
+    assert result.get_pages(WriteResult.PAGE_VERIFIED) == [page for page in range(0x04, 0x28)
+                                                           if page not in (0x05, 0x14)]
+    assert sorted(tag.written_pages) == sorted(list(range(0x04, 0x28)) + [0x05, 0x14])
+    assert tag.pages[0x04:0x28] == SpoolData(spool_specs).pages[0x04:0x28]
+
+
+def test_write_without_verify_misses_lost_pages(spool_reader: SpoolReader, simulated_reader: SimulatedReader,
+                                                tag_images: dict[str, list[bytes]]):
+    spool_specs: dict[str, Any] = get_spool_specs(tag_images)
+    tag: RecordingTag = RecordingTag()
+    tag.lost_pages = {0x14}
+    simulated_reader.insert_tag(tag)
+
+    result: WriteResult = spool_reader.write_spool_detailed(spool_specs)
+    assert result.success
+    assert set(result.pages.values()) == {WriteResult.PAGE_WRITTEN}
+    assert tag.pages[0x14] != SpoolData(spool_specs).pages[0x14]
+
+
+def test_write_waiting_for_a_tag_does_not_hold_the_lock(spool_reader: SpoolReader, simulated_reader: SimulatedReader,
+                                                        tag_images: dict[str, list[bytes]]):
+    spool_specs: dict[str, Any] = get_spool_specs(tag_images)
+    results: list[bool] = []
+    write_thread: threading.Thread = threading.Thread(
+        target=lambda: results.append(spool_reader.write_spool(spool_specs)))
+    write_thread.start()
+    time.sleep(0.1)
+    assert spool_reader.lock.acquire(timeout=1)
+    spool_reader.lock.release()
+
+    simulated_reader.insert_tag(RecordingTag())
+    write_thread.join(5)
+    assert results == [True]